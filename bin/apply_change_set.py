@@ -0,0 +1,25 @@
+import argparse
+import sys
+
+from src.database.change_set_applier import ChangeSetApplier
+from src.util.manga_logger import MangaLogger
+from src.enums.host_enum import HostEnum
+
+parser = argparse.ArgumentParser(description='Apply a change set recorded by a dry run of the '
+                                 'scraper to the manga server.')
+parser.add_argument('--change-set', default=None,
+                    help='path of the change set file, defaults to the one the scraper records')
+parser.add_argument('--workers', type=int, default=8,
+                    help='number of bulk requests sent at once')
+parser.add_argument('--batch-size', type=int, default=500,
+                    help='number of writes per bulk request')
+args = parser.parse_args()
+
+applier = ChangeSetApplier(HostEnum.LOCAL, args.workers, args.batch_size)
+applied = applier.apply(args.change_set)
+
+logger = MangaLogger(HostEnum.LOCAL).register_logger(__name__)
+logger.info('-----------------------------------------------------------------------------')
+logger.info('---------------------------------PROCESS END---------------------------------')
+logger.info('-----------------------------------------------------------------------------')
+sys.exit(0 if applied else 1)
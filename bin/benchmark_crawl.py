@@ -0,0 +1,88 @@
+'''
+Benchmarks a full crawl offline, replaying http responses recorded into fixtures.
+
+The fixtures hold live pages, so they are not committed.  Record them once with a live
+crawl, which needs network access, then replay them as often as needed:
+
+    python record_crawl_fixtures.py --end 200
+    python benchmark_crawl.py --end 200 --latency 50 --jitter 20
+
+record_crawl_fixtures.py runs this benchmark with --record, against the mock manga server
+it starts on the manga server's port.
+
+The crawl runs `run_scraper` end to end on the mock host, so its fingerprints, journal
+and metrics are written under ./db/mocks and never touch the state of real runs.
+Every item is scraped in full, so replays of the same fixtures make the same requests.
+Reports the wall time, CPU time, peak RSS and request counts per remote host.
+'''
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.manga.async_scrape_crunchyroll import AsyncScrapeCrunchyroll
+from src.manga.scrape_crunchyroll import ScrapeCrunchyroll
+from src.util.http_cassette import HttpCassette
+from src.util.http_client import HttpClient
+
+parser = argparse.ArgumentParser(description='Benchmark a crawl against recorded responses.')
+parser.add_argument('--fixtures', default=FilePathEnum.HTTP_FIXTURES.value[HostEnum.MOCK.value],
+                    help='directory of the recorded responses')
+parser.add_argument('--record', action='store_true',
+                    help='crawl the live sites and record their responses into the fixtures')
+parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                    help='run the scraper with a thread pool or a single asyncio event loop')
+parser.add_argument('--start', type=int, default=0, help='offset of the first listing item')
+parser.add_argument('--end', type=int, default=200, help='offset of the listing item to stop before')
+parser.add_argument('--latency', type=float, default=0,
+                    help='milliseconds added to every replayed response')
+parser.add_argument('--jitter', type=float, default=0,
+                    help='max random milliseconds added on top of the latency')
+parser.add_argument('--seed', type=int, default=0, help='seed of the jitter')
+parser.add_argument('--keep-rate-limits', action='store_true',
+                    help='keep the per-host rate limits when replaying')
+args = parser.parse_args()
+
+if not args.record and not os.path.isdir(args.fixtures):
+    sys.exit(f'No fixtures recorded in {args.fixtures}, record them first with:\n\n'
+             f'    python record_crawl_fixtures.py --start {args.start} --end {args.end}')
+
+os.makedirs('./db/mocks', exist_ok=True)
+cassette = HttpCassette(HostEnum.MOCK, args.fixtures,
+                        HttpCassette.RECORD if args.record else HttpCassette.REPLAY,
+                        args.latency / 1000, args.jitter / 1000, args.seed)
+HttpClient.cassette = cassette
+if not args.record and not args.keep_rate_limits:
+    HttpClient.configure(rate_limits={ netloc: None for netloc in HttpClient.HOST_RATE_LIMITS },
+                         default_rate_limit=0)
+
+if args.engine == 'async':
+    scraper = AsyncScrapeCrunchyroll(HostEnum.MOCK)
+else:
+    scraper = ScrapeCrunchyroll(HostEnum.MOCK)
+scraper.skip_unchanged_items = False
+
+wall_start = time.perf_counter()
+cpu_start = time.process_time()
+scraper.run_scraper(args.start, args.end)
+wall = time.perf_counter() - wall_start
+cpu = time.process_time() - cpu_start
+summary = scraper.metrics.get_summary()
+
+print()
+print(f'engine       {args.engine}')
+print(f'items        {summary["items"]} ({summary["items_per_second"]}/s)')
+print(f'pages        {summary["pages"]}')
+print(f'wall time    {wall:.2f} s')
+print(f'cpu time     {cpu:.2f} s')
+print(f'peak rss     {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB')
+print(f'fixtures     {cassette.counts}')
+print(f'{"host":<26} {"verb":<7} {"requests":>8} {"mean ms":>9}  statuses')
+for http in summary['http']:
+    mean_ms = (http['mean_seconds'] or 0) * 1000
+    print(f'{http["host"]:<26} {http["method"]:<7} {http["count"]:>8} {mean_ms:>9.1f}  '
+          f'{http["statuses"]}')
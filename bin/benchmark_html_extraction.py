@@ -0,0 +1,65 @@
+'''
+Benchmarks the html extraction backends over saved fixture pages.
+
+Fixture pages are read from the fixture directory, named by page type, for example
+`listing-0.html`, `detail-9781974700001.html`, `isbn-9781974700001.html` or
+`barnes_and_noble-9781974700001.html`.  ./db/fixtures/html holds a sample page or two of
+every type, with the markup the scrapers read inside the usual page chrome, navigation,
+scripts and footer, and saved live pages can be added next to them.  For every page type and
+backend this reports the mean parse time, the peak python memory allocated while parsing, and
+the size of the parsed tree.
+'''
+
+import argparse
+import glob
+import os
+import resource
+import time
+import tracemalloc
+
+from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.util.html_extractor import HtmlExtractor
+
+parser = argparse.ArgumentParser(description='Benchmark the html extraction backends.')
+parser.add_argument('--fixtures', default='./db/fixtures/html',
+                    help='directory of saved html pages named <page type>-<id>.html')
+parser.add_argument('--repeat', type=int, default=5, help='parses per page and backend')
+args = parser.parse_args()
+
+backends = [
+    ('html.parser', False),
+    ('html.parser', True),
+    *([('lxml', False), ('lxml', True)] if HtmlExtractor.get_default_parser() == 'lxml' else [])
+]
+
+print(f'{"page type":<18} {"parser":<12} {"strained":<9} {"pages":>5} '
+      f'{"ms/page":>9} {"peak KB":>9} {"nodes":>7}')
+for page_type in PageTypeEnum:
+    pages = []
+    for file_path in sorted(glob.glob(os.path.join(args.fixtures, page_type.value + '-*.html'))):
+        with open(file_path, 'r', encoding='UTF-8') as page_file:
+            pages.append(page_file.read())
+    if len(pages) == 0:
+        continue
+
+    for parser_name, strained in backends:
+        extractor = HtmlExtractor(HostEnum.LOCAL, parser_name, strained)
+        elapsed = 0.0
+        peak = 0
+        nodes = 0
+        for html in pages:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                soup = extractor.parse(html, page_type)
+                elapsed += time.perf_counter() - start
+            tracemalloc.start()
+            soup = extractor.parse(html, page_type)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            nodes += len(soup.find_all(True))
+        ms_per_page = elapsed / (len(pages) * args.repeat) * 1000
+        print(f'{page_type.value:<18} {parser_name:<12} {str(strained):<9} {len(pages):>5} '
+              f'{ms_per_page:>9.2f} {peak / 1024:>9.0f} {nodes // len(pages):>7}')
+
+print(f'max rss: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')
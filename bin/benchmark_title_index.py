@@ -0,0 +1,93 @@
+'''
+Benchmarks the local title index against scoring every known title with difflib, the way
+SeriesSearch.calculate_confidence scores titles, and checks both against the precision
+corpus of series names.
+
+The corpus holds the known series, with their title, associated titles and MangaUpdates
+category, and the series names to match, with the MangaUpdates category searched in and the
+series id they should match, or null if they should not match any known series.
+'''
+
+import argparse
+import difflib
+import json
+import sys
+import time
+
+from src.manga.title_index import TitleIndex
+
+parser = argparse.ArgumentParser(description='Benchmark the title index.')
+parser.add_argument('--corpus', default='./db/fixtures/series_title_corpus.json',
+                    help='precision corpus of known series and the names they should match')
+parser.add_argument('--repeat', type=int, default=200, help='passes over the names')
+parser.add_argument('--scale', type=int, default=50,
+                    help='copies of the known series indexed, to match against a larger index')
+parser.add_argument('--min-confidence', type=float, default=0.85,
+                    help='score a title must reach to match')
+args = parser.parse_args()
+
+
+class DifflibMatcher:
+    '''Scores every known title against the name with difflib on lowercased strings.'''
+
+    def __init__(self, min_confidence: float):
+        self.min_confidence = min_confidence
+        self.titles: list[tuple[str, str, str]] = []
+
+    def add(self, series: dict):
+        for title in [series['title'], *series['associated_titles']]:
+            self.titles.append((title.lower(), series['series_id'], series['category'].lower()))
+
+    def match(self, series_name: str, category: str):
+        best = None
+        for title, series_id, title_category in self.titles:
+            if title_category != category:
+                continue
+            confidence = difflib.SequenceMatcher(None, series_name.lower(), title).ratio()
+            if best is None or confidence > best['series_match_confidence']:
+                best = { 'series_id': series_id, 'series_match_confidence': confidence }
+        if best is None or best['series_match_confidence'] < self.min_confidence:
+            return None
+        return best
+
+
+with open(args.corpus, 'r', encoding='UTF-8') as corpus_file:
+    corpus = json.load(corpus_file)
+queries = corpus['queries']
+
+exit_code = 0
+for label, matcher in [
+    ('difflib', DifflibMatcher(args.min_confidence)),
+    ('index', TitleIndex(args.min_confidence))
+]:
+    for series in corpus['series']:
+        matcher.add(series)
+
+    matched = correct = 0
+    for query in queries:
+        match = matcher.match(query['series_name'], query['category'])
+        series_id = match['series_id'] if match is not None else None
+        matched += series_id is not None
+        correct += series_id is not None and series_id == query['series_id']
+        if series_id != query['series_id']:
+            print(f'{label} MISMATCH:', json.dumps(query), json.dumps(match))
+    expected = len([query for query in queries if query['series_id'] is not None])
+    precision = correct / matched if matched > 0 else 1
+    recall = correct / expected if expected > 0 else 1
+
+    # ? copies of the known series under other ids, so matching scales like a full index
+    for copy in range(1, args.scale):
+        for series in corpus['series']:
+            matcher.add({ **series, 'series_id': series['series_id'] + '-' + str(copy) })
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for query in queries:
+            matcher.match(query['series_name'], query['category'])
+    elapsed = time.perf_counter() - start
+    print(f'{label:<8} precision {precision:.3f} recall {recall:.3f} '
+          f'{len(queries) * args.repeat / elapsed:>10,.0f} matches/s '
+          f'against {len(corpus["series"]) * args.scale} series')
+    if label == 'index' and precision < 1:
+        exit_code = 1
+
+sys.exit(exit_code)
@@ -0,0 +1,107 @@
+'''
+Benchmarks the compiled title parser against the legacy volume and name parsing, and checks
+it against the regression corpus of Crunchyroll display names.
+
+Every corpus entry holds the display name, its Crunchyroll category, the category form used
+for name parsing, and the volume and name the legacy parsing returns for it.
+'''
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from src.manga.title_parser import TitleParser
+
+parser = argparse.ArgumentParser(description='Benchmark the title parser.')
+parser.add_argument('--corpus', default='./db/fixtures/title_corpus.json',
+                    help='regression corpus of display names and their expected parsing')
+parser.add_argument('--repeat', type=int, default=200, help='passes over the corpus')
+args = parser.parse_args()
+
+
+def legacy_parse_volume(display_name: str, category: str):
+    '''The ScrapeCrunchyroll.parse_volume the title parser replaced.'''
+    search_volume = re.search(r' [()]?Volume[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    if search_volume:
+        inner_volume = re.search(r'\d+\.?\-?\d*', search_volume.group(0))
+        if inner_volume:
+            return inner_volume.group(0)
+    search_vol = re.search(r' [()]?Vol[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    if search_vol:
+        inner_vol = re.search(r'\d+\.?\-?\d*', search_vol.group(0))
+        if inner_vol:
+            return inner_vol.group(0)
+    search_vol_dot = re.search(r' [()]?Vol.[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    if search_vol_dot:
+        inner_vol_dot = re.search(r'\d+\.?\-?\d*', search_vol_dot.group(0))
+        if inner_vol_dot:
+            return inner_vol_dot.group(0)
+    search_gn = re.search(r' [()]?Graphic Novel[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    if search_gn:
+        inner_gn = re.search(r'\d+\.?\-?\d*', search_gn.group(0))
+        if inner_gn:
+            return inner_gn.group(0)
+    search_box = re.search(r' [()]?Box Set[()]? \d+\.?\-?\d*', display_name)
+    if search_box:
+        inner_box = re.search(r'\d+\.?\-?\d*', search_box.group(0))
+        if inner_box:
+            return inner_box.group(0)
+    search_any = re.search(r' [()]?' + category + r'[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    if search_any:
+        inner_any = re.search(r'\d+\.?\-?\d*', search_any.group(0))
+        if inner_any:
+            return inner_any.group(0)
+    return None
+
+
+def legacy_parse_name(display_name: str, form: str):
+    '''The MangaEnricher.parse_name the title parser mirrors.'''
+    is_box_set = False
+    if re.search(r' [()]?Volume[a-z]?[()]? \d+\.?\-?\d*', display_name):
+        name_split = re.split(r' [()]?Volume[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    elif re.search(r' [()]?Vol[a-z]?[()]? \d+\.?\d*', display_name):
+        name_split = re.split(r' [()]?Vol[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    elif re.search(r' [()]?Graphic Novel[a-z]?[()]? \d+\.?\-?\d*', display_name):
+        name_split = re.split(r' [()]?Graphic Novel[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    elif re.search(r' [()]?Box Set[()]? \d+\.?\-?\d*', display_name):
+        name_split = re.split(r' [()]?Box Set[()]? \d+\.?\-?\d*', display_name)
+        name_split[0] += ' Box Set'
+        is_box_set = True
+    else:
+        name_split = re.split(r' [()]?' + form + r'[a-z]?[()]? \d+\.?\-?\d*', display_name)
+    name = ''.join(name_split)
+    if not is_box_set:
+        name = name.replace(' ' + form, '')
+    return name
+
+
+with open(args.corpus, 'r', encoding='UTF-8') as corpus_file:
+    corpus = json.load(corpus_file)
+
+title_parser = TitleParser()
+failures = [
+    entry for entry in corpus
+    if title_parser.parse_volume(entry['display_name'], entry['category']) != entry['volume']
+    or title_parser.parse_name(entry['display_name'], entry['form']) != entry['name']
+]
+for entry in failures:
+    print('MISMATCH:', json.dumps(entry),
+          title_parser.parse_volume(entry['display_name'], entry['category']),
+          title_parser.parse_name(entry['display_name'], entry['form']))
+print(f'corpus: {len(corpus) - len(failures)}/{len(corpus)} entries match')
+
+for label, parse_volume, parse_name in [
+    ('legacy', legacy_parse_volume, legacy_parse_name),
+    ('compiled', title_parser.parse_volume, title_parser.parse_name)
+]:
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for entry in corpus:
+            parse_volume(entry['display_name'], entry['category'])
+            parse_name(entry['display_name'], entry['form'])
+    elapsed = time.perf_counter() - start
+    print(f'{label:<9} {len(corpus) * args.repeat / elapsed:>12,.0f} titles/s')
+
+sys.exit(1 if len(failures) > 0 else 0)
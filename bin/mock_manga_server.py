@@ -0,0 +1,227 @@
+"""
+In-memory stand-in for the manga server REST API, to run the scraper without the
+Phoenix/Postgres stack.
+
+Serves the /api/volume, /api/series, /api/bundle, /api/shop and /api/market resources
+(index, show, create, update, delete) and their bulk writes like the manga server, including
+its ?ids= filter of the index and its 404 response when a record is not found.  Every request
+can be delayed by a latency with jitter, and fail with a 503 at the given rate, before it
+touches the store.
+
+Round trips are counted per resource and action.  GET /_stats returns them, DELETE /_stats
+resets them, and they are printed when the server stops.
+
+    python mock_manga_server.py --latency 20 --jitter 10 --failure-rate 0.01
+"""
+
+import argparse
+import atexit
+import json
+import random
+import signal
+import sys
+import threading
+import time
+from flask import Flask, jsonify, request, make_response
+
+from src.database.in_memory_manga_store import InMemoryMangaStore
+
+parser = argparse.ArgumentParser(description="In-memory stand-in for the manga server.")
+parser.add_argument("--port", type=int, default=4000, help="port to listen on")
+parser.add_argument("--latency", type=float, default=0,
+                    help="milliseconds every request is delayed by")
+parser.add_argument("--jitter", type=float, default=0,
+                    help="max random milliseconds added on top of the latency")
+parser.add_argument("--failure-rate", type=float, default=0,
+                    help="fraction of requests answered with a 503")
+parser.add_argument("--seed", type=int, default=0, help="seed of the jitter and failures")
+parser.add_argument("--load", help="json file of records per item type to start with")
+parser.add_argument("--save", help="json file to write the records to when the server stops")
+args = parser.parse_args()
+
+app = Flask(__name__)
+store = InMemoryMangaStore()
+rng = random.Random(args.seed)
+lock = threading.Lock()
+round_trips = {}
+
+if args.load:
+    with open(args.load, "r", encoding="UTF-8") as load_file:
+        store.load(json.load(load_file))
+
+def not_found():
+    """
+    Responds like the manga server when a record is missing.
+    """
+    return make_response({ "errors": { "detail": "Not Found" } }, 404)
+
+@app.before_request
+def simulate_network():
+    """
+    Counts the round trip, then delays it and fails it at random as configured.
+    """
+    if not request.path.startswith("/api/") or \
+        request.path.split("/")[2] not in InMemoryMangaStore.KEYS:
+        return None
+    action = "bulk" if request.path.endswith("/bulk") else {
+        "GET": "show" if request.view_args and "item_id" in request.view_args else "index",
+        "POST": "create",
+        "PUT": "update",
+        "PATCH": "update",
+        "DELETE": "delete"
+    }.get(request.method, request.method)
+    item_type = request.path.split("/")[2]
+    with lock:
+        key = f"{item_type} {action}"
+        round_trips[key] = round_trips.get(key, 0) + 1
+        delay = (args.latency + rng.uniform(0, args.jitter)) / 1000
+        failed = rng.random() < args.failure_rate
+    if delay > 0:
+        time.sleep(delay)
+    if failed:
+        return make_response({ "errors": { "detail": "Service Unavailable" } }, 503)
+    return None
+
+def check_item_type(item_type: str):
+    """
+    Aborts with a 404 for a resource the manga server does not serve.
+    """
+    if item_type not in InMemoryMangaStore.KEYS:
+        return make_response({ "errors": { "detail": "Not Found" } }, 404)
+    return None
+
+@app.route("/api/<item_type>", methods=["GET"])
+def index(item_type: str):
+    """
+    Lists every record of the resource, or like the manga server only those with the ids in
+    ?ids=a,b,c, or for shops the isbns in ?isbns=a,b,c.
+    """
+    error = check_item_type(item_type)
+    if error is not None:
+        return error
+    if "ids" in request.args:
+        return jsonify(store.index(item_type, InMemoryMangaStore.KEYS[item_type],
+                                   request.args["ids"].split(",")))
+    if "isbns" in request.args and item_type == "shop":
+        return jsonify(store.index(item_type, "isbn", request.args["isbns"].split(",")))
+    return jsonify(store.index(item_type))
+
+@app.route("/api/<item_type>/<item_id>", methods=["GET"])
+def show(item_type: str, item_id: str):
+    """
+    Gets a record of the resource by its id.
+    """
+    error = check_item_type(item_type)
+    if error is not None:
+        return error
+    item = store.show(item_type, item_id)
+    return jsonify(item) if item is not None else not_found()
+
+@app.route("/api/<item_type>", methods=["POST"])
+def create(item_type: str):
+    """
+    Creates a record of the resource from the body { item_type: record }.
+    """
+    error = check_item_type(item_type)
+    if error is not None:
+        return error
+    item = store.create(item_type, request.get_json(force=True)[item_type])
+    if item is None:
+        key = InMemoryMangaStore.KEYS[item_type]
+        return make_response({ "errors": { key: ["has already been taken"] } }, 422)
+    return make_response(jsonify(item), 201)
+
+@app.route("/api/<item_type>/bulk", methods=["POST"])
+def bulk(item_type: str):
+    """
+    Applies the creates, updates and upserts of the body { writes: [{ action, id, item }] } in
+    order, answering with the result of each, with the action an upsert took.
+    """
+    error = check_item_type(item_type)
+    if error is not None:
+        return error
+    key = InMemoryMangaStore.KEYS[item_type]
+    results = []
+    for write in request.get_json(force=True)["writes"]:
+        action = write.get("action")
+        if action == "create":
+            item_id = write["item"].get(key)
+            errors = None if store.create(item_type, write["item"]) is not None \
+                else { key: ["has already been taken"] }
+        elif action == "update":
+            item_id = write["id"]
+            errors = None if store.update(item_type, item_id, write["item"]) is not None \
+                else { "id": ["not found"] }
+        elif action == "upsert":
+            item_id = write.get("id") or write["item"].get(key)
+            errors = None if item_id is not None else { key: ["can't be blank"] }
+            if errors is None:
+                action = "create" if store.upsert(item_type, item_id, write["item"]) else "update"
+        else:
+            item_id = write.get("id")
+            errors = { "action": ["invalid"] }
+        results.append({ "id": item_id, "action": action, "status": "ok" } if errors is None
+                       else { "id": item_id, "action": action, "status": "error",
+                              "errors": errors })
+    return jsonify({ "results": results })
+
+@app.route("/api/<item_type>/<item_id>", methods=["PUT", "PATCH"])
+def update(item_type: str, item_id: str):
+    """
+    Updates a record of the resource from the body { item_type: fields }.
+    """
+    error = check_item_type(item_type)
+    if error is not None:
+        return error
+    item = store.update(item_type, item_id, request.get_json(force=True)[item_type])
+    return jsonify(item) if item is not None else not_found()
+
+@app.route("/api/<item_type>/<item_id>", methods=["DELETE"])
+def delete(item_type: str, item_id: str):
+    """
+    Deletes a record of the resource.
+    """
+    error = check_item_type(item_type)
+    if error is not None:
+        return error
+    if not store.delete(item_type, item_id):
+        return not_found()
+    return jsonify({ "success": True })
+
+@app.route("/_stats", methods=["GET"])
+def get_stats():
+    """
+    Gets the number of round trips per resource and action, and the records per resource.
+    """
+    with lock:
+        trips = dict(sorted(round_trips.items()))
+    return jsonify({
+        "round_trips": trips,
+        "total_round_trips": sum(trips.values()),
+        "records": { item_type: len(items) for item_type, items in store.dump().items() }
+    })
+
+@app.route("/_stats", methods=["DELETE"])
+def reset_stats():
+    """
+    Resets the round trip counters.
+    """
+    with lock:
+        round_trips.clear()
+    return jsonify({ "success": True })
+
+@atexit.register
+def report():
+    """
+    Prints the round trip counters and saves the records, if asked to, when the server stops.
+    """
+    print(json.dumps({ "round_trips": dict(sorted(round_trips.items())) }, indent=4))
+    if args.save:
+        with open(args.save, "w", encoding="UTF-8") as save_file:
+            json.dump(store.dump(), save_file, indent=4, separators=(",", ": "))
+
+# ? stopping the server from a load test script sends a SIGTERM, which skips atexit
+signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=args.port, threaded=True)
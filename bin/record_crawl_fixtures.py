@@ -0,0 +1,75 @@
+'''
+Records the http fixtures benchmark_crawl.py replays, from a live crawl of the store sites and
+MangaUpdates.
+
+The fixtures hold live pages, so they are not committed, and have to be recorded once on
+every machine the benchmark runs on, with network access:
+
+    python record_crawl_fixtures.py --end 200
+    python benchmark_crawl.py --end 200 --latency 50 --jitter 20
+
+The crawl writes its records to the in-memory mock manga server, which is started on the
+manga server's port for the recording and stopped after it, so the writes are recorded
+without touching a real database.  Replays must cover the same --start and --end, or the
+items outside them are missing from the fixtures.
+'''
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import requests
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+
+parser = argparse.ArgumentParser(description='Record the http fixtures of the crawl benchmark.')
+parser.add_argument('--fixtures', default=FilePathEnum.HTTP_FIXTURES.value[HostEnum.MOCK.value],
+                    help='directory to record the responses into')
+parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                    help='run the scraper with a thread pool or a single asyncio event loop')
+parser.add_argument('--start', type=int, default=0, help='offset of the first listing item')
+parser.add_argument('--end', type=int, default=200, help='offset of the listing item to stop before')
+parser.add_argument('--keep', action='store_true',
+                    help='add to the fixtures already recorded instead of replacing them')
+parser.add_argument('--timeout', type=float, default=30,
+                    help='seconds to wait for the mock manga server to start')
+args = parser.parse_args()
+
+bin_path = os.path.dirname(os.path.abspath(__file__))
+manga_server_url = FilePathEnum.MANGA_SERVER.value[HostEnum.MOCK.value]
+
+if os.path.isdir(args.fixtures) and not args.keep:
+    print(f'Removing the fixtures recorded before in {args.fixtures}')
+    shutil.rmtree(args.fixtures)
+
+os.makedirs('./logs', exist_ok=True)
+manga_server = subprocess.Popen([sys.executable, os.path.join(bin_path, 'mock_manga_server.py')],
+                                env={ **os.environ, 'PYTHONPATH': bin_path })
+try:
+    deadline = time.monotonic() + args.timeout
+    while True:
+        try:
+            requests.get(f'{manga_server_url}/market', timeout=1)
+            break
+        except requests.exceptions.ConnectionError:
+            if manga_server.poll() is not None or time.monotonic() >= deadline:
+                sys.exit('The mock manga server did not start, is port 4000 already in use?')
+            time.sleep(0.2)
+
+    recording = subprocess.run(
+        [sys.executable, os.path.join(bin_path, 'benchmark_crawl.py'), '--record',
+         '--fixtures', args.fixtures, '--engine', args.engine,
+         '--start', str(args.start), '--end', str(args.end)],
+        env={ **os.environ, 'PYTHONPATH': bin_path }, check=False
+    )
+finally:
+    manga_server.terminate()
+    manga_server.wait()
+
+fixture_count = sum(len(files) for _, _, files in os.walk(args.fixtures))
+print(f'Recorded {fixture_count} responses into {args.fixtures}')
+sys.exit(recording.returncode)
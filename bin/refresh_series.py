@@ -0,0 +1,25 @@
+import argparse
+import sys
+
+from src.manga.series_refresher import SeriesRefresher
+from src.util.manga_logger import MangaLogger
+from src.enums.host_enum import HostEnum
+
+parser = argparse.ArgumentParser(description='Refresh the series in the manga server from the '
+                                 'MangaUpdates API, apart from crawls.')
+parser.add_argument('--series', nargs='+', default=None,
+                    help='ids of the series to refresh, defaults to every series')
+parser.add_argument('--workers', type=int, default=8,
+                    help='number of series fetched at once')
+parser.add_argument('--batch-size', type=int, default=100,
+                    help='number of series per bulk request')
+args = parser.parse_args()
+
+refresher = SeriesRefresher(HostEnum.LOCAL, args.workers, args.batch_size)
+refreshed = refresher.refresh(args.series)
+
+logger = MangaLogger(HostEnum.LOCAL).register_logger(__name__)
+logger.info('-----------------------------------------------------------------------------')
+logger.info('---------------------------------PROCESS END---------------------------------')
+logger.info('-----------------------------------------------------------------------------')
+sys.exit(0 if refreshed else 1)
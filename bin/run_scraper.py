@@ -1,9 +1,38 @@
+import argparse
+
 from src.util.manga_logger import MangaLogger
+from src.manga.async_scrape_crunchyroll import AsyncScrapeCrunchyroll
 from src.manga.scrape_crunchyroll import ScrapeCrunchyroll
 from src.enums.host_enum import HostEnum
 
-manga_enricher = ScrapeCrunchyroll(HostEnum.LOCAL)
-manga_enricher.run_scraper()
+parser = argparse.ArgumentParser(description='Scrape the Crunchyroll store for manga data.')
+parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                    help='run the scraper with a thread pool or a single asyncio event loop')
+parser.add_argument('--incremental', action='store_true',
+                    help='stop paging once the newest items from the last crawl are reached')
+parser.add_argument('--start', type=int, default=0,
+                    help='offset of the first listing item to scrape')
+parser.add_argument('--end', type=int, default=10000000000,
+                    help='offset of the listing item to stop before')
+parser.add_argument('--resume', action='store_true',
+                    help='continue the last run that did not finish from its journal, '
+                    'its start and end offsets take the place of --start and --end')
+parser.add_argument('--dry-run', action='store_true',
+                    help='record every write to a change set instead of sending it to the '
+                    'manga server, apply it later with apply_change_set.py')
+parser.add_argument('--change-set', default=None,
+                    help='path of the change set a dry run records, defaults to '
+                    'db/change_set.ndjson')
+args = parser.parse_args()
+
+if args.engine == 'async':
+    manga_enricher = AsyncScrapeCrunchyroll(HostEnum.LOCAL)
+else:
+    manga_enricher = ScrapeCrunchyroll(HostEnum.LOCAL)
+manga_enricher.incremental = args.incremental
+manga_enricher.dry_run = args.dry_run
+manga_enricher.change_set_path = args.change_set
+manga_enricher.run_scraper(args.start, args.end, args.resume)
 
 logger = MangaLogger(HostEnum.LOCAL).register_logger(__name__)
 logger.info('-----------------------------------------------------------------------------')
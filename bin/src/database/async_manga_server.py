@@ -0,0 +1,254 @@
+'''Module to interact with the manga server from the asyncio scrape engine.'''
+
+import asyncio
+import traceback
+
+import aiohttp
+
+from src.enums.host_enum import HostEnum
+from src.database.manga_server import MangaServerBase, MangaServerError, \
+    MangaServerUnavailableError
+from src.database.change_set import ChangeSet
+from src.database.server_index import ServerIndex
+from src.database.write_buffer import WriteBuffer
+from src.util.async_http_client import AsyncHttpClient
+from src.util.circuit_breaker import CircuitBreaker
+from src.util.http_client import HttpClient
+from src.util.scrape_metrics import ScrapeMetrics
+
+class AsyncMangaServer(MangaServerBase):
+    '''
+    A class used to interact with the manga server without blocking the event loop.
+    Mirrors the methods of `MangaServer`, sharing everything but the requests with it, see
+    `MangaServerBase`.
+    '''
+
+    def __init__(self, host: HostEnum, client: AsyncHttpClient,
+                 metrics: ScrapeMetrics | None = None, write_buffer: WriteBuffer | None = None,
+                 server_index: ServerIndex | None = None,
+                 circuit_breaker: CircuitBreaker | None = None,
+                 change_set: ChangeSet | None = None):
+        super().__init__(host, metrics, write_buffer, server_index, circuit_breaker, change_set)
+        self.flush_lock = asyncio.Lock()
+        self.flush_requested = asyncio.Event()
+        self.flusher: asyncio.Task | None = None
+        self.client = client
+
+    async def get_item(self, item_type: str, item_id: str):
+        '''Gets an item from the server index or the database, with buffered writes applied.'''
+        found, item, pending = self.get_local(item_type, item_id)
+        if found:
+            return item
+        item = await self.request('GET', f'{self.url}/{item_type}/{item_id}')
+        return self.apply_fetched(item_type, item_id, pending, item)
+
+    async def request(self, method: str, url: str, **kwargs):
+        '''
+        Makes a request to the manga server, through its circuit breaker if any, see
+        `MangaServer.request`.
+
+        Returns:
+        - dict: The decoded response body, or None if the record was not found.
+        '''
+        self.check_breaker(method, url)
+        try:
+            response = await self.client.request(method, url, raise_for_status=True, **kwargs)
+        except aiohttp.ClientResponseError as e:
+            if not self.check_status(method, url, e.status):
+                return None
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise self.get_request_error(method, url, e) from e
+        self.record_request(True)
+        return response
+
+    async def get_many(self, item_type: str, ids: list[str], filter_by: str = 'ids'):
+        '''Gets the items with the given ids from the database, see `MangaServer.get_many`.'''
+        try:
+            self.logger.info('Fetching %s %s by %s', str(len(ids)), item_type, filter_by)
+            items = []
+            for url in self.get_many_urls(self.url, item_type, ids, filter_by):
+                response = await self.request('GET', url)
+                if response is None:
+                    raise MangaServerError(f'{url} was not found')
+                items += response
+            return self.get_listed(item_type, ids, filter_by, items)
+        except Exception:
+            self.logger.warning('Error getting %s by %s', item_type, filter_by)
+            self.logger.warning(traceback.format_exc())
+            return None
+
+    async def get_all(self, item_type: str):
+        '''Gets every item of a type from the database, see `MangaServer.get_all`.'''
+        try:
+            self.logger.info('Fetching every %s', item_type)
+            response = await self.request('GET', f'{self.url}/{item_type}')
+            if response is None:
+                raise MangaServerError(f'{self.url}/{item_type} was not found')
+            return self.key_items(item_type, response)
+        except Exception:
+            self.logger.warning('Error getting every %s', item_type)
+            self.logger.warning(traceback.format_exc())
+            return None
+
+    async def load_index(self):
+        '''Loads the server index, see `MangaServer.load_index`.'''
+        if self.server_index is None:
+            return
+        self.server_index.start()
+        all_items = await asyncio.gather(*map(self.get_all, self.INDEX_ITEM_TYPES))
+        for item_type, items in zip(self.INDEX_ITEM_TYPES, all_items):
+            self.server_index.load(item_type, items)
+        isbns = self.server_index.get_shop_isbns()
+        if isbns is not None:
+            self.server_index.load('shop', await self.get_many('shop', isbns, 'isbns')
+                                   if len(isbns) > 0 else {})
+
+    async def create_item(self, item_type: str, item: dict, owners: list[str] | None = None):
+        '''Creates an item in the database, or buffers its creation.'''
+        if self.write_buffer is not None:
+            await self.buffer_write(item_type, item[self.ITEM_KEYS[item_type]],
+                                    WriteBuffer.CREATE, item, owners)
+            return item
+        try:
+            url = f'{self.url}/{item_type}'
+            body = { item_type: item }
+            self.logger.info('Creating at %s with %s', url, body)
+            response = await self.request('POST', url, json=body)
+            self.record_created(item_type, item)
+            return response
+        except Exception as e:
+            self.logger.error('Error creating %s', item_type)
+            self.logger.error(traceback.format_exc())
+            raise e
+
+    async def update_item(self, item_type: str, item_id: str, item: dict,
+                          owners: list[str] | None = None):
+        '''Updates an item in the database, or buffers its update.'''
+        if self.write_buffer is not None:
+            await self.buffer_write(item_type, item_id, WriteBuffer.UPDATE, item, owners)
+            return item
+        try:
+            self.logger.info('Updating %s: %s > %s', item_type, item_id, item)
+            response = await self.request('PUT', f'{self.url}/{item_type}/{item_id}',
+                                          json={ item_type: item })
+            if response is None:
+                raise RuntimeError(f'No {item_type} found: {item_id}')
+            self.record_updated(item_type, item_id, item)
+            return response
+        except Exception as e:
+            self.logger.error('Error updating %s: %s', item_type, item_id)
+            self.logger.error(traceback.format_exc())
+            raise e
+
+    async def upsert_item(self, item_type: str, item_id: str, item: dict,
+                          owners: list[str] | None = None):
+        '''Updates an item in the database if it exists, otherwise creates it, or buffers it.'''
+        await self.upsert_many(item_type, { item_id: item }, owners)
+        return item
+
+    async def upsert_many(self, item_type: str, items: dict[str, dict],
+                          owners: list[str] | None = None):
+        '''Upserts items in a single request, or buffers them, see `MangaServer.upsert_many`.'''
+        items = self.get_changes(item_type, items)
+        if len(items) == 0:
+            return
+        if self.write_buffer is not None:
+            for item_id, item in items.items():
+                await self.buffer_write(item_type, item_id, WriteBuffer.UPSERT, item, owners)
+            return
+        results = await self.bulk_write(item_type, self.get_upsert_writes(items))
+        self.record_upserted(item_type, items, results)
+
+    async def buffer_write(self, item_type: str, item_id: str, action: str, item: dict,
+                           owners: list[str] | None = None):
+        '''Buffers a write, and flushes it when due, see `MangaServer.buffer_write`.'''
+        self.add_write(item_type, item_id, action, item, owners)
+        if self.flusher is not None:
+            # ? waking the flusher only costs it a look at the buffer, on this same loop
+            self.flush_requested.set()
+        elif self.write_buffer.should_flush():
+            await self.flush_writes(wait=False)
+
+    def start_flusher(self):
+        '''Starts the task flushing the write buffer whenever it is due, on the running loop.'''
+        if self.write_buffer is None or self.flusher is not None:
+            return
+        self.flush_requested.clear()
+        self.flusher = asyncio.create_task(self.__run_flusher())
+
+    async def stop_flusher(self):
+        '''Stops the flusher task, waiting for the flush it is sending, if any.'''
+        if self.flusher is None:
+            return
+        flusher = self.flusher
+        self.flusher = None
+        self.flush_requested.set()
+        await flusher
+
+    async def __run_flusher(self):
+        while self.flusher is not None:
+            try:
+                await asyncio.wait_for(self.flush_requested.wait(),
+                                       self.write_buffer.get_flush_delay())
+            except asyncio.TimeoutError:
+                pass
+            self.flush_requested.clear()
+            if self.flusher is not None and self.write_buffer.should_flush():
+                try:
+                    await self.flush_writes()
+                except Exception:
+                    self.logger.error('Error flushing the buffered writes')
+                    self.logger.error(traceback.format_exc())
+
+    async def flush_writes(self, wait: bool = True):
+        '''Sends the buffered writes in bulk, see `MangaServer.flush_writes`.'''
+        if self.write_buffer is None or (not wait and self.flush_lock.locked()):
+            return
+        async with self.flush_lock:
+            batches = self.write_buffer.take_batches()
+            for index, (item_type, writes) in enumerate(batches):
+                try:
+                    results = await self.bulk_write(item_type, writes)
+                except MangaServerError:
+                    self.requeue_unsent(batches[index:])
+                    return
+                self.finish_flushed(item_type, writes, results)
+
+    async def bulk_write(self, item_type: str, writes: list[dict]) -> list[dict] | None:
+        '''Sends writes of items of one type in a single request, see `MangaServer.bulk_write`.'''
+        if self.change_set is not None:
+            return self.record_writes(item_type, writes)
+        retries = self.get_bulk_retries(writes)
+        try:
+            self.logger.info('Writing %s %s in bulk', str(len(writes)), item_type)
+            for attempt in range(retries + 1):
+                try:
+                    response = await self.request('POST', f'{self.url}/{item_type}/bulk',
+                                                  json={ 'writes': writes })
+                    break
+                except MangaServerUnavailableError:
+                    raise
+                except MangaServerError:
+                    if attempt >= retries:
+                        raise
+                    self.logger.warning('Retrying %s %s in bulk after attempt %s failed',
+                                        str(len(writes)), item_type, attempt + 1)
+                    await asyncio.sleep(HttpClient.get_backoff_seconds(attempt))
+            return self.get_bulk_results(item_type, response)
+        except MangaServerError as e:
+            self.record_bulk_error(item_type, writes, e)
+            raise
+        except Exception as e:
+            self.record_bulk_error(item_type, writes, e)
+            return None
+
+    async def delete_item(self, item_type: str, item_id: str):
+        '''Deletes an item from the database.'''
+        try:
+            self.logger.info('Deleting %s: %s', item_type, item_id)
+            return await self.request('DELETE', f'{self.url}/{item_type}/{item_id}')
+        except Exception as e:
+            self.logger.error('Error deleting %s: %s', item_type, item_id)
+            self.logger.error(traceback.format_exc())
+            raise e
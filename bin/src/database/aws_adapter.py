@@ -8,6 +8,7 @@ from src.interfaces.icollection import ICollection
 from src.interfaces.iwishlist import IWishlist
 from src.enums.file_path_enum import FilePathEnum
 from src.enums.host_enum import HostEnum
+from src.util.http_client import HttpClient
 from src.util.local_dao import LocalDAO
 from src.util.manga_logger import MangaLogger
 
@@ -16,6 +17,7 @@ class AWSAdapter:
 
     def __init__(self, host: HostEnum) -> None:
         self.logger = MangaLogger(host).register_logger(__name__)
+        self.http_client = HttpClient(host)
         vault = LocalDAO(host).open_file(FilePathEnum.VAULT.value[host.value])
         self.collection_host = vault['aws_collection_host']
         self.collection_api_key = vault['aws_collection_api_key']
@@ -27,7 +29,7 @@ class AWSAdapter:
     def __call_collection_gql(self, graphql: str, variables: dict | None = None
                               ) -> requests.Response:
         start = datetime.now()
-        response = requests.post(
+        response = self.http_client.post(
             url = 'https://' + self.collection_host + '/graphql',
             json = {
                 'query': graphql,
@@ -37,8 +39,7 @@ class AWSAdapter:
                 'Content-type': 'application/graphql',
                 'x-api-key': self.collection_api_key,
                 'host': self.collection_host
-            },
-            timeout=30
+            }
         )
         end = (datetime.now() - start).total_seconds()
         self.logger.info('Time to call collection data from AWS: %s', str(timedelta(seconds=end)))
@@ -176,7 +177,7 @@ class AWSAdapter:
     def __call_user_list_gql(self, graphql: str, variables: dict | None = None
                              ) -> requests.Response:
         start = datetime.now()
-        response = requests.post(
+        response = self.http_client.post(
             url = 'https://' + self.user_list_host + '/graphql',
             json = {
                 'query': graphql,
@@ -186,8 +187,7 @@ class AWSAdapter:
                 'Content-type': 'application/graphql',
                 'x-api-key': self.user_list_api_key,
                 'host': self.user_list_host
-            },
-            timeout=30
+            }
         )
         end = (datetime.now() - start).total_seconds()
         self.logger.info('Time to call user list data from AWS: %s', str(timedelta(seconds=end)))
@@ -0,0 +1,118 @@
+'''Change set file recording the manga server writes of a dry run.'''
+
+import json
+import os
+import threading
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class ChangeSet:
+    '''
+    A class used to record the writes a dry run would send to the manga server, so crawling
+    and loading can run apart and the writes can be inspected before they are applied.
+
+    The change set is an NDJSON file with one compact json write per line, flushed as each
+    batch is written, so a crash keeps every batch before it.  A line holds the item type,
+    action, id and fields of a write, as `WriteBuffer` batches them for the bulk endpoint.
+    The scraper only upserts, so applying a change set again after a failure is safe.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    file_path : str
+        the path of the change set file
+
+    Methods
+    -------
+    start(file_path=str)
+        Starts a new change set file, replacing the last one.
+    write(item_type=str, writes=list)
+        Records a batch of writes.
+    close()
+        Closes the change set file.
+    read(file_path=str)
+        Reads the writes of a change set file.
+    '''
+
+    def __init__(self, host: HostEnum):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.file_path = FilePathEnum.CHANGE_SET.value[host.value]
+        self.lock = threading.Lock()
+        self.change_file = None
+        self.count = 0
+
+    def start(self, file_path: str | None = None):
+        '''
+        Starts a new change set file, replacing the last one.
+
+        Parameters:
+        - file_path (str): The path of the change set file, or None for the default one.
+        '''
+        with self.lock:
+            if self.change_file is not None:
+                self.change_file.close()
+            self.file_path = file_path or self.file_path
+            os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+            self.change_file = open(self.file_path, 'w', encoding='UTF-8')
+            self.count = 0
+        self.logger.info('Recording writes to change set %s', self.file_path)
+
+    def write(self, item_type: str, writes: list[dict]):
+        '''
+        Records a batch of writes.
+
+        Parameters:
+        - item_type (str): The type of the records, ex: 'volume'.
+        - writes (list[dict]): The writes, with their action, id and fields.
+        '''
+        lines = ''.join(
+            json.dumps({ 'type': item_type, **write }, separators=(',', ':')) + '\n'
+            for write in writes
+        )
+        with self.lock:
+            if self.change_file is None:
+                raise RuntimeError('Change set is not started')
+            self.change_file.write(lines)
+            self.change_file.flush()
+            self.count += len(writes)
+
+    def close(self):
+        '''Closes the change set file.'''
+        with self.lock:
+            if self.change_file is None:
+                return
+            self.change_file.close()
+            self.change_file = None
+        self.logger.info('Recorded %s writes to change set %s', str(self.count), self.file_path)
+
+    def read(self, file_path: str | None = None) -> list[dict]:
+        '''
+        Reads the writes of a change set file.
+
+        Parameters:
+        - file_path (str): The path of the change set file, or None for the default one.
+
+        Returns:
+        - list[dict]: The writes in order, with their type, action, id and fields.
+        '''
+        file_path = file_path or self.file_path
+        writes = []
+        with open(file_path, 'r', encoding='UTF-8') as change_file:
+            for line in change_file:
+                try:
+                    writes.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # ? the last line may be cut short by a crash
+                    self.logger.warning('Skipping unreadable change set line: %s', line)
+        self.logger.info('Read %s writes from change set %s', str(len(writes)), file_path)
+        return writes
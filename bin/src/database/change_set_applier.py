@@ -0,0 +1,115 @@
+'''Module to apply a change set recorded by a dry run to the manga server.'''
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from src.database.change_set import ChangeSet
+from src.database.manga_server import MangaServer, MangaServerError, \
+    MangaServerUnavailableError
+from src.database.write_buffer import WriteBuffer
+from src.enums.host_enum import HostEnum
+from src.util.circuit_breaker import CircuitBreaker
+from src.util.manga_logger import MangaLogger
+
+class ChangeSetApplier:
+    '''
+    A class used to apply a change set recorded by a dry run to the manga server, apart from
+    the crawl, in bulk requests sent by parallel workers.
+
+    The writes are first merged per record in a `WriteBuffer`, so a record written by several
+    batches of the run is sent once.  Item types are applied one after the other in
+    `WriteBuffer.FLUSH_ORDER`, records before the ones referencing them, and the writes of an
+    item type are split into bulk requests of `batch_size` sent by `worker_count` workers.
+    Workers wait while the circuit breaker of the manga server is open, and the writes not
+    sent once it gives up are reported with the ones the manga server rejected.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    worker_count : int
+        The number of bulk requests sent at once
+    batch_size : int
+        The number of writes per bulk request
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    change_set : ChangeSet
+        the change set file the writes are read from
+    write_buffer : WriteBuffer
+        the writes merged per record, and the ones that failed
+    circuit_breaker : CircuitBreaker
+        pauses the workers while the manga server is unavailable
+    manga_server : MangaServer
+        the manga server the writes are sent to
+
+    Methods
+    -------
+    apply(file_path=str)
+        Applies a change set to the manga server.
+    '''
+
+    def __init__(self, host: HostEnum, worker_count: int = 8, batch_size: int = 500):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.worker_count = worker_count
+        self.batch_size = batch_size
+        self.change_set = ChangeSet(host)
+        self.write_buffer = WriteBuffer(host)
+        self.circuit_breaker = CircuitBreaker(host, 'Manga server')
+        self.manga_server = MangaServer(host, circuit_breaker=self.circuit_breaker)
+
+    def apply(self, file_path: str | None = None) -> bool:
+        '''
+        Applies a change set to the manga server.
+
+        Parameters:
+        - file_path (str): The path of the change set file, or None for the default one.
+
+        Returns:
+        - bool: True if every write was saved.
+        '''
+        self.write_buffer.start()
+        self.circuit_breaker.start()
+        for write in self.change_set.read(file_path):
+            self.write_buffer.add(write['type'], write['id'], write['action'], write['item'])
+
+        for item_type, writes in self.write_buffer.take_batches():
+            batches = [
+                writes[index:index + self.batch_size]
+                for index in range(0, len(writes), self.batch_size)
+            ]
+            self.logger.info('Applying %s %s in %s bulk requests', str(len(writes)), item_type,
+                             str(len(batches)))
+            with ThreadPoolExecutor(self.worker_count) as executor:
+                list(executor.map(self.send_batch, [item_type] * len(batches), batches))
+
+        errors = self.write_buffer.report()
+        return len(errors) == 0
+
+    def send_batch(self, item_type: str, writes: list[dict]):
+        '''
+        Sends a batch of writes in a single bulk request, retrying it once the circuit breaker
+        lets requests through again, and puts it back in the write buffer if it cannot be sent.
+
+        Parameters:
+        - item_type (str): The type of the records.
+        - writes (list[dict]): The writes, with their action, id and fields.
+        '''
+        while not self.circuit_breaker.has_given_up():
+            wait_seconds = self.circuit_breaker.get_wait_seconds()
+            if wait_seconds > 0:
+                time.sleep(min(wait_seconds, 1))
+                continue
+            try:
+                results = self.manga_server.bulk_write(item_type, writes)
+            except MangaServerUnavailableError:
+                continue
+            except MangaServerError:
+                break
+            self.write_buffer.finish_batch(item_type, writes, results)
+            return
+        self.write_buffer.requeue(item_type, writes)
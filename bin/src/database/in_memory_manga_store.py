@@ -0,0 +1,194 @@
+'''In-memory store mirroring the resources of the manga server.'''
+
+from datetime import datetime
+import threading
+
+class InMemoryMangaStore:
+    '''
+    A class used to hold the volume, series, bundle, shop and market records of the manga
+    server in memory, keyed the same way as the manga server's routes.
+
+    ...
+
+    Attributes
+    ----------
+    items : dict[str, dict[str, dict]]
+        the records per item type, keyed by their id
+
+    Methods
+    -------
+    index(item_type=str, field=str, values=list)
+        Lists every record of the item type, or those whose field is one of the values.
+    show(item_type=str, item_id=str)
+        Gets a record.
+    create(item_type=str, item=dict)
+        Creates a record.
+    update(item_type=str, item_id=str, item=dict)
+        Updates a record with the given fields.
+    upsert(item_type=str, item_id=str, item=dict)
+        Updates a record, or creates it if there is none with the id.
+    delete(item_type=str, item_id=str)
+        Deletes a record.
+    load(data=dict)
+        Loads records, replacing any with the same id.
+    dump()
+        Gets every record per item type.
+    '''
+
+    # field each item type is looked up by, same as the manga server's routes
+    KEYS = {
+        'volume': 'isbn',
+        'series': 'series_id',
+        'bundle': 'item_id',
+        'shop': 'item_id',
+        'market': 'isbn'
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items: dict[str, dict[str, dict]] = { item_type: {} for item_type in self.KEYS }
+        self.next_id = 1
+
+    def index(self, item_type: str, field: str | None = None,
+              values: list[str] | None = None) -> list[dict]:
+        '''
+        Lists every record of the item type, or only those whose field is one of the values.
+
+        Parameters:
+        - item_type (str): The type of the records, ex: 'volume'.
+        - field (str): The field to filter the records on, ex: 'isbn'.
+        - values (list[str]): The values of the field to keep.
+
+        Returns:
+        - list[dict]: The records, in the order they were created.
+        '''
+        with self.lock:
+            if field is None:
+                return [dict(item) for item in self.items[item_type].values()]
+            if field == self.KEYS[item_type]:
+                return [
+                    dict(self.items[item_type][value])
+                    for value in dict.fromkeys(values) if value in self.items[item_type]
+                ]
+            wanted = set(values)
+            return [
+                dict(item) for item in self.items[item_type].values()
+                if item.get(field) in wanted
+            ]
+
+    def show(self, item_type: str, item_id: str) -> dict | None:
+        '''
+        Gets a record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+
+        Returns:
+        - dict: The record, or None if there is none with the id.
+        '''
+        with self.lock:
+            item = self.items[item_type].get(item_id)
+            return dict(item) if item is not None else None
+
+    def create(self, item_type: str, item: dict) -> dict | None:
+        '''
+        Creates a record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item (dict): The fields of the record, including its id.
+
+        Returns:
+        - dict: The created record, or None if a record with the same id already exists.
+        '''
+        key = item.get(self.KEYS[item_type])
+        with self.lock:
+            if key is None or key in self.items[item_type]:
+                return None
+            now = datetime.now().isoformat()
+            created = { **item, 'id': self.next_id, 'inserted_at': now, 'updated_at': now }
+            self.next_id += 1
+            self.items[item_type][key] = created
+            return dict(created)
+
+    def update(self, item_type: str, item_id: str, item: dict) -> dict | None:
+        '''
+        Updates a record with the given fields, keeping the others.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+        - item (dict): The fields to update.
+
+        Returns:
+        - dict: The updated record, or None if there is none with the id.
+        '''
+        with self.lock:
+            curr_item = self.items[item_type].get(item_id)
+            if curr_item is None:
+                return None
+            curr_item.update({ **item, 'updated_at': datetime.now().isoformat() })
+            return dict(curr_item)
+
+    def upsert(self, item_type: str, item_id: str, item: dict) -> bool:
+        '''
+        Updates a record with the given fields, or creates it if there is none with the id.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+        - item (dict): The fields to write.
+
+        Returns:
+        - bool: True if the record was created.
+        '''
+        with self.lock:
+            if item_id in self.items[item_type]:
+                self.items[item_type][item_id].update({
+                    **item, 'updated_at': datetime.now().isoformat()
+                })
+                return False
+            now = datetime.now().isoformat()
+            self.items[item_type][item_id] = {
+                **item, self.KEYS[item_type]: item_id,
+                'id': self.next_id, 'inserted_at': now, 'updated_at': now
+            }
+            self.next_id += 1
+            return True
+
+    def delete(self, item_type: str, item_id: str) -> bool:
+        '''
+        Deletes a record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+
+        Returns:
+        - bool: True if the record existed.
+        '''
+        with self.lock:
+            return self.items[item_type].pop(item_id, None) is not None
+
+    def load(self, data: dict[str, list[dict]]):
+        '''
+        Loads records, replacing any with the same id.
+
+        Parameters:
+        - data (dict[str, list[dict]]): The records per item type.
+        '''
+        for item_type, items in data.items():
+            for item in items:
+                key = item[self.KEYS[item_type]]
+                if self.create(item_type, item) is None:
+                    self.update(item_type, key, item)
+
+    def dump(self) -> dict[str, list[dict]]:
+        '''
+        Gets every record per item type.
+
+        Returns:
+        - dict[str, list[dict]]: The records per item type.
+        '''
+        return { item_type: self.index(item_type) for item_type in self.KEYS }
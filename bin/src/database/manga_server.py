@@ -1,60 +1,764 @@
 '''Module to interact with the manga server.'''
 
+import threading
+import time
 import traceback
+from urllib.parse import quote
+
 import requests
 
+from src.database.change_set import ChangeSet
+from src.database.server_index import ServerIndex
+from src.database.write_buffer import WriteBuffer
 from src.enums.host_enum import HostEnum
 from src.enums.file_path_enum import FilePathEnum
+from src.util.circuit_breaker import CircuitBreaker
+from src.util.http_client import HttpClient
 from src.util.local_dao import LocalDAO
 from src.util.manga_logger import MangaLogger
+from src.util.scrape_metrics import ScrapeMetrics
+
+class MangaServerError(Exception):
+    '''Raised when the manga server cannot be reached or fails a request.'''
 
-class MangaServer:
+class MangaServerUnavailableError(MangaServerError):
+    '''Raised without sending the request while the manga server's circuit breaker is open.'''
+
+class MangaServerBase:
     '''
-    A class used to interact with the manga server.
+    A class holding everything `MangaServer` and `AsyncMangaServer` do apart from sending
+    requests: reading the server index and the write buffer, reducing upserts to their
+    changes, indexing saved writes, and counting requests and records in the circuit breaker
+    and the metrics.  Subclasses only send the requests, and wait for them.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    metrics : ScrapeMetrics | None
+        The metrics records are counted in
+    write_buffer : WriteBuffer | None
+        The buffer holding the writes to send in bulk
+    server_index : ServerIndex | None
+        The copy of the manga server records reads and upserts are answered from
+    circuit_breaker : CircuitBreaker | None
+        The circuit breaker every request goes through
+    change_set : ChangeSet | None
+        The change set writes sent in bulk are recorded to instead, as a dry run
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    url : str
+        the url of the manga server
     '''
 
-    def __init__(self, host: HostEnum):
+    # field each item type is looked up by, same as the manga server's routes
+    ITEM_KEYS = {
+        'volume': 'isbn',
+        'series': 'series_id',
+        'bundle': 'item_id',
+        'shop': 'item_id',
+        'market': 'isbn'
+    }
+    # item types `load_index` lists in full, the shops are listed by the isbns of these
+    INDEX_ITEM_TYPES = ['volume', 'series', 'bundle', 'market']
+    # ids per bulk request, so the url stays well under the manga server's request line limit
+    MAX_IDS_PER_REQUEST = 100
+
+    def __init__(self, host: HostEnum, metrics: ScrapeMetrics | None = None,
+                 write_buffer: WriteBuffer | None = None,
+                 server_index: ServerIndex | None = None,
+                 circuit_breaker: CircuitBreaker | None = None,
+                 change_set: ChangeSet | None = None):
         self.host = host
+        self.metrics = metrics
+        self.write_buffer = write_buffer
+        self.server_index = server_index
+        self.circuit_breaker = circuit_breaker
+        self.change_set = change_set
         self.url = FilePathEnum.MANGA_SERVER.value[self.host.value]
+        # ? logged under the module of the subclass, ex: src.database.async_manga_server
+        self.logger = MangaLogger(host).register_logger(type(self).__module__)
+
+    def get_local(self, item_type: str, item_id: str) -> tuple[bool, dict | None, dict | None]:
+        '''
+        Gets an item without a request, from the server index or a buffered create.
+
+        Parameters:
+        - item_type (str): The type of the item, ex: 'volume'.
+        - item_id (str): The id of the item.
+
+        Returns:
+        - tuple[bool, dict | None, dict | None]: Whether the item was found without a request,
+        the item, and the buffered write to apply to it once fetched otherwise.
+        '''
+        indexed, item = self.get_indexed(item_type, item_id)
+        if indexed:
+            return True, item, None
+        pending = self.get_pending(item_type, item_id)
+        if pending is not None and pending['action'] == WriteBuffer.CREATE:
+            return True, pending['item'], pending
+        self.logger.info('Fetching %s: %s', item_type, item_id)
+        return False, None, pending
+
+    def apply_fetched(self, item_type: str, item_id: str, pending: dict | None,
+                      item: dict | None) -> dict | None:
+        '''Applies the buffered write to an item fetched by `get_item`, logging if it is missing.'''
+        if item is None:
+            self.logger.info('No %s found: %s', item_type, item_id)
+        return self.apply_pending(pending, item)
+
+    def check_breaker(self, method: str, url: str):
+        '''
+        Checks the circuit breaker before a request, if any.
+
+        Raises:
+        - MangaServerUnavailableError: The circuit breaker is open.
+        '''
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+            raise MangaServerUnavailableError(f'Manga server unavailable, not sent: {method} {url}')
+
+    def check_status(self, method: str, url: str, status: int) -> bool:
+        '''
+        Records the status the manga server answered with in the circuit breaker.
+
+        Parameters:
+        - method (str): The http method.
+        - url (str): The url requested.
+        - status (int): The http status of the response.
+
+        Returns:
+        - bool: False if the record was not found, otherwise True.
+
+        Raises:
+        - MangaServerError: The manga server answered with a server error or throttled.
+        '''
+        healthy = status < 500 and status != 429
+        self.record_request(healthy)
+        if not healthy:
+            raise MangaServerError(f'{method} {url} answered {status}')
+        return status != 404
+
+    def get_request_error(self, method: str, url: str, error: Exception) -> MangaServerError:
+        '''Records a request that could not reach the manga server, and gets the error to raise.'''
+        self.record_request(False)
+        return MangaServerError(f'{method} {url} failed: {error!r}')
+
+    def record_request(self, healthy: bool):
+        '''Records whether a request reached a healthy manga server in the circuit breaker.'''
+        if self.circuit_breaker is None:
+            return
+        if healthy:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+
+    def get_listed(self, item_type: str, ids: list[str], filter_by: str,
+                   items: list[dict]) -> dict[str, dict]:
+        '''Keys the items listed by `get_many` by their id, with the buffered writes applied.'''
+        return self.apply_pending_many(self.write_buffer, item_type, ids, filter_by,
+                                       self.key_items(item_type, items))
+
+    def get_indexed(self, item_type: str, item_id: str):
+        '''Gets an item from the server index, with buffered writes applied.'''
+        if self.server_index is None:
+            return False, None
+        indexed, item = self.server_index.get(item_type, item_id)
+        if not indexed:
+            return False, None
+        return True, self.apply_pending(self.get_pending(item_type, item_id), item)
+
+    def index_writes(self, item_type: str, items: dict[str, dict]):
+        '''Applies written items, keyed by their id, to the server index if there is one.'''
+        if self.server_index is None:
+            return
+        for item_id, item in items.items():
+            self.server_index.put(item_type, item_id, item)
+
+    def index_results(self, item_type: str, writes: list[dict], results: list[dict] | None):
+        '''Applies the writes of a flushed batch the manga server saved to the server index.'''
+        self.index_writes(item_type, {
+            write['id']: write['item'] for write, result in zip(writes, results or [])
+            if result.get('status') == 'ok'
+        })
+
+    @classmethod
+    def get_many_urls(cls, url: str, item_type: str, ids: list[str],
+                      filter_by: str) -> list[str]:
+        '''Gets the index urls listing the items with the given ids, in chunks.'''
+        unique_ids = list(dict.fromkeys(ids))
+        return [
+            f'{url}/{item_type}?{filter_by}=' +
+            quote(','.join(unique_ids[i:i + cls.MAX_IDS_PER_REQUEST]), safe=',')
+            for i in range(0, len(unique_ids), cls.MAX_IDS_PER_REQUEST)
+        ]
+
+    @classmethod
+    def key_items(cls, item_type: str, items: list[dict]) -> dict[str, dict]:
+        '''Keys the listed items by the field their item type is looked up by.'''
+        return { item[cls.ITEM_KEYS[item_type]]: item for item in items }
+
+    def get_pending(self, item_type: str, item_id: str) -> dict | None:
+        '''Gets the buffered write to an item, if writes are buffered.'''
+        if self.write_buffer is None:
+            return None
+        return self.write_buffer.get_pending(item_type, item_id)
+
+    @classmethod
+    def apply_pending(cls, pending: dict | None, item: dict | None) -> dict | None:
+        '''
+        Applies a buffered write to an item read from the database.
+
+        Parameters:
+        - pending (dict): The buffered write to the item, or None.
+        - item (dict): The item, or None if it was not found.
+
+        Returns:
+        - dict: The item with the write applied, or None if it does not exist yet and the
+        write is an update.
+        '''
+        if pending is None:
+            return item
+        if item is None:
+            return pending['item'] if pending['action'] != WriteBuffer.UPDATE else None
+        return { **item, **pending['item'] }
+
+    @classmethod
+    def apply_pending_many(cls, write_buffer: WriteBuffer | None, item_type: str,
+                           ids: list[str], filter_by: str,
+                           items: dict[str, dict]) -> dict[str, dict]:
+        '''
+        Applies the buffered writes to the items listed by `get_many`.
+
+        Parameters:
+        - write_buffer (WriteBuffer): The write buffer, or None if writes are not buffered.
+        - item_type (str): The type of the items.
+        - ids (list[str]): The ids the items were listed by, or the isbns for filter_by 'isbns'.
+        - filter_by (str): The index filter the items were listed by.
+        - items (dict[str, dict]): The listed items keyed by their id.
+
+        Returns:
+        - dict[str, dict]: The items keyed by their id, including the ones pending creation.
+        '''
+        if write_buffer is None:
+            return items
+        wanted = set(ids)
+        for write in write_buffer.get_pending_writes(item_type):
+            listed_by = write['item'].get('isbn') if filter_by == 'isbns' else write['id']
+            if listed_by not in wanted and write['id'] not in items:
+                continue
+            applied = cls.apply_pending(write, items.get(write['id']))
+            if applied is not None:
+                items[write['id']] = applied
+        return items
+
+    def record_created(self, item_type: str, item: dict):
+        '''Counts and indexes an item created without the write buffer.'''
+        self.count_record(item_type, 'created')
+        self.index_writes(item_type, { item[self.ITEM_KEYS[item_type]]: item })
+
+    def record_updated(self, item_type: str, item_id: str, item: dict):
+        '''Counts and indexes an item updated without the write buffer.'''
+        self.count_record(item_type, 'updated')
+        self.index_writes(item_type, { item_id: item })
+
+    def get_changes(self, item_type: str, items: dict[str, dict]) -> dict[str, dict]:
+        '''
+        Reduces items to write to the fields that differ from the server index, leaving out
+        and counting as unchanged the ones that would change nothing.
+
+        Parameters:
+        - item_type (str): The type of the items.
+        - items (dict[str, dict]): The fields to write keyed by the id of each item.
+
+        Returns:
+        - dict[str, dict]: The fields to write keyed by the id of each changed item.
+        '''
+        if self.server_index is None:
+            return items
+        changes = {}
+        for item_id, item in items.items():
+            pending = self.get_pending(item_type, item_id)
+            changed = self.server_index.diff(item_type, item_id, item,
+                                             pending['item'] if pending is not None else None)
+            if len(changed) > 0:
+                changes[item_id] = changed
+            else:
+                self.logger.info('No changes to %s: %s', item_type, item_id)
+                self.count_record(item_type, 'unchanged')
+        return changes
+
+    @staticmethod
+    def get_upsert_writes(items: dict[str, dict]) -> list[dict]:
+        '''Gets the bulk writes upserting the given items, keyed by their id.'''
+        return [
+            { 'action': WriteBuffer.UPSERT, 'id': item_id, 'item': item }
+            for item_id, item in items.items()
+        ]
+
+    def record_upserted(self, item_type: str, items: dict[str, dict],
+                        results: list[dict] | None):
+        '''
+        Indexes the items `upsert_many` sent without the write buffer, once all were saved.
+
+        Raises:
+        - RuntimeError: The request failed, or the manga server rejected a write.
+        '''
+        failed = [
+            result for result in (results or [])
+            if result.get('status') != 'ok'
+        ]
+        if results is None or len(failed) > 0:
+            raise RuntimeError(f'Error upserting {item_type}: {failed or "request failed"}')
+        self.index_writes(item_type, items)
+
+    def add_write(self, item_type: str, item_id: str, action: str, item: dict,
+                  owners: list[str] | None):
+        '''Adds a write to the write buffer, see `WriteBuffer.add`.'''
+        self.logger.info('Buffering %s of %s: %s > %s', action, item_type, item_id, item)
+        self.write_buffer.add(item_type, item_id, action, item, owners)
+
+    def finish_flushed(self, item_type: str, writes: list[dict], results: list[dict] | None):
+        '''Indexes and finishes a batch sent by `flush_writes`.'''
+        # ? indexed before the batch is finished, so reads always see the writes
+        self.index_results(item_type, writes, results)
+        self.write_buffer.finish_batch(item_type, writes, results)
+
+    def requeue_unsent(self, batches: list[tuple[str, list[dict]]]):
+        '''Puts back the batches `flush_writes` could not send, for the next flush.'''
+        self.logger.error('Manga server unavailable... keeping the buffered writes')
+        for unsent_type, unsent_writes in batches:
+            self.write_buffer.requeue(unsent_type, unsent_writes)
+
+    @staticmethod
+    def get_bulk_retries(writes: list[dict]) -> int:
+        '''
+        Gets the number of times a bulk request may be retried, none if it holds a create,
+        which could be applied twice.
+        '''
+        return HttpClient.RETRIES if all(
+            write['action'] != WriteBuffer.CREATE for write in writes
+        ) else 0
+
+    def record_writes(self, item_type: str, writes: list[dict]) -> list[dict]:
+        '''
+        Records writes of items of one type to the change set instead of sending them.
+
+        Parameters:
+        - item_type (str): The type of the items.
+        - writes (list[dict]): The writes, with their action, id and fields.
+
+        Returns:
+        - list[dict]: An ok result for every write, in order.
+        '''
+        self.logger.info('Recording %s %s to the change set', str(len(writes)), item_type)
+        self.change_set.write(item_type, writes)
+        for _ in writes:
+            self.count_record(item_type, 'recorded')
+        return [
+            { 'id': write['id'], 'action': write['action'], 'status': 'ok' } for write in writes
+        ]
+
+    def get_bulk_results(self, item_type: str, body: dict | None) -> list[dict]:
+        '''
+        Counts and gets the results of a bulk request.
+
+        Parameters:
+        - item_type (str): The type of the items.
+        - body (dict): The decoded response body, or None if the route was not found.
+
+        Returns:
+        - list[dict]: The result of every write, in order.
+
+        Raises:
+        - MangaServerError: The bulk route was not found.
+        '''
+        if body is None:
+            raise MangaServerError(f'{self.url}/{item_type}/bulk was not found')
+        results = body['results']
+        self.count_results(item_type, results)
+        return results
+
+    def record_bulk_error(self, item_type: str, writes: list[dict], error: Exception):
+        '''Logs a failed bulk request, counting its writes as failed unless it may be resent.'''
+        if isinstance(error, MangaServerError):
+            self.logger.error('Manga server failed writing %s %s in bulk',
+                              str(len(writes)), item_type)
+            return
+        self.logger.error('Error writing %s %s in bulk', str(len(writes)), item_type)
+        self.logger.error(traceback.format_exc())
+        for _ in writes:
+            self.count_record(item_type, 'failed')
+
+    def count_results(self, item_type: str, results: list[dict]):
+        '''Counts the records written in bulk in the metrics, if any.'''
+        for result in results:
+            if result.get('status') != 'ok':
+                self.count_record(item_type, 'failed')
+            else:
+                self.count_record(item_type, 'created' if result.get('action') == WriteBuffer.CREATE
+                                  else 'updated')
+
+    def count_record(self, item_type: str, outcome: str):
+        '''Counts a record written to the database in the metrics, if any.'''
+        if self.metrics is not None:
+            self.metrics.count_record(item_type, outcome)
+
+class MangaServer(MangaServerBase):
+    '''
+    A class used to interact with the manga server.  Counts the records it creates and
+    updates in the given metrics, if any.
+
+    `upsert_item` and `upsert_many` create or update records by their key in a single round
+    trip, so writing a record never depends on reading it first.
+
+    Given a write buffer, creates, updates and upserts are held in it and sent in bulk once
+    it asks to be flushed, and reads see the writes still waiting to be sent.  Once
+    `start_flusher` is called, a background thread sends them, as soon as the buffer is full or
+    its oldest write is due, even while no write is added, so the workers adding writes never
+    wait for a flush.  Otherwise the worker adding the write that fills the buffer sends it.
+    `stop_flusher` and `flush_writes` must be called at the end of the run to send the rest.
+
+    Given a server index, `load_index` fills it when the run starts, reads of the item types
+    it holds are answered from it with only the fields it keeps, and every write is applied
+    to it once the manga server saved it, buffered writes once their batch is flushed.  Until
+    then reads and upserts see the index with the buffered writes applied.  Upserts are
+    compared with it first and send only the fields they change, or nothing at all.
+
+    A record that does not exist is answered with None, while a manga server that cannot be
+    reached, or answers with a server error once the retries are spent, raises a
+    `MangaServerError`.  Given a circuit breaker, every request goes through it, and requests
+    made while it is open raise a `MangaServerUnavailableError` without being sent.
+
+    Given a change set, writes sent in bulk are recorded to it instead, as a dry run, and
+    reads still go to the manga server.
+
+    Everything but the requests is shared with `AsyncMangaServer`, see `MangaServerBase`.
+    '''
+
+    def __init__(self, host: HostEnum, metrics: ScrapeMetrics | None = None,
+                 write_buffer: WriteBuffer | None = None,
+                 server_index: ServerIndex | None = None,
+                 circuit_breaker: CircuitBreaker | None = None,
+                 change_set: ChangeSet | None = None):
+        super().__init__(host, metrics, write_buffer, server_index, circuit_breaker, change_set)
+        self.flush_lock = threading.Lock()
+        self.flush_requested = threading.Event()
+        self.flusher: threading.Thread | None = None
+        self.flusher_stopping = False
+        self.flusher_idle = False
         self.local_dao = LocalDAO(host)
-        self.logger = MangaLogger(host).register_logger(__name__)
+        self.http_client = HttpClient(host)
 
     def get_item(self, item_type: str, item_id: str):
-        '''Gets an item from the database.'''
+        '''Gets an item from the server index or the database, with buffered writes applied.'''
+        found, item, pending = self.get_local(item_type, item_id)
+        if found:
+            return item
+        response = self.request('GET', f'{self.url}/{item_type}/{item_id}')
+        return self.apply_fetched(item_type, item_id, pending,
+                                  response.json() if response is not None else None)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response | None:
+        '''
+        Makes a request to the manga server, through its circuit breaker if any.  Idempotent
+        requests are retried by the shared `HttpClient` on connection errors and server errors.
+
+        Parameters:
+        - method (str): The http method.
+        - url (str): The url to request.
+
+        Returns:
+        - requests.Response: The response, or None if the record was not found.
+
+        Raises:
+        - MangaServerUnavailableError: The circuit breaker is open.
+        - MangaServerError: The manga server could not be reached, or answered with a server
+        error.
+        - requests.exceptions.HTTPError: The manga server rejected the request.
+        '''
+        self.check_breaker(method, url)
         try:
-            self.logger.info('Fetching %s: %s', item_type, item_id)
-            return requests.get(f'{self.url}/{item_type}/{item_id}', timeout=30).json()
+            response = self.http_client.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise self.get_request_error(method, url, e) from e
+        if not self.check_status(method, url, response.status_code):
+            return None
+        response.raise_for_status()
+        return response
+
+    def get_many(self, item_type: str, ids: list[str], filter_by: str = 'ids'):
+        '''
+        Gets the items with the given ids from the database, in one request per
+        `MAX_IDS_PER_REQUEST` ids.
+
+        Parameters:
+        - item_type (str): The type of the items, ex: 'volume'.
+        - ids (list[str]): The ids of the items, or with filter_by 'isbns' the isbns of the shops.
+        - filter_by (str): The index filter of the manga server, 'ids' or 'isbns' for shops.
+
+        Returns:
+        - dict[str, dict]: The items found keyed by their id, or None if a request failed.
+        '''
+        try:
+            self.logger.info('Fetching %s %s by %s', str(len(ids)), item_type, filter_by)
+            items = []
+            for url in self.get_many_urls(self.url, item_type, ids, filter_by):
+                response = self.request('GET', url)
+                if response is None:
+                    raise MangaServerError(f'{url} was not found')
+                items += response.json()
+            return self.get_listed(item_type, ids, filter_by, items)
         except Exception:
-            self.logger.warning('Error getting %s: %s. Either failed or does not exist', item_type, item_id)
+            self.logger.warning('Error getting %s by %s', item_type, filter_by)
+            self.logger.warning(traceback.format_exc())
             return None
 
-    def create_item(self, item_type: str, item: dict):
-        '''Creates an item in the database.'''
+    def get_all(self, item_type: str):
+        '''
+        Gets every item of a type from the database.
+
+        Parameters:
+        - item_type (str): The type of the items, ex: 'volume'.
+
+        Returns:
+        - dict[str, dict]: The items keyed by their id, or None if the request failed.
+        '''
+        try:
+            self.logger.info('Fetching every %s', item_type)
+            response = self.request('GET', f'{self.url}/{item_type}')
+            if response is None:
+                raise MangaServerError(f'{self.url}/{item_type} was not found')
+            return self.key_items(item_type, response.json())
+        except Exception:
+            self.logger.warning('Error getting every %s', item_type)
+            self.logger.warning(traceback.format_exc())
+            return None
+
+    def load_index(self):
+        '''
+        Loads the server index with every volume, series, bundle and market record, then with
+        the shops of their isbns since the manga server only lists every shop page by page.
+        '''
+        if self.server_index is None:
+            return
+        self.server_index.start()
+        for item_type in self.INDEX_ITEM_TYPES:
+            self.server_index.load(item_type, self.get_all(item_type))
+        isbns = self.server_index.get_shop_isbns()
+        if isbns is not None:
+            self.server_index.load('shop', self.get_many('shop', isbns, 'isbns')
+                                   if len(isbns) > 0 else {})
+
+    def create_item(self, item_type: str, item: dict, owners: list[str] | None = None):
+        '''Creates an item in the database, or buffers its creation.'''
+        if self.write_buffer is not None:
+            self.buffer_write(item_type, item[self.ITEM_KEYS[item_type]], WriteBuffer.CREATE, item,
+                              owners)
+            return item
         try:
             url = f'{self.url}/{item_type}'
             body = { item_type: item }
             self.logger.info('Creating at %s with %s', url, body)
-            return requests.post(url, json=body, timeout=30).json()
+            response = self.request('POST', url, json=body).json()
+            self.record_created(item_type, item)
+            return response
         except Exception as e:
             self.logger.error('Error creating %s', item_type)
             self.logger.error(traceback.format_exc())
             raise e
 
-    def update_item(self, item_type: str, item_id: str, item: dict):
-        '''Updates an item in the database.'''
+    def update_item(self, item_type: str, item_id: str, item: dict,
+                    owners: list[str] | None = None):
+        '''Updates an item in the database, or buffers its update.'''
+        if self.write_buffer is not None:
+            self.buffer_write(item_type, item_id, WriteBuffer.UPDATE, item, owners)
+            return item
         try:
             self.logger.info('Updating %s: %s > %s', item_type, item_id, item)
-            return requests.put(f'{self.url}/{item_type}/{item_id}', json={ item_type: item }, timeout=30).json()
+            response = self.request('PUT', f'{self.url}/{item_type}/{item_id}',
+                                    json={ item_type: item })
+            if response is None:
+                raise RuntimeError(f'No {item_type} found: {item_id}')
+            response = response.json()
+            self.record_updated(item_type, item_id, item)
+            return response
         except Exception as e:
             self.logger.error('Error updating %s: %s', item_type, item_id)
             self.logger.error(traceback.format_exc())
             raise e
 
+    def upsert_item(self, item_type: str, item_id: str, item: dict,
+                    owners: list[str] | None = None):
+        '''
+        Updates an item in the database if it exists, otherwise creates it, or buffers it.
+
+        Parameters:
+        - item_type (str): The type of the item, ex: 'volume'.
+        - item_id (str): The id of the item.
+        - item (dict): The fields to write, the id is added if missing.
+        - owners (list[str]): The items the write is made for, if buffered, see
+        `WriteBuffer.add`.
+
+        Returns:
+        - dict: The fields written.
+
+        Raises:
+        - Exception: The write failed, unless writes are buffered.
+        '''
+        self.upsert_many(item_type, { item_id: item }, owners)
+        return item
+
+    def upsert_many(self, item_type: str, items: dict[str, dict],
+                    owners: list[str] | None = None):
+        '''
+        Updates the items that exist in the database and creates the others in a single
+        request, or buffers them.  Given a server index, only the fields that differ from it
+        are written, and items that would not change are not written at all.
+
+        Parameters:
+        - item_type (str): The type of the items.
+        - items (dict[str, dict]): The fields to write keyed by the id of each item.
+        - owners (list[str]): The items the writes are made for, if buffered.
+
+        Raises:
+        - MangaServerError: The manga server is unavailable, unless writes are buffered.
+        - Exception: A write failed, unless writes are buffered.
+        '''
+        items = self.get_changes(item_type, items)
+        if len(items) == 0:
+            return
+        if self.write_buffer is not None:
+            for item_id, item in items.items():
+                self.buffer_write(item_type, item_id, WriteBuffer.UPSERT, item, owners)
+            return
+        results = self.bulk_write(item_type, self.get_upsert_writes(items))
+        self.record_upserted(item_type, items, results)
+
+    def buffer_write(self, item_type: str, item_id: str, action: str, item: dict,
+                     owners: list[str] | None = None):
+        '''
+        Buffers a write.  If the buffer is due, wakes the background flusher, or without one
+        flushes the buffer unless it is already flushing.
+        '''
+        self.add_write(item_type, item_id, action, item, owners)
+        if self.flusher is not None:
+            # ? an idle flusher is woken to wait for this write to be due instead
+            if self.flusher_idle or self.write_buffer.should_flush():
+                self.flush_requested.set()
+        elif self.write_buffer.should_flush():
+            self.flush_writes(wait=False)
+
+    def start_flusher(self):
+        '''Starts the background thread flushing the write buffer whenever it is due.'''
+        if self.write_buffer is None or self.flusher is not None:
+            return
+        self.flusher_stopping = False
+        self.flush_requested.clear()
+        self.flusher = threading.Thread(target=self.__run_flusher, name='manga-server-flusher',
+                                        daemon=True)
+        self.flusher.start()
+
+    def stop_flusher(self):
+        '''Stops the background flusher, leaving the writes it did not send in the buffer.'''
+        if self.flusher is None:
+            return
+        self.flusher_stopping = True
+        self.flush_requested.set()
+        self.flusher.join()
+        self.flusher = None
+
+    def __run_flusher(self):
+        while not self.flusher_stopping:
+            # ? idle is set before the delay is read, so a write added in between wakes it
+            self.flusher_idle = True
+            delay = self.write_buffer.get_flush_delay()
+            self.flusher_idle = delay is None
+            self.flush_requested.wait(delay)
+            self.flush_requested.clear()
+            if not self.flusher_stopping and self.write_buffer.should_flush():
+                try:
+                    self.flush_writes()
+                except Exception:
+                    self.logger.error('Error flushing the buffered writes')
+                    self.logger.error(traceback.format_exc())
+
+    def flush_writes(self, wait: bool = True):
+        '''
+        Sends the buffered writes in bulk, one request per item type.  If the manga server is
+        unavailable, the writes not sent go back to the buffer for the next flush.
+
+        Parameters:
+        - wait (bool): Whether to wait for a flush already in progress, otherwise leave the
+        writes to it or the next flush.
+        '''
+        if self.write_buffer is None or not self.flush_lock.acquire(blocking=wait):
+            return
+        try:
+            batches = self.write_buffer.take_batches()
+            for index, (item_type, writes) in enumerate(batches):
+                try:
+                    results = self.bulk_write(item_type, writes)
+                except MangaServerError:
+                    self.requeue_unsent(batches[index:])
+                    return
+                self.finish_flushed(item_type, writes, results)
+        finally:
+            self.flush_lock.release()
+
+    def bulk_write(self, item_type: str, writes: list[dict]) -> list[dict] | None:
+        '''
+        Sends creates, updates and upserts of items of one type in a single request.  Unless it
+        holds a create, which could be applied twice, the request is retried with jittered
+        backoff while the manga server fails.
+
+        Parameters:
+        - item_type (str): The type of the items.
+        - writes (list[dict]): The writes, with their action, id and fields.
+
+        Returns:
+        - list[dict]: The result of every write, in order, or None if the request failed.
+
+        Raises:
+        - MangaServerError: The manga server is unavailable.
+        '''
+        if self.change_set is not None:
+            return self.record_writes(item_type, writes)
+        retries = self.get_bulk_retries(writes)
+        try:
+            self.logger.info('Writing %s %s in bulk', str(len(writes)), item_type)
+            for attempt in range(retries + 1):
+                try:
+                    response = self.request('POST', f'{self.url}/{item_type}/bulk',
+                                            json={ 'writes': writes })
+                    break
+                except MangaServerUnavailableError:
+                    raise
+                except MangaServerError:
+                    if attempt >= retries:
+                        raise
+                    self.logger.warning('Retrying %s %s in bulk after attempt %s failed',
+                                        str(len(writes)), item_type, attempt + 1)
+                    time.sleep(HttpClient.get_backoff_seconds(attempt))
+            return self.get_bulk_results(item_type,
+                                         response.json() if response is not None else None)
+        except MangaServerError as e:
+            self.record_bulk_error(item_type, writes, e)
+            raise
+        except Exception as e:
+            self.record_bulk_error(item_type, writes, e)
+            return None
+
     def delete_item(self, item_type: str, item_id: str):
         '''Deletes an item from the database.'''
         try:
             self.logger.info('Deleting %s: %s', item_type, item_id)
-            return requests.delete(f'{self.url}/{item_type}/{item_id}', timeout=30).json()
+            response = self.request('DELETE', f'{self.url}/{item_type}/{item_id}')
+            return response.json() if response is not None else None
         except Exception as e:
             self.logger.error('Error deleting %s: %s', item_type, item_id)
             self.logger.error(traceback.format_exc())
@@ -0,0 +1,287 @@
+'''In-memory index of the manga server records a scrape run compares its writes against.'''
+
+import hashlib
+import json
+import threading
+
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class ServerIndex:
+    '''
+    A class used to hold a copy of the manga server records, loaded once when a run starts,
+    so checking whether a record exists or has changed is a dictionary lookup instead of a
+    request.
+
+    Only the fields the scraper writes are kept per item type, see `FIELDS`, so `diff` can
+    reduce a write to the fields it changes.  To keep the index compact, the large fields that
+    are only ever compared, ex: descriptions and cover image lists, are kept as a digest of
+    their value, see `HASHED_FIELDS`, and read back as None.  Each listing is only held whole
+    while its item type is loaded.  The records written during the run are applied to the
+    index once the manga server saved them, and an item type whose load failed is not held at
+    all, so its reads fall back to the manga server and its writes are sent whole.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    records : dict[str, dict[str, dict]]
+        the records per loaded item type, keyed by their id
+
+    Methods
+    -------
+    start()
+        Drops every record.
+    load(item_type=str, items=dict)
+        Holds the records of an item type listed by the manga server.
+    is_loaded(item_type=str)
+        Checks if the records of an item type are held.
+    get(item_type=str, item_id=str)
+        Gets a record.
+    get_records(item_type=str)
+        Gets every record of an item type.
+    get_shop_isbns()
+        Gets the isbns the shops are listed by.
+    diff(item_type=str, item_id=str, item=dict, pending=dict)
+        Gets the fields of a write that change the record.
+    put(item_type=str, item_id=str, item=dict)
+        Applies a write to a record.
+    '''
+
+    # fields kept per item type, the ones the manga server stores and the scraper writes
+    FIELDS = {
+        'volume': [
+            'isbn', 'name', 'display_name', 'category', 'volume', 'url', 'brand', 'series',
+            'series_id', 'edition', 'edition_id', 'release_date', 'publisher', 'format',
+            'pages', 'authors', 'isbn_10', 'description', 'primary_cover_image',
+            'cover_images', 'is_bundle'
+        ],
+        'series': [
+            'series_id', 'status', 'description', 'title', 'category', 'url',
+            'associated_titles', 'series_match_confidence', 'editions', 'volumes',
+            'cover_image', 'genres', 'themes', 'latest_chapter', 'release_status', 'authors',
+            'publishers', 'bayesian_rating', 'rank', 'recommendations'
+        ],
+        'bundle': [
+            'item_id', 'series_id', 'shop_id', 'primary_cover_image', 'volumes', 'volume_start',
+            'volume_end', 'type'
+        ],
+        'shop': [
+            'item_id', 'isbn', 'store', 'url', 'condition', 'price', 'stock_status',
+            'last_stock_update', 'coupon', 'is_on_sale', 'promotion', 'promotion_percentage',
+            'backorder_details', 'exclusive', 'is_bundle', 'dropped_check'
+        ],
+        'market': ['isbn', 'retail_price']
+    }
+    # fields of `FIELDS` kept as a digest, the scraper compares them but never reads them
+    HASHED_FIELDS = {
+        'volume': ['description', 'authors', 'cover_images'],
+        'series': [
+            'description', 'editions', 'cover_image', 'genres', 'themes', 'authors',
+            'publishers', 'recommendations'
+        ],
+        'bundle': ['volumes'],
+        'shop': [],
+        'market': []
+    }
+
+    def __init__(self, host: HostEnum):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        '''Drops every record.'''
+        with self.lock:
+            self.records: dict[str, dict[str, dict]] = {}
+
+    def load(self, item_type: str, items: dict[str, dict] | None):
+        '''
+        Holds the records of an item type listed by the manga server.
+
+        Parameters:
+        - item_type (str): The type of the records, ex: 'volume'.
+        - items (dict[str, dict]): Every record of the type keyed by its id, or None if the
+        request failed.
+        '''
+        if items is None:
+            self.logger.warning('Could not index %s... reading them from the server', item_type)
+            return
+        fields = self.FIELDS[item_type]
+        records = {
+            item_id: self.compact(item_type, { field: item.get(field) for field in fields })
+            for item_id, item in items.items()
+        }
+        with self.lock:
+            self.records[item_type] = records
+        self.logger.info('Indexed %s %s', str(len(records)), item_type)
+
+    def is_loaded(self, item_type: str) -> bool:
+        '''
+        Checks if the records of an item type are held.
+
+        Parameters:
+        - item_type (str): The type of the records.
+
+        Returns:
+        - bool: True if the item type was loaded.
+        '''
+        with self.lock:
+            return item_type in self.records
+
+    def get(self, item_type: str, item_id: str):
+        '''
+        Gets a record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+
+        Returns:
+        - tuple[bool, dict | None]: Whether the item type is held, and a copy of the record
+        or None if it does not exist.
+        '''
+        with self.lock:
+            records = self.records.get(item_type)
+            if records is None:
+                return False, None
+            record = records.get(item_id)
+            return True, self.expand(item_type, record) if record is not None else None
+
+    def get_records(self, item_type: str) -> list[dict] | None:
+        '''
+        Gets every record of an item type.
+
+        Parameters:
+        - item_type (str): The type of the records.
+
+        Returns:
+        - list[dict]: Copies of the records, or None if the item type is not held.
+        '''
+        with self.lock:
+            records = self.records.get(item_type)
+            if records is None:
+                return None
+            return [self.expand(item_type, record) for record in records.values()]
+
+    def get_shop_isbns(self) -> list[str] | None:
+        '''
+        Gets the isbns the shops are listed by, since the manga server only lists every shop
+        page by page.  Shops are held for the volumes and bundles in the index.
+
+        Returns:
+        - list[str]: The isbns of the volumes and bundles, or None if either was not loaded.
+        '''
+        with self.lock:
+            if 'volume' not in self.records or 'bundle' not in self.records:
+                return None
+            return [*self.records['volume'], *self.records['bundle']]
+
+    def diff(self, item_type: str, item_id: str, item: dict,
+             pending: dict | None = None) -> dict:
+        '''
+        Gets the fields of a write that change the record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+        - item (dict): The fields to write.
+        - pending (dict): The fields of the record written but not saved yet, if any.
+
+        Returns:
+        - dict: The fields whose value differs from the record or that are not kept, every
+        field if neither the record, its item type nor pending fields are held, or an empty
+        dict if the write changes nothing.
+        '''
+        with self.lock:
+            record = self.records.get(item_type, {}).get(item_id)
+            if pending is not None:
+                record = { **(record or {}), **self.compact(item_type, pending) }
+            if record is None:
+                return dict(item)
+            compact_item = self.compact(item_type, item)
+            return {
+                field: value for field, value in item.items()
+                if field not in record or not self.is_same(record[field], compact_item[field])
+            }
+
+    @classmethod
+    def compact(cls, item_type: str, item: dict) -> dict:
+        '''
+        Replaces the hashed fields of a record by their digest, see `HASHED_FIELDS`.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item (dict): The fields of the record.
+
+        Returns:
+        - dict: A copy of the fields, the hashed ones replaced by their digest, None staying
+        None.
+        '''
+        compact_item = dict(item)
+        for field in cls.HASHED_FIELDS.get(item_type, []):
+            if compact_item.get(field) is not None:
+                compact_item[field] = hashlib.blake2b(
+                    json.dumps(compact_item[field], sort_keys=True, default=str).encode(),
+                    digest_size=8
+                ).digest()
+        return compact_item
+
+    @classmethod
+    def expand(cls, item_type: str, record: dict) -> dict:
+        '''Copies a held record for reading, its hashed fields read back as None.'''
+        return {
+            **record, **dict.fromkeys(cls.HASHED_FIELDS.get(item_type, []))
+        }
+
+    @classmethod
+    def is_same(cls, curr_value, value) -> bool:
+        '''
+        Checks if a scraped value equals the one the manga server rendered, which renders
+        decimals as strings.
+
+        Parameters:
+        - curr_value (Any): The value held.
+        - value (Any): The value to write.
+
+        Returns:
+        - bool: True if writing the value changes nothing.
+        '''
+        if curr_value == value:
+            return True
+        if not isinstance(curr_value, str) or isinstance(value, bool) or \
+            not isinstance(value, (int, float)):
+            return False
+        try:
+            return float(curr_value) == value
+        except ValueError:
+            return False
+
+    def put(self, item_type: str, item_id: str, item: dict):
+        '''
+        Applies a write to a record, creating it if it is not held.  Fields missing from a
+        new record are None, as the manga server renders them.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+        - item (dict): The fields written.
+        '''
+        with self.lock:
+            records = self.records.get(item_type)
+            if records is None:
+                return
+            fields = self.FIELDS[item_type]
+            record = records.get(item_id) or dict.fromkeys(fields)
+            records[item_id] = {
+                **record,
+                **self.compact(item_type, { field: item[field] for field in fields
+                                            if field in item })
+            }
@@ -0,0 +1,360 @@
+'''Write-behind buffer batching the creates and updates sent to the manga server.'''
+
+import threading
+import time
+
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class WriteBuffer:
+    '''
+    A class used to hold the creates and updates of manga server records until they can be
+    sent in bulk, one request per item type, instead of one request per record.
+
+    Writes are keyed by item type and record id, and are either a create, an update or an
+    upsert.  A repeated write to the same record is merged into the pending one, the later
+    fields winning, and keeps the action of the pending write, so an update of a record still
+    pending creation is folded into its create.  The buffer asks to be flushed once it holds
+    `max_records` writes or its oldest write has waited `max_seconds`, and `get_flush_delay`
+    tells a background flusher how long to wait for the latter.
+
+    Pending and in flight writes are visible through `get_pending`, so reads made before a
+    flush still see them.  Writes the manga server rejected, or that could not be sent, are
+    kept in `errors` for the report at the end of the run.  A batch sent while the manga server
+    is unavailable is requeued instead, and reported as not sent if it is still pending then.
+
+    A write may be owned by the items it was made for, ex: the ISBN of a scraped volume, so the
+    scraper can tell once every write of an item is saved, see `is_saving` and `has_failed`.
+    A merged write is owned by the owners of both writes.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    max_records : int
+        The number of pending writes that triggers a flush
+    max_seconds : float
+        The number of seconds the oldest pending write may wait before triggering a flush
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    pending : dict[tuple[str, str], dict]
+        the writes waiting to be sent per (item type, record id)
+    errors : list[dict]
+        the writes that failed during the run, with their errors and owners
+    failed_owners : set[str]
+        the owners of the writes that failed during the run
+
+    Methods
+    -------
+    start()
+        Drops every pending write and error.
+    add(item_type=str, item_id=str, action=str, item=dict, owners=list)
+        Adds a write, merging it into any pending write to the same record.
+    is_saving(owner=str)
+        Checks if a write of the owner is pending or in flight.
+    has_failed(owner=str)
+        Checks if a write of the owner failed during the run.
+    get_pending(item_type=str, item_id=str)
+        Gets the pending or in flight write to a record.
+    get_pending_writes(item_type=str)
+        Gets every pending or in flight write to records of the item type.
+    should_flush()
+        Checks if the pending writes should be flushed.
+    get_flush_delay()
+        Gets the number of seconds until the oldest pending write is due to be flushed.
+    take_batches()
+        Takes every pending write to send, grouped by item type.
+    finish_batch(item_type=str, writes=list, results=list)
+        Records the outcome of a sent batch.
+    requeue(item_type=str, writes=list)
+        Puts back a batch that could not be sent.
+    report()
+        Logs the writes that failed or were never sent during the run.
+    '''
+
+    CREATE = 'create'
+    UPDATE = 'update'
+    UPSERT = 'upsert'
+    # item types in the order they are flushed, records before the ones referencing them
+    FLUSH_ORDER = ['series', 'market', 'volume', 'bundle', 'shop']
+
+    def __init__(self, host: HostEnum, max_records: int = 100, max_seconds: float = 5.0):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.max_records = max_records
+        self.max_seconds = max_seconds
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        '''Drops every pending write and error.'''
+        with self.lock:
+            self.pending: dict[tuple[str, str], dict] = {}
+            self.in_flight: dict[tuple[str, str], dict] = {}
+            self.errors: list[dict] = []
+            self.oldest: float | None = None
+            # ? owners are kept apart from the writes, which are sent as they are
+            self.pending_owners: dict[tuple[str, str], set[str]] = {}
+            self.in_flight_owners: dict[tuple[str, str], set[str]] = {}
+            self.owned: dict[str, int] = {}
+            self.failed_owners: set[str] = set()
+
+    def add(self, item_type: str, item_id: str, action: str, item: dict,
+            owners: list[str] | None = None):
+        '''
+        Adds a write, merging it into any pending write to the same record.
+
+        Parameters:
+        - item_type (str): The type of the record, ex: 'volume'.
+        - item_id (str): The id of the record.
+        - action (str): Either `CREATE`, `UPDATE` or `UPSERT`.
+        - item (dict): The fields to write.
+        - owners (list[str]): The items the write is made for, if any.
+        '''
+        key = (item_type, item_id)
+        with self.lock:
+            self.__add_owners(self.pending_owners, key, set(owners or []))
+            curr_write = self.pending.get(key)
+            if curr_write is None:
+                self.pending[key] = { 'action': action, 'id': item_id, 'item': dict(item) }
+            else:
+                # ? a create stays a create, and a create of a record pending an update could
+                # ? only fail, so it is folded into the update, likewise for an upsert
+                curr_write['item'].update(item)
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+
+    def is_saving(self, owner: str) -> bool:
+        '''
+        Checks if a write of the owner is pending or in flight.
+
+        Parameters:
+        - owner (str): The item the writes are made for.
+
+        Returns:
+        - bool: True until every write of the owner was sent.
+        '''
+        with self.lock:
+            return owner in self.owned
+
+    def has_failed(self, owner: str) -> bool:
+        '''
+        Checks if a write of the owner failed, or was reported as not sent, during the run.
+
+        Parameters:
+        - owner (str): The item the writes are made for.
+
+        Returns:
+        - bool: True if a write of the owner failed.
+        '''
+        with self.lock:
+            return owner in self.failed_owners
+
+    def get_pending(self, item_type: str, item_id: str) -> dict | None:
+        '''
+        Gets the pending or in flight write to a record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - item_id (str): The id of the record.
+
+        Returns:
+        - dict: The write with its action and merged fields, or None if there is none.
+        '''
+        key = (item_type, item_id)
+        with self.lock:
+            in_flight = self.in_flight.get(key)
+            pending = self.pending.get(key)
+            if in_flight is None and pending is None:
+                return None
+            if in_flight is None or pending is None:
+                write = in_flight or pending
+                return { **write, 'item': dict(write['item']) }
+            return {
+                'action': in_flight['action'],
+                'id': item_id,
+                'item': { **in_flight['item'], **pending['item'] }
+            }
+
+    def get_pending_writes(self, item_type: str) -> list[dict]:
+        '''
+        Gets every pending or in flight write to records of the item type.
+
+        Parameters:
+        - item_type (str): The type of the records.
+
+        Returns:
+        - list[dict]: The writes with their action and merged fields.
+        '''
+        with self.lock:
+            item_ids = [
+                item_id for (write_type, item_id) in [*self.in_flight, *self.pending]
+                if write_type == item_type
+            ]
+        return [
+            write for write in [
+                self.get_pending(item_type, item_id) for item_id in dict.fromkeys(item_ids)
+            ]
+            if write is not None
+        ]
+
+    def should_flush(self) -> bool:
+        '''
+        Checks if the pending writes should be flushed.
+
+        Returns:
+        - bool: True if there are `max_records` pending writes, or the oldest has waited
+        `max_seconds`.
+        '''
+        with self.lock:
+            return len(self.pending) >= self.max_records or (
+                self.oldest is not None and time.monotonic() - self.oldest >= self.max_seconds
+            )
+
+    def get_flush_delay(self) -> float | None:
+        '''
+        Gets the number of seconds until the oldest pending write has waited `max_seconds`.
+
+        Returns:
+        - float: The number of seconds, 0 if it is already due, or None if nothing is pending.
+        '''
+        with self.lock:
+            if self.oldest is None:
+                return None
+            return max(self.max_seconds - (time.monotonic() - self.oldest), 0)
+
+    def take_batches(self) -> list[tuple[str, list[dict]]]:
+        '''
+        Takes every pending write to send, grouped by item type.  They stay visible through
+        `get_pending` until their batch is finished.
+
+        Returns:
+        - list[tuple[str, list[dict]]]: The writes per item type, in `FLUSH_ORDER`.
+        '''
+        with self.lock:
+            batches: dict[str, list[dict]] = {}
+            for (item_type, item_id), write in self.pending.items():
+                batches.setdefault(item_type, []).append(write)
+                self.in_flight[(item_type, item_id)] = write
+            for key, owners in self.pending_owners.items():
+                self.__add_owners(self.in_flight_owners, key, owners, moved=True)
+            self.pending = {}
+            self.pending_owners = {}
+            self.oldest = None
+        return sorted(
+            batches.items(),
+            key=lambda batch: self.FLUSH_ORDER.index(batch[0])
+                if batch[0] in self.FLUSH_ORDER else len(self.FLUSH_ORDER)
+        )
+
+    def finish_batch(self, item_type: str, writes: list[dict], results: list[dict] | None):
+        '''
+        Records the outcome of a sent batch.
+
+        Parameters:
+        - item_type (str): The type of the records.
+        - writes (list[dict]): The writes sent.
+        - results (list[dict]): The result of every write from the manga server, in order,
+        or None if the request failed.
+        '''
+        with self.lock:
+            for index, write in enumerate(writes):
+                key = (item_type, write['id'])
+                owners = set()
+                if self.in_flight.get(key) is write:
+                    del self.in_flight[key]
+                    owners = self.in_flight_owners.pop(key, set())
+                result = results[index] if results is not None and index < len(results) \
+                    else { 'status': 'error', 'errors': 'request failed' }
+                if result.get('status') != 'ok':
+                    self.__fail(item_type, write, result.get('errors'), owners)
+                self.__release_owners(owners)
+
+    def requeue(self, item_type: str, writes: list[dict]):
+        '''
+        Puts back a batch that could not be sent, to be sent by the next flush.  Writes to the
+        same records added since are merged into it, their fields winning.
+
+        Parameters:
+        - item_type (str): The type of the records.
+        - writes (list[dict]): The writes taken for the batch.
+        '''
+        with self.lock:
+            for write in writes:
+                key = (item_type, write['id'])
+                if self.in_flight.get(key) is write:
+                    del self.in_flight[key]
+                    self.__add_owners(self.pending_owners, key,
+                                      self.in_flight_owners.pop(key, set()), moved=True)
+                pending = self.pending.get(key)
+                self.pending[key] = write if pending is None else {
+                    **write, 'item': { **write['item'], **pending['item'] }
+                }
+            if len(writes) > 0 and self.oldest is None:
+                self.oldest = time.monotonic()
+
+    def report(self) -> list[dict]:
+        '''
+        Logs the writes that failed during the run, along with the writes still pending, which
+        were never sent, and drops the latter.
+
+        Returns:
+        - list[dict]: The failed writes, with their item type, action, id, fields and errors.
+        '''
+        with self.lock:
+            for key, write in self.in_flight.items():
+                self.__fail(key[0], write, 'not sent', self.in_flight_owners.get(key, set()))
+            for key, write in self.pending.items():
+                self.__fail(key[0], write, 'not sent', self.pending_owners.get(key, set()))
+            self.in_flight = {}
+            self.pending = {}
+            self.in_flight_owners = {}
+            self.pending_owners = {}
+            self.owned = {}
+            self.oldest = None
+            errors = list(self.errors)
+        if len(errors) == 0:
+            self.logger.info('Every buffered write was saved')
+            return errors
+        self.logger.error('%s buffered writes failed', str(len(errors)))
+        for error in errors:
+            self.logger.error('Failed to %s %s %s: %s', error['action'], error['item_type'],
+                              error['id'], error['errors'])
+        return errors
+
+    def __fail(self, item_type: str, write: dict, errors, owners: set[str]):
+        self.errors.append({
+            'item_type': item_type,
+            'action': write['action'],
+            'id': write['id'],
+            'item': write['item'],
+            'errors': errors,
+            'owners': sorted(owners)
+        })
+        self.failed_owners.update(owners)
+
+    def __add_owners(self, owners_by_key: dict[tuple[str, str], set[str]],
+                     key: tuple[str, str], owners: set[str], moved: bool = False):
+        # ? an owner is counted once per record it has a pending or in flight write to, so
+        # ? moving its write onto another write of the same record drops one count
+        curr_owners = owners_by_key.setdefault(key, set())
+        for owner in owners:
+            if owner in curr_owners:
+                if moved:
+                    self.__release_owners({ owner })
+                continue
+            curr_owners.add(owner)
+            if not moved:
+                self.owned[owner] = self.owned.get(owner, 0) + 1
+
+    def __release_owners(self, owners: set[str]):
+        for owner in owners:
+            count = self.owned.get(owner, 0) - 1
+            if count > 0:
+                self.owned[owner] = count
+            else:
+                self.owned.pop(owner, None)
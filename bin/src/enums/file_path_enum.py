@@ -39,6 +39,46 @@ class FilePathEnum(Enum):
         'server': 'MangaTracker/Manga-Tracker-UI/bin/db/editing.json',
         'mock': './db/mocks/mock-editing.json'
     }
+    TILE_FINGERPRINTS = {
+        'local': './db/tile_fingerprints.json',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/tile_fingerprints.json',
+        'mock': './db/mocks/tile_fingerprints.json'
+    }
+    RUN_JOURNAL = {
+        'local': './db/run_journal.jsonl',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/run_journal.jsonl',
+        'mock': './db/mocks/run_journal.jsonl'
+    }
+    CHANGE_SET = {
+        'local': './db/change_set.ndjson',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/change_set.ndjson',
+        'mock': './db/mocks/change_set.ndjson'
+    }
+    SERIES_CACHE = {
+        'local': './db/series_cache.sqlite3',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/series_cache.sqlite3',
+        'mock': './db/mocks/series_cache.sqlite3'
+    }
+    SERIES_RESOLUTIONS = {
+        'local': './db/series_resolutions.sqlite3',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/series_resolutions.sqlite3',
+        'mock': './db/mocks/series_resolutions.sqlite3'
+    }
+    HTTP_FIXTURES = {
+        'local': './db/fixtures/http',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/fixtures/http',
+        'mock': './db/fixtures/http'
+    }
+    SCRAPE_METRICS = {
+        'local': './db/scrape_metrics.json',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/scrape_metrics.json',
+        'mock': './db/mocks/scrape_metrics.json'
+    }
+    SCRAPE_METRICS_PROM = {
+        'local': './db/scrape_metrics.prom',
+        'server': 'MangaTracker/Manga-Tracker-UI/bin/db/scrape_metrics.prom',
+        'mock': './db/mocks/scrape_metrics.prom'
+    }
     LOGS = {
         'local': './logs/',
         'server': 'MangaTracker/Manga-Tracker-UI/bin/logs/',
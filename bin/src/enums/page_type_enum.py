@@ -0,0 +1,10 @@
+'''Enum for the types of html pages the scrapers parse.'''
+from enum import Enum
+
+class PageTypeEnum(Enum):
+    '''Enum for the types of html pages the scrapers parse.'''
+
+    LISTING = 'listing'
+    DETAIL = 'detail'
+    ISBN = 'isbn'
+    BARNES_AND_NOBLE = 'barnes_and_noble'
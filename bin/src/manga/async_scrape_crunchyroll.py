@@ -0,0 +1,397 @@
+'''
+This script is an asyncio based alternative to the threaded Crunchyroll scraper.  It runs
+every listing page, item, and external request from a single event loop, with a bounded
+number of requests in flight per remote host instead of a thread per request.
+
+Functions:
+- run_scraper(start, end, resume): Scrapes the website for manga volumes and series using the event loop.
+- scrape_page_async(item): Scrapes a single item from a listing page.
+'''
+
+import asyncio
+import json
+import traceback
+from typing import Any
+from bs4 import BeautifulSoup
+
+from src.database.async_manga_server import AsyncMangaServer
+from src.database.manga_server import MangaServerError
+from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.manga.scrape_crunchyroll import ScrapeCrunchyroll
+from src.util.async_http_client import AsyncHttpClient
+from src.util.single_flight import AsyncSingleFlight
+
+class AsyncScrapeCrunchyroll(ScrapeCrunchyroll):
+    '''
+    A class used to scrape manga volumes and series information from the Crunchyroll store
+    website from a single event loop.  All parsing and record building is shared with
+    `ScrapeCrunchyroll`, only the requests are made asynchronously, and the pages are parsed
+    in the default executor so a large page does not stall the other coroutines.
+
+    ...
+
+    Attributes
+    ----------
+    host_limits : dict[str, int]
+        the max number of concurrent requests per remote host, on top of
+        `HttpClient.HOST_POOL_SIZES`
+    client : AsyncHttpClient
+        the async http client, created when the scraper runs
+    async_manga_server : AsyncMangaServer
+        the async manga server utility, created when the scraper runs
+    async_single_flight : AsyncSingleFlight
+        shares the series written by coroutines at the same time
+
+    Methods
+    -------
+    scrape_page_async(item)
+        Scrapes the given item and updates the manga server with the results.
+    run_scraper(start=int, end=int, resume=bool)
+        Scrapes the Crunchyroll store website using the event loop.
+    '''
+
+    def __init__(self, host: HostEnum):
+        super().__init__(host)
+        # ? the adaptive windows find the concurrency per host, these only override the caps
+        self.host_limits: dict[str, int] = {}
+        self.client: AsyncHttpClient | None = None
+        self.async_manga_server: AsyncMangaServer | None = None
+        self.async_single_flight = AsyncSingleFlight()
+
+
+    async def set_volume_async(self, curr_volume, curr_series, cr_attr, soup_volume,
+                               volume_number, cover_image, series_id, isbn_results, is_bundle):
+        # get volume changes
+        volume_update = self.get_volume_data(curr_volume, curr_series, cr_attr, soup_volume,
+                                             volume_number, cover_image, series_id, isbn_results,
+                                             is_bundle)
+        #* SET volume data
+        if volume_update is not None:
+            await self.async_manga_server.upsert_item('volume', cr_attr['id'], volume_update,
+                                                      [cr_attr['id']])
+        self.log_volume_update(curr_volume, volume_update)
+
+
+    async def set_series_async(self, curr_volume, cr_attr) -> dict[str, Any] | None:
+        # ? the volumes of a series are written once the run ends, see write_series_volumes
+        series_id = self.get_attr(curr_volume, 'series_id')
+        curr_series = await self.async_manga_server.get_item('series', series_id) \
+            if series_id is not None else None
+        if curr_series is not None:
+            return self.use_known_series(curr_series)
+
+        if self.should_search_series(curr_volume, cr_attr):
+            new_series = await self.series_search.search_series_async(cr_attr['brand'],
+                                                                      cr_attr['category'],
+                                                                      cr_attr['name'],
+                                                                      self.client)
+            if new_series['series_id'] is not None:
+                return await self.async_single_flight.do(
+                    ('series', new_series['series_id']),
+                    lambda: self.save_series_async(curr_volume, new_series, cr_attr['id'])
+                )
+        return self.skip_series(cr_attr)
+
+
+    async def save_series_async(self, curr_volume, new_series: dict, isbn: str) -> dict:
+        curr_series = await self.async_manga_server.get_item('series', new_series['series_id']) \
+            if self.get_attr(curr_volume, 'series_id') is None else None
+        await self.async_manga_server.upsert_item('series', new_series['series_id'], new_series,
+                                                  [isbn])
+        return self.log_saved_series(curr_series, new_series)
+
+
+    async def set_market_data_async(self, item, isbn: str):
+        market = self.get_market_data(item, isbn)
+        await self.async_manga_server.upsert_item('market', isbn, market, [isbn])
+        self.logger.info('market details saved to DB: %s', json.dumps(market))
+
+
+    async def set_shop_stock_update_async(self, shop):
+        curr_shop = await self.get_record_async('shop', shop['isbn'], shop['item_id'])
+        shop['last_stock_update'] = self.get_last_stock_update(curr_shop, shop['stock_status'])
+
+
+    async def set_shops_data_async(self, item, cr_attr, isbn: str, isbn_results,
+                                   is_bundle: bool):
+        shops = self.get_shops_data(item, cr_attr, isbn, isbn_results, is_bundle)
+        await asyncio.gather(*[
+            self.set_shop_stock_update_async(shop) for shop in shops
+        ])
+        #* save to DB
+        await self.async_manga_server.upsert_many('shop', {
+            shop['item_id']: shop for shop in shops
+        }, [isbn])
+        self.logger.info('shop details saved to DB: %s', json.dumps(shops))
+
+
+    async def set_bundle_data_async(self, is_bundle, curr_bundle, isbn, series_id, cover_image,
+                                    soup_volume: BeautifulSoup | None):
+        bundle = self.get_bundle_data(is_bundle, curr_bundle, isbn, series_id, cover_image,
+                                      soup_volume)
+        if bundle is None:
+            return
+        await self.async_manga_server.upsert_item('bundle', isbn, bundle, [isbn])
+        self.logger.info('Bundle details %s in DB: %s',
+                         'added' if curr_bundle is None else 'updated', json.dumps(bundle))
+
+
+    async def get_isbn_results_async(self, isbn: str, curr_volume):
+        if self.should_search_isbn(curr_volume):
+            return await self.scrape_isbn.isbn_search_async(isbn, self.client)
+        self.logger.info('Volume exists, ISBN search skipped...')
+        return None
+
+
+    async def get_volume_detail_soup_async(self, cr_attr, curr_volume, curr_bundle):
+        if self.should_fetch_volume_detail(curr_volume, curr_bundle):
+            # fetch data for description and more images
+            self.logger.info('Scraping CR page for description and more cover images: %s',
+                             cr_attr['id'])
+            return await self.parse_page_async(await self.client.get_text(cr_attr['url']),
+                                               PageTypeEnum.DETAIL)
+        return None
+
+
+    async def scrape_page_async(self, item):
+        '''
+        Scrapes the given item for manga volumes and series, and updates the manga server
+        with the results.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+        '''
+        started = self.start_scrape(item)
+        if started is None:
+            return
+        cr_attr, isbn, fingerprint = started
+
+        # ? batch 1: get vol / bundle data
+        with self.metrics.time_stage('batch_1'):
+            curr_volume, curr_bundle = await asyncio.gather(
+                self.get_record_async('volume', isbn),
+                self.get_record_async('bundle', isbn)
+            )
+
+        # ? batch 2: set market / series, isbn results, volume details
+        with self.metrics.time_stage('batch_2'):
+            _, curr_series, isbn_results, soup_volume = await asyncio.gather(
+                self.set_market_data_async(item, isbn),
+                self.set_series_async(curr_volume, cr_attr),
+                self.get_isbn_results_async(isbn, curr_volume),
+                self.get_volume_detail_soup_async(cr_attr, curr_volume, curr_bundle)
+            )
+
+        series_id, is_bundle, cover_image, volume_number = self.get_item_details(
+            item, cr_attr, curr_series)
+
+        # ? batch 3: set bundle / shops / volume
+        with self.metrics.time_stage('batch_3'):
+            await asyncio.gather(
+                self.set_bundle_data_async(is_bundle, curr_bundle, isbn, series_id,
+                                           cover_image, soup_volume),
+                self.set_shops_data_async(item, cr_attr, isbn, isbn_results, is_bundle),
+                self.set_volume_async(curr_volume, curr_series, cr_attr, soup_volume,
+                                      volume_number, cover_image, series_id, isbn_results,
+                                      is_bundle)
+            )
+
+        self.finish_scrape(isbn, fingerprint)
+
+
+    async def wait_for_manga_server_async(self) -> bool:
+        '''Waits while the manga server is unavailable, see `wait_for_manga_server`.'''
+        while not self.circuit_breaker.has_given_up():
+            wait_seconds = self.circuit_breaker.get_wait_seconds()
+            if wait_seconds <= 0:
+                return True
+            await asyncio.sleep(min(wait_seconds, 1))
+        return False
+
+
+    async def process_item_async(self, item, page_num, end_page):
+        isbn = self.start_item(item, page_num, end_page)
+        try:
+            attempt = 0
+            while True:
+                if not await self.wait_for_manga_server_async():
+                    self.logger.error('Manga server is down... leaving item %s to resume', isbn)
+                    return
+                try:
+                    with self.metrics.time_stage('item'):
+                        await self.scrape_page_async(item)
+                    break
+                except MangaServerError as e:
+                    attempt = self.retry_item(isbn, e, attempt)
+        except Exception:
+            self.logger.error('Error scraping item... skipping...')
+            self.logger.error(traceback.format_exc())
+            return
+        finally:
+            self.page_prefetch.release(isbn)
+        self.finish_item(page_num, isbn)
+
+
+    async def get_record_async(self, item_type: str, isbn: str, item_id: str | None = None):
+        prefetched, record = self.page_prefetch.get(item_type, isbn, item_id)
+        if prefetched:
+            return record
+        return await self.async_manga_server.get_item(item_type, item_id or isbn)
+
+
+    async def prefetch_page_async(self, items):
+        item_filters, isbns = self.get_prefetch_request(items)
+        if len(isbns) == 0:
+            return
+        with self.metrics.time_stage('prefetch'):
+            records = await asyncio.gather(*[
+                self.async_manga_server.get_many(item_type, isbns, filter_by)
+                for item_type, filter_by in item_filters.items()
+            ])
+        self.add_prefetched(item_filters, isbns, records)
+
+
+    async def start_server_index_async(self):
+        self.server_index.start()
+        if self.use_server_index:
+            with self.metrics.time_stage('server_index'):
+                await self.async_manga_server.load_index()
+        self.index_known_series()
+
+
+    async def write_series_volumes_async(self):
+        series_ids = self.get_linked_series_ids()
+        try:
+            with self.metrics.time_stage('series_volumes'):
+                all_series = await asyncio.gather(*[
+                    self.async_manga_server.get_item('series', series_id)
+                    for series_id in series_ids
+                ])
+                for series_id, series in self.get_series_volumes(series_ids,
+                                                                 all_series).items():
+                    await self.async_manga_server.upsert_item(
+                        'series', series_id, series, self.series_aggregator.get_isbns(series_id))
+        except MangaServerError:
+            self.forget_series_volumes()
+
+
+    async def get_page_soup_async(self, start: int):
+        self.logger.info('Calling: %s', self.get_page_url(start))
+        with self.metrics.time_stage('listing_page'):
+            return await self.parse_page_async(
+                await self.client.get_text(self.get_page_url(start)), PageTypeEnum.LISTING
+            )
+
+
+    async def parse_page_async(self, html: str, page_type: PageTypeEnum) -> BeautifulSoup:
+        '''
+        Parses the given html page in the default executor, off the event loop.
+
+        Parameters:
+        - html (str): The page contents.
+        - page_type (PageTypeEnum): The type of the page, to pick its strainer.
+
+        Returns:
+        - BeautifulSoup: The parsed page.
+        '''
+        return await asyncio.to_thread(self.html_extractor.parse, html, page_type)
+
+
+    async def fetch_pages_async(self, first_soup, start: int, end: int, start_page: int,
+                                end_page: int, item_queue: asyncio.Queue):
+        try:
+            for i in range(start_page, end_page):
+                if self.circuit_breaker.has_given_up():
+                    self.logger.error('Manga server is down... stopping at page %s', str(i))
+                    return False
+                page_start = start + (i - start_page) * 100
+                next_soup = first_soup if i == start_page \
+                    else await self.get_page_soup_async(page_start)
+                items, pending, reached_known_items = self.read_page(next_soup, page_start, end, i)
+                await self.prefetch_page_async(pending)
+                for item in pending:
+                    await item_queue.put((item, i))
+                if self.is_last_page(items, i, reached_known_items):
+                    break
+            return True
+        except Exception:
+            self.logger.error('Error fetching listing pages... stopping...')
+            self.logger.error(traceback.format_exc())
+            return False
+        finally:
+            for _ in range(self.worker_count):
+                await item_queue.put(None)
+
+
+    async def process_items_async(self, item_queue: asyncio.Queue, end_page: int):
+        while True:
+            queued = await item_queue.get()
+            if queued is None:
+                return
+            item, page_num = queued
+            await self.process_item_async(item, page_num, end_page)
+            self.count_completed_item()
+
+
+    async def run_scraper_async(self, start: int, end: int):
+        '''
+        Run the scraper from the event loop.  A page fetcher coroutine prefetches listing pages
+        into a bounded queue while a fixed number of worker coroutines scrape items from it.
+
+        Parameters:
+        - start (int): The offset of the first listing item to scrape.
+        - end (int): The offset of the listing item to stop before.
+        '''
+        async with AsyncHttpClient(self.host, self.host_limits) as client:
+            self.client = client
+            self.async_manga_server = AsyncMangaServer(self.host, client, self.metrics,
+                                                       self.write_buffer, self.server_index,
+                                                       self.circuit_breaker,
+                                                       self.change_set if self.dry_run else None)
+            self.start_crawl()
+            await self.start_server_index_async()
+
+            first_soup = await self.get_page_soup_async(start)
+            start_page, end_page = self.get_listing_range(first_soup, start, end)
+
+            item_queue = asyncio.Queue(maxsize=self.prefetch_pages * 100)
+            self.async_manga_server.start_flusher()
+            try:
+                listing_complete, *_ = await asyncio.gather(
+                    self.fetch_pages_async(first_soup, start, end, start_page, end_page,
+                                           item_queue),
+                    *[
+                        self.process_items_async(item_queue, end_page)
+                        for _ in range(self.worker_count)
+                    ]
+                )
+                await self.write_series_volumes_async()
+            finally:
+                await self.async_manga_server.stop_flusher()
+            await self.async_manga_server.flush_writes()
+            self.finish_crawl(listing_complete)
+
+        self.client = None
+        self.async_manga_server = None
+
+
+    def run_scraper(self, start: int = 0, end: int = 10000000000, resume: bool = False):
+        '''
+        Run the scraper to scrape the Crunchyroll store website for manga volumes
+        and series information, using a single event loop.
+
+        Parameters:
+        - start (int): The offset of the first listing item to scrape.
+        - end (int): The offset of the listing item to stop before.
+        - resume (bool): Whether to resume the last run that did not finish, from its journal.
+        '''
+        if not self.enable_scrape:
+            self.logger.info('Scraping is disabled... exiting...')
+            return
+
+        start, end = self.start_run(start, end, resume)
+        self.start_metrics()
+        asyncio.run(self.run_scraper_async(start, end))
+        self.save_metrics()
+        self.logger.info('Finished scraping...')
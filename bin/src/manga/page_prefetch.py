@@ -0,0 +1,119 @@
+'''Module to hold the manga server records prefetched for a listing page.'''
+
+import threading
+
+class PagePrefetch:
+    '''
+    A class used to hold the manga server records prefetched for the items of a listing page,
+    so each item reads them from memory instead of making a request per record.
+
+    Records are grouped per item type and isbn.  An isbn that was prefetched but has no record
+    of the type is known not to exist, so the item skips the request that would only fail.
+    An isbn already prefetched earlier in the run is not prefetched again, since its records
+    may have been written since, and the records of an item type whose request failed are not
+    held at all.  Both fall back to a request per record.  The records of an item are dropped
+    once it is scraped.
+
+    ...
+
+    Attributes
+    ----------
+    records : dict[tuple[str, str], dict[str, dict]]
+        the prefetched records per (item type, isbn), keyed by their id
+
+    Methods
+    -------
+    start()
+        Drops every record and forgets the isbns prefetched.
+    claim_isbns(isbns=list)
+        Gets the isbns not prefetched before in the run, and marks them as prefetched.
+    add(item_type=str, isbns=list, items=dict)
+        Holds the records of an item type fetched for the given isbns.
+    get(item_type=str, isbn=str, item_id=str)
+        Gets a prefetched record.
+    release(isbn=str)
+        Drops the records of an item once it is scraped.
+    '''
+
+    # item types prefetched, and the index filter of the manga server listing them by isbn
+    ITEM_FILTERS = {
+        'volume': 'ids',
+        'bundle': 'ids',
+        'shop': 'isbns'
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        '''Drops every record and forgets the isbns prefetched.'''
+        with self.lock:
+            self.records: dict[tuple[str, str], dict[str, dict]] = {}
+            self.claimed: set[str] = set()
+
+    def claim_isbns(self, isbns: list[str]) -> list[str]:
+        '''
+        Gets the isbns not prefetched before in the run, and marks them as prefetched.
+
+        Parameters:
+        - isbns (list[str]): The isbns of the items of a listing page.
+
+        Returns:
+        - list[str]: The isbns to prefetch, in order.
+        '''
+        with self.lock:
+            claimed = [isbn for isbn in dict.fromkeys(isbns) if isbn not in self.claimed]
+            self.claimed.update(claimed)
+            return claimed
+
+    def add(self, item_type: str, isbns: list[str], items: dict[str, dict] | None):
+        '''
+        Holds the records of an item type fetched for the given isbns.
+
+        Parameters:
+        - item_type (str): The type of the records, ex: 'volume'.
+        - isbns (list[str]): The isbns the records were fetched for.
+        - items (dict[str, dict]): The records found keyed by their id, or None if the
+        request failed.
+        '''
+        if items is None:
+            return
+        grouped: dict[str, dict[str, dict]] = { isbn: {} for isbn in isbns }
+        for item_id, item in items.items():
+            isbn = item.get('isbn', item_id)
+            if isbn in grouped:
+                grouped[isbn][item_id] = item
+        with self.lock:
+            for isbn, isbn_items in grouped.items():
+                self.records[(item_type, isbn)] = isbn_items
+
+    def get(self, item_type: str, isbn: str, item_id: str | None = None):
+        '''
+        Gets a prefetched record.
+
+        Parameters:
+        - item_type (str): The type of the record.
+        - isbn (str): The isbn of the item the record belongs to.
+        - item_id (str): The id of the record, if it is not the isbn, ex: a shop id.
+
+        Returns:
+        - tuple[bool, dict | None]: Whether the record was prefetched, and the record or None
+        if it does not exist.
+        '''
+        with self.lock:
+            isbn_items = self.records.get((item_type, isbn))
+            if isbn_items is None:
+                return False, None
+            return True, isbn_items.get(item_id or isbn)
+
+    def release(self, isbn: str):
+        '''
+        Drops the records of an item once it is scraped.
+
+        Parameters:
+        - isbn (str): The isbn of the item.
+        '''
+        with self.lock:
+            for item_type in self.ITEM_FILTERS:
+                self.records.pop((item_type, isbn), None)
@@ -0,0 +1,272 @@
+'''Module to journal the progress of a scrape run so it can be resumed.'''
+
+from datetime import datetime
+import json
+import os
+import threading
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class RunJournal:
+    '''
+    A class used to journal the listing pages and items completed during a scrape run, so a
+    run that crashed or was stopped can resume where it left off.
+
+    The journal is an append-only file with one json entry per line, flushed as each entry
+    is written, so everything completed before a crash is kept.  An item is completed once
+    every write of it is saved, along with the series its volume was linked to, which is only
+    written when the run ends, and a page once every item queued from it is completed.  An
+    item that fails is never completed, and a completed item whose series could not be
+    written is reopened, so it is scraped again when the run is resumed.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    start : int
+        the offset of the first listing item of the journaled run
+    end : int
+        the offset of the listing item the journaled run stops before
+    completed_items : dict[str, int]
+        the listing page of each item completed during the journaled run, keyed by its ISBN
+    completed_pages : set[int]
+        the numbers of the listing pages completed during the journaled run
+    series_links : dict[str, tuple[str, str, str | None]]
+        the (series id, category, volume number) each completed item was linked to, keyed by
+        its ISBN
+
+    Methods
+    -------
+    load()
+        Loads the journal of the last run, if there is one.
+    start_run(start=int, end=int)
+        Starts a new journal for a run over the given offsets.
+    resume_run()
+        Continues the journal of the last run from its first page that is not completed.
+    is_item_completed(isbn=str)
+        Checks if the item was completed during the journaled run.
+    expect_page(page=int, isbns=list[str])
+        Records the items queued from a listing page.
+    complete_item(page=int, isbn=str, series_link=tuple)
+        Records an item as completed.
+    reopen_item(isbn=str)
+        Records a completed item as not completed anymore.
+    is_complete()
+        Checks if every page queued during the run is completed.
+    finish_run()
+        Marks the journaled run as finished.
+    close()
+        Closes the journal without finishing the run, so it can be resumed.
+    '''
+
+    def __init__(self, host: HostEnum):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.file_path = FilePathEnum.RUN_JOURNAL.value[host.value]
+        self.lock = threading.Lock()
+        self.journal_file = None
+        self.start = 0
+        self.end = 0
+        self.finished = True
+        self.completed_items: dict[str, int] = {}
+        self.completed_pages: set[int] = set()
+        self.series_links: dict[str, tuple[str, str, str | None]] = {}
+        self.pending: dict[int, set[str]] = {}
+
+    def load(self) -> bool:
+        '''
+        Loads the journal of the last run, if there is one.
+
+        Returns:
+        - bool: True if the last run did not finish and can be resumed.
+        '''
+        if not os.path.exists(self.file_path):
+            self.logger.info('No run journal found at %s...', self.file_path)
+            return False
+
+        self.completed_items = {}
+        self.completed_pages = set()
+        self.series_links = {}
+        self.finished = True
+        with open(self.file_path, 'r', encoding='UTF-8') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # ? the last line may be cut short by a crash
+                    self.logger.warning('Skipping unreadable run journal entry: %s', line)
+                    continue
+                if entry['event'] == 'run':
+                    self.start = entry['start']
+                    self.end = entry['end']
+                    self.finished = False
+                elif entry['event'] == 'item':
+                    self.completed_items[entry['isbn']] = entry['page']
+                    if entry.get('series') is not None:
+                        self.series_links[entry['isbn']] = tuple(entry['series'])
+                elif entry['event'] == 'page':
+                    self.completed_pages.add(entry['page'])
+                elif entry['event'] == 'reopen':
+                    self.completed_items.pop(entry['isbn'], None)
+                    self.series_links.pop(entry['isbn'], None)
+                    self.completed_pages.discard(entry['page'])
+                elif entry['event'] == 'finish':
+                    self.finished = True
+
+        self.logger.info('Loaded run journal with %s completed pages and %s completed items',
+                         len(self.completed_pages), len(self.completed_items))
+        return not self.finished
+
+    def start_run(self, start: int, end: int):
+        '''
+        Starts a new journal for a run over the given offsets, replacing the last one.
+
+        Parameters:
+        - start (int): The offset of the first listing item.
+        - end (int): The offset of the listing item to stop before.
+        '''
+        self.start = start
+        self.end = end
+        self.finished = False
+        self.completed_items = {}
+        self.completed_pages = set()
+        self.series_links = {}
+        self.pending = {}
+        self.__open('w')
+        self.__write({
+            'event': 'run', 'start': start, 'end': end, 'started_at': str(datetime.now())
+        })
+
+    def resume_run(self) -> int:
+        '''
+        Continues the journal of the last run from its first page that is not completed.
+        Must be called after `load` found a run to resume.
+
+        Returns:
+        - int: The offset of the first listing item to scrape.
+        '''
+        start_page = self.start // 100
+        resume_page = start_page
+        while resume_page in self.completed_pages:
+            resume_page += 1
+        resume_start = self.start + (resume_page - start_page) * 100
+
+        self.pending = {}
+        self.__open('a')
+        self.__write({
+            'event': 'resume', 'start': resume_start, 'resumed_at': str(datetime.now())
+        })
+        self.logger.info('Resuming run from page %s at offset %s...', resume_page, resume_start)
+        return resume_start
+
+    def is_item_completed(self, isbn: str) -> bool:
+        '''
+        Checks if the item was completed during the journaled run.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+
+        Returns:
+        - bool: True if the item was completed.
+        '''
+        with self.lock:
+            return isbn in self.completed_items
+
+    def expect_page(self, page: int, isbns: list[str]):
+        '''
+        Records the items queued from a listing page, the page is completed once they are.
+
+        Parameters:
+        - page (int): The number of the listing page.
+        - isbns (list[str]): The ISBNs of the items queued from the page.
+        '''
+        with self.lock:
+            self.pending[page] = set(isbns)
+            self.__complete_page(page)
+
+    def complete_item(self, page: int, isbn: str,
+                      series_link: tuple[str, str, str | None] | None = None):
+        '''
+        Records an item as completed.
+
+        Parameters:
+        - page (int): The number of the listing page of the item.
+        - isbn (str): The ISBN of the item.
+        - series_link (tuple[str, str, str | None]): The (series id, category, volume number)
+        the volume was linked to, see `SeriesAggregator.link`, or None if it has no series.
+        '''
+        with self.lock:
+            self.completed_items[isbn] = page
+            entry = { 'event': 'item', 'page': page, 'isbn': isbn }
+            if series_link is not None:
+                self.series_links[isbn] = series_link
+                entry['series'] = list(series_link)
+            self.__write(entry)
+            if page in self.pending:
+                self.pending[page].discard(isbn)
+                self.__complete_page(page)
+
+    def reopen_item(self, isbn: str):
+        '''
+        Records a completed item as not completed anymore, ex: when the series it was linked
+        to could not be written, so the run is not finished and resuming it scrapes the item
+        again.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+        '''
+        with self.lock:
+            page = self.completed_items.pop(isbn, None)
+            if page is None:
+                return
+            self.series_links.pop(isbn, None)
+            self.completed_pages.discard(page)
+            self.pending.setdefault(page, set()).add(isbn)
+            self.__write({ 'event': 'reopen', 'page': page, 'isbn': isbn })
+
+    def is_complete(self) -> bool:
+        '''
+        Checks if every page queued during the run is completed.
+
+        Returns:
+        - bool: True if no queued item is left to complete.
+        '''
+        with self.lock:
+            return len(self.pending) == 0
+
+    def finish_run(self):
+        '''Marks the journaled run as finished, a finished run is not resumed.'''
+        with self.lock:
+            self.__write({ 'event': 'finish', 'finished_at': str(datetime.now()) })
+            self.finished = True
+        self.close()
+
+    def close(self):
+        '''Closes the journal without finishing the run, so it can be resumed.'''
+        with self.lock:
+            if self.journal_file is not None:
+                self.journal_file.close()
+                self.journal_file = None
+
+    def __complete_page(self, page: int):
+        if len(self.pending[page]) == 0:
+            del self.pending[page]
+            self.completed_pages.add(page)
+            self.__write({ 'event': 'page', 'page': page })
+
+    def __open(self, mode: str):
+        if self.journal_file is not None:
+            self.journal_file.close()
+        self.journal_file = open(self.file_path, mode, encoding='UTF-8')
+
+    def __write(self, entry: dict):
+        self.journal_file.write(json.dumps(entry) + '\n')
+        self.journal_file.flush()
@@ -3,10 +3,12 @@
 from datetime import datetime
 import traceback
 
-from bs4 import BeautifulSoup
 import requests
 
 from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.util.html_extractor import HtmlExtractor
+from src.util.http_client import HttpClient
 from src.util.manga_logger import MangaLogger
 
 class ScrapeBarnesAndNoble:
@@ -33,6 +35,8 @@ class ScrapeBarnesAndNoble:
 
     def __init__(self, host: HostEnum):
         self.logger = MangaLogger(host).register_logger(__name__)
+        self.http_client = HttpClient(host)
+        self.html_extractor = HtmlExtractor(host)
 
     def get_barnes_and_noble_data(self, isbn: str, vol_shop_data: list):
         '''
@@ -49,10 +53,8 @@ class ScrapeBarnesAndNoble:
         try:
             url = 'https://barnesandnoble.com/w/?ean=' + isbn
             self.logger.info('Getting Barnes & Noble data for %s...', isbn)
-            soup_bn_data = BeautifulSoup(
-                requests.get(url, timeout=30).text,
-                'html.parser'
-            )
+            soup_bn_data = self.html_extractor.parse(self.http_client.get(url).text,
+                                                     PageTypeEnum.BARNES_AND_NOBLE)
             formats = soup_bn_data.find_all('div', {'class': 'pdp-commerce-format'})
             valid_format = [format for format in formats if 'Paperback' in format.text]
             store_price = float(valid_format[0].find('div', {'class': 'format-price'})
@@ -14,18 +14,34 @@ and updates the given data structures with the results.
 from concurrent.futures import ThreadPoolExecutor
 import json
 import math
-import re
+from queue import Queue
 from datetime import datetime
+import threading
+import time
 import traceback
-from typing import Any, List
-import requests
+from typing import Any
 from bs4 import BeautifulSoup
 
-from src.database.manga_server import MangaServer
+from src.database.change_set import ChangeSet
+from src.database.manga_server import MangaServer, MangaServerError, \
+    MangaServerUnavailableError
+from src.database.server_index import ServerIndex
+from src.database.write_buffer import WriteBuffer
 from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.manga.page_prefetch import PagePrefetch
+from src.manga.run_journal import RunJournal
 from src.manga.scrape_isbn import ScrapeISBN
+from src.manga.series_aggregator import SeriesAggregator
 from src.manga.series_search import SeriesSearch
+from src.manga.tile_fingerprint import TileFingerprint, TileFingerprintStore
+from src.manga.title_parser import TitleParser
+from src.util.circuit_breaker import CircuitBreaker
+from src.util.html_extractor import HtmlExtractor
+from src.util.http_client import HttpClient
 from src.util.manga_logger import MangaLogger
+from src.util.scrape_metrics import ScrapeMetrics
+from src.util.single_flight import SingleFlight
 
 # fix:
 # - some series are not getting caught, ex: "Spice and Wolf"
@@ -39,7 +55,6 @@ from src.util.manga_logger import MangaLogger
 # - fix amazon stock status
 # - find a way to get age ratings / adult tag -> Amazon has this
 # - fix b&n query and check if b&n ever has a sale?
-# - memory management on series_cache?
 
 class ScrapeCrunchyroll:
     '''
@@ -59,6 +74,26 @@ class ScrapeCrunchyroll:
         a utility to scrape Barnes & Noble data
     data : Data
         a utility to access book data
+    fingerprint_store : TileFingerprintStore
+        the tile fingerprint of every item at its last successful scrape
+    run_journal : RunJournal
+        the listing pages and items completed during the current run
+    metrics : ScrapeMetrics
+        the stage timings, http latencies, throughput and record counts of the current run
+    page_prefetch : PagePrefetch
+        the manga server records prefetched for the items of the queued listing pages
+    write_buffer : WriteBuffer
+        the creates and updates waiting to be sent to the manga server in bulk
+    server_index : ServerIndex
+        the manga server records the run compares against, loaded when it starts
+    series_aggregator : SeriesAggregator
+        the volumes linked to each series during the run, written once it ends
+    circuit_breaker : CircuitBreaker
+        pauses the run while the manga server is unavailable, and stops it if it stays down
+    change_set : ChangeSet
+        the file a dry run records its writes to instead of sending them
+    single_flight : SingleFlight
+        shares the series written by workers at the same time
 
     Methods
     -------
@@ -67,7 +102,7 @@ class ScrapeCrunchyroll:
     scrape_page(item, all_volumes, all_series, all_shop)
         Scrapes the given URL for manga volumes and series, and updates the given data structures
         with the results.
-    run_scraper()
+    run_scraper(start=int, end=int, resume=bool)
         Scrapes the Crunchyroll store website for manga volumes and series information.
     '''
 
@@ -76,15 +111,57 @@ class ScrapeCrunchyroll:
         self.host = host
         self.scrape_isbn = ScrapeISBN(host)
         self.series_search = SeriesSearch(host)
-        self.manga_server = MangaServer(host)
+        self.metrics = ScrapeMetrics(host)
+        # writes are sent in bulk every 100 records or 5 seconds
+        self.write_buffer = WriteBuffer(host, max_records=100, max_seconds=5.0)
+        self.server_index = ServerIndex(host)
+        self.circuit_breaker = CircuitBreaker(host, 'Manga server')
+        self.manga_server = MangaServer(host, self.metrics, self.write_buffer, self.server_index,
+                                        self.circuit_breaker)
+        self.http_client = HttpClient(host)
+        self.html_extractor = HtmlExtractor(host)
+        self.tile_fingerprint = TileFingerprint()
+        self.title_parser = TitleParser()
+        self.fingerprint_store = TileFingerprintStore(host)
+        self.run_journal = RunJournal(host)
+        self.page_prefetch = PagePrefetch()
+        self.series_aggregator = SeriesAggregator()
+        self.change_set = ChangeSet(host)
+        self.single_flight = SingleFlight()
 
         self.enable_scrape = True
+        # skip every server call for items whose listing tile has not changed
+        self.skip_unchanged_items = True
+        # load every volume, series, bundle and shop when the run starts, instead of reading
+        # them item by item
+        self.use_server_index = True
+        # record every write to a change set for `apply_change_set.py` instead of sending it,
+        # to the default change set file unless a path is given
+        self.dry_run = False
+        self.change_set_path: str | None = None
+
+        # item workers, and how many listing pages the page fetcher may queue ahead of them
+        self.worker_count = 20
+        self.prefetch_pages = 2
+        self.items_completed = 0
+        self.progress_lock = threading.Lock()
+        # the listing page of every item scraped whose writes are not all saved yet
+        self.scraped_items: dict[str, int] = {}
+        self.journal_lock = threading.Lock()
+        # times an item is scraped again after the manga server failed one of its requests
+        self.manga_server_retries = 2
+
+        # stop paging once this many items scraped before and unchanged are seen in a row
+        self.incremental = False
+        self.incremental_stop_after = 100
+        self.unchanged_run = 0
 
         self.query_isbn_db = False
         self.query_cr_for_details = False
         self.query_barnes_and_noble = False
 
-        # only used if requires a full refresh of all data
+        # only used if requires a full refresh of all data, refresh_series.py refreshes the
+        # series apart from crawls
         self.force_cr_for_details = False
         self.refresh_volume_details = False
         self.refresh_series_data = False
@@ -101,43 +178,7 @@ class ScrapeCrunchyroll:
         Returns:
         - str: The volume number from the given display name. Or None if no volume number is found.
         '''
-        search_volume = re.search(r' [()]?Volume[a-z]?[()]? \d+\.?\-?\d*', display_name)
-        if search_volume:
-            inner_volume = re.search(r'\d+\.?\-?\d*', search_volume.group(0))
-            if inner_volume:
-                return inner_volume.group(0)
-
-        search_vol = re.search(r' [()]?Vol[a-z]?[()]? \d+\.?\-?\d*', display_name)
-        if search_vol:
-            inner_vol = re.search(r'\d+\.?\-?\d*', search_vol.group(0))
-            if inner_vol:
-                return inner_vol.group(0)
-
-        search_vol_dot = re.search(r' [()]?Vol.[a-z]?[()]? \d+\.?\-?\d*', display_name)
-        if search_vol_dot:
-            inner_vol_dot = re.search(r'\d+\.?\-?\d*', search_vol_dot.group(0))
-            if inner_vol_dot:
-                return inner_vol_dot.group(0)
-
-        search_gn = re.search(r' [()]?Graphic Novel[a-z]?[()]? \d+\.?\-?\d*', display_name)
-        if search_gn:
-            inner_gn = re.search(r'\d+\.?\-?\d*', search_gn.group(0))
-            if inner_gn:
-                return inner_gn.group(0)
-
-        search_box = re.search(r' [()]?Box Set[()]? \d+\.?\-?\d*', display_name)
-        if search_box:
-            inner_box = re.search(r'\d+\.?\-?\d*', search_box.group(0))
-            if inner_box:
-                return inner_box.group(0)
-
-        search_any = re.search(r' [()]?' + category + r'[a-z]?[()]? \d+\.?\-?\d*', display_name)
-        if search_any:
-            inner_any = re.search(r'\d+\.?\-?\d*', search_any.group(0))
-            if inner_any:
-                return inner_any.group(0)
-
-        return None
+        return self.title_parser.parse_volume(display_name, category)
 
 
     def get_volume_data(self, curr_volume, curr_series, cr_attr, soup_volume, volume_number,
@@ -212,90 +253,127 @@ class ScrapeCrunchyroll:
                                              is_bundle)
         #* SET volume data
         if volume_update is not None:
-            if curr_volume is not None:
-                self.manga_server.update_item('volume', cr_attr['id'], volume_update)
-                self.logger.info('Volume updated: %s', json.dumps(volume_update))
-            else:
-                self.manga_server.create_item('volume', volume_update)
-                self.logger.info('Volume created: %s', json.dumps(volume_update))
+            self.manga_server.upsert_item('volume', cr_attr['id'], volume_update, [cr_attr['id']])
+        self.log_volume_update(curr_volume, volume_update)
+
+
+    def log_volume_update(self, curr_volume, volume_update: dict | None):
+        '''
+        Logs the volume update written by `set_volume`, or counts the volume as skipped.
+
+        Parameters:
+        - curr_volume (dict): The volume record currently in the DB, or None.
+        - volume_update (dict): The fields written, or None if nothing was written.
+        '''
+        if volume_update is not None:
+            self.logger.info('Volume %s: %s', 'updated' if curr_volume is not None else 'created',
+                             json.dumps(volume_update))
         else:
+            self.metrics.count_record('volume', 'skipped')
             self.logger.info('Volume exists, not refreshing volume details...')
 
 
-    def update_series_volumes(self, curr_series, isbn) -> List[dict[str, str]]:
-        if isbn not in curr_series['volumes']:
-            # ? maybe do this sorting someday, but for now we can do it in elixir
-            # series_volumes = sorted(
-            #     [
-            #         *curr_series['volumes'],
-            #         series_volume
-            #     ],
-            #     key = lambda x: (
-            #         x['category'],
-            #         -1
-            #         if x['volume'] is None
-            #         else (
-            #             float(x['volume'].split('-')[0])
-            #             if '-' in x['volume']
-            #             else float(x['volume'])
-            #         )
-            #     )
-            # )
-            self.logger.info('Volume added in series: %s to %s',
-                             isbn,
-                             json.dumps(curr_series['volumes']))
-            return [ *curr_series['volumes'], isbn ]
-        return curr_series['volumes']
+    def set_series(self, curr_volume, cr_attr) -> dict[str, Any] | None:
+        # ? the volumes of a series are written once the run ends, see write_series_volumes
+        series_id = self.get_attr(curr_volume, 'series_id')
+        curr_series = self.manga_server.get_item('series', series_id) \
+            if series_id is not None else None
+        if curr_series is not None:
+            return self.use_known_series(curr_series)
+
+        if self.should_search_series(curr_volume, cr_attr):
+            new_series = self.series_search.search_series(cr_attr['brand'],
+                                                          cr_attr['category'],
+                                                          cr_attr['name'])
+            if new_series['series_id'] is not None:
+                # ? workers finding the same new series at once share a single write of it
+                return self.single_flight.do(
+                    ('series', new_series['series_id']),
+                    lambda: self.save_series(curr_volume, new_series, cr_attr['id'])
+                )
+        return self.skip_series(cr_attr)
+
 
+    def use_known_series(self, curr_series: dict) -> dict:
+        '''Logs that the series of a volume is already in the DB, and gets it.'''
+        self.logger.info('Series found in data...: %s %s',
+                         curr_series['title'], curr_series['series_id'])
+        return curr_series
 
-    def set_series(self, curr_volume, cr_attr) -> dict[str, Any] | None:
-        curr_series = None
-        if curr_volume is not None and curr_volume['series_id'] is not None:
-            curr_series = self.manga_server.get_item('series', curr_volume['series_id'])
 
-        if curr_series is not None:
-            curr_series['volumes'] = self.update_series_volumes(curr_series, cr_attr['id'])
-            self.logger.info('Series found in data...: %s %s',
-                             curr_series['title'], curr_series['series_id'])
-            self.manga_server.update_item('series', curr_volume['series_id'], curr_series)
-            self.logger.info('series details updated in DB: %s', json.dumps(curr_series))
-            return curr_series
-
-        if curr_volume is None or self.refresh_series_data:
-            self.logger.info('Series not found in data or forcefully updating series...' +
-                             ' searching for series ID: %s', cr_attr['brand'])
-            new_series = {
-                **self.series_search.search_series(cr_attr['brand'],
-                                                   cr_attr['category'],
-                                                   cr_attr['name']),
-                'volumes': [cr_attr['id']]
-            }
-            if curr_volume is None or curr_volume['series_id'] is None:
-                curr_series = self.manga_server.get_item('series', new_series['series_id'])
+    def should_search_series(self, curr_volume, cr_attr) -> bool:
+        '''
+        Checks if the series of an item should be searched for, since it is not in the DB or
+        series data is refreshed.
+
+        Parameters:
+        - curr_volume (dict): The volume record currently in the DB, or None.
+        - cr_attr (dict): The attributes of the item from Crunchyroll.
 
-            if curr_series is not None:
-                new_series['volumes'] = self.update_series_volumes(curr_series, cr_attr['id'])
-                self.manga_server.update_item('series', new_series['series_id'], new_series)
-                self.logger.info('series getting refreshed, but maintaining volumes: %s',
-                                 json.dumps(new_series))
-                return new_series
+        Returns:
+        - bool: True if the series should be searched for.
+        '''
+        if curr_volume is not None and not self.refresh_series_data:
+            return False
+        self.logger.info('Series not found in data or forcefully updating series...' +
+                         ' searching for series ID: %s', cr_attr['brand'])
+        return True
 
-            if new_series['series_id'] is not None:
-                self.manga_server.create_item('series', new_series)
-                self.logger.info('series details added to DB: %s', json.dumps(new_series))
-                return new_series
 
+    def skip_series(self, cr_attr) -> None:
+        '''Counts the series of an item as skipped, when it is neither known nor found.'''
+        self.metrics.count_record('series', 'skipped')
         self.logger.info('Skipping series search on existing volume: %s', cr_attr['id'])
         return None
 
 
-    def set_market_data(self, item, isbn: str):
+    def save_series(self, curr_volume, new_series: dict, isbn: str) -> dict:
         '''
-        Sets the market data for the given item.
+        Writes a series found by a search, refreshing it if it is already in the manga server.
+
+        Parameters:
+        - curr_volume (dict): The volume of the series in the manga server, or None.
+        - new_series (dict): The series found.
+        - isbn (str): The ISBN of the volume the series was searched for.
+
+        Returns:
+        - dict: The series written.
+        '''
+        curr_series = self.manga_server.get_item('series', new_series['series_id']) \
+            if self.get_attr(curr_volume, 'series_id') is None else None
+        self.manga_server.upsert_item('series', new_series['series_id'], new_series, [isbn])
+        return self.log_saved_series(curr_series, new_series)
+
+
+    def log_saved_series(self, curr_series: dict | None, new_series: dict) -> dict:
+        '''
+        Logs a series written by `save_series`, and gets it.
+
+        Parameters:
+        - curr_series (dict): The series record that was in the DB, or None.
+        - new_series (dict): The series written.
+
+        Returns:
+        - dict: The series written.
+        '''
+        if curr_series is not None:
+            self.logger.info('series getting refreshed, but maintaining volumes: %s',
+                             json.dumps(new_series))
+        else:
+            self.logger.info('series details added to DB: %s', json.dumps(new_series))
+        return new_series
+
+
+    def get_market_data(self, item, isbn: str):
+        '''
+        Gets the market data for the given item.
 
         Parameters:
         - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
         - isbn (str): The ISBN of the item.
+
+        Returns:
+        - dict: The market record for the item.
         '''
         retail_price = max([
             price.attrs['content']
@@ -303,28 +381,38 @@ class ScrapeCrunchyroll:
             item.find('div', {'class': 'price'}) \
                 .find_all('span', {'class': 'value'})
         ])
-        market = {
+        return {
             'isbn': isbn,
             'retail_price': float(retail_price)
         }
-        curr_market = self.manga_server.get_item('market', isbn)
-        if curr_market is not None:
-            self.manga_server.update_item('market', isbn, market)
-            self.logger.info('market details updated in DB: %s', json.dumps(market))
-        else:
-            self.manga_server.create_item('market', market)
-            self.logger.info('market details added to DB: %s', json.dumps(market))
 
 
-    def set_shops_data(self, item, cr_attr, isbn: str, isbn_results, is_bundle: bool):
+    def set_market_data(self, item, isbn: str):
         '''
-        Sets the shop data for the given item.
+        Sets the market data for the given item.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+        - isbn (str): The ISBN of the item.
+        '''
+        market = self.get_market_data(item, isbn)
+        self.manga_server.upsert_item('market', isbn, market, [isbn])
+        self.logger.info('market details saved to DB: %s', json.dumps(market))
+
+
+    def get_shops_data(self, item, cr_attr, isbn: str, isbn_results, is_bundle: bool):
+        '''
+        Gets the shop data for the given item.
 
         Parameters:
         - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
         - cr_attr (dict): The attributes of the item from Crunchyroll.
         - isbn (str): The ISBN of the item.
         - isbn_results (dict): The results of the ISBN search.
+        - is_bundle (bool): Whether the item is a bundle.
+
+        Returns:
+        - list: The shop records for the item, without their last stock update.
         '''
         promotion_text: str = item.find('div', {'class': 'plp-promotion'}).text
         promotion = ''
@@ -338,7 +426,7 @@ class ScrapeCrunchyroll:
                 if '%' in fpromotion_text \
                     else None
 
-        shops = [
+        return [
             {
                 'item_id': isbn + 'CrunchyrollNew',
                 'isbn': isbn,
@@ -365,118 +453,199 @@ class ScrapeCrunchyroll:
                 for shop in (isbn_results['shops'] if isbn_results is not None else [])
             ]
         ]
+
+
+    def get_last_stock_update(self, curr_shop, stock_status):
+        '''
+        Gets the last stock update for a shop given its currently stored record, which only
+        moves when its stock status changes.
+
+        Parameters:
+        - curr_shop (dict): The shop record currently in the DB, or None.
+        - stock_status (str): The newly scraped stock status.
+
+        Returns:
+        - str: The last stock update for the shop.
+        '''
+        return curr_shop['last_stock_update'] \
+            if curr_shop is not None and stock_status == curr_shop['stock_status'] \
+            else str(datetime.now()) #! TODO update all datetime to correct date format...
+
+
+    def set_shops_data(self, item, cr_attr, isbn: str, isbn_results, is_bundle: bool):
+        '''
+        Sets the shop data for the given item.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+        - cr_attr (dict): The attributes of the item from Crunchyroll.
+        - isbn (str): The ISBN of the item.
+        - isbn_results (dict): The results of the ISBN search.
+        '''
+        shops = self.get_shops_data(item, cr_attr, isbn, isbn_results, is_bundle)
         for shop in shops:
-            curr_shop = self.manga_server.get_item('shop', shop['item_id'])
-            stock_status = cr_attr['Inventory_Status']
-            shop['last_stock_update'] = curr_shop['last_stock_update'] \
-                if curr_shop is not None and stock_status != curr_shop['stock_status'] \
-                else str(datetime.now()) #! TODO update all datetime to correct date format...
-            #* save to DB
-            if curr_shop is not None:
-                self.manga_server.update_item('shop', shop['item_id'], shop)
-                self.logger.info('shop details updated in DB: %s', json.dumps(shops))
-            else:
-                self.manga_server.create_item('shop', shop)
-                self.logger.info('shop details added to DB: %s', json.dumps(shops))
+            curr_shop = self.get_record('shop', isbn, shop['item_id'])
+            shop['last_stock_update'] = self.get_last_stock_update(curr_shop,
+                                                                   shop['stock_status'])
+        #* save to DB
+        self.manga_server.upsert_many('shop', { shop['item_id']: shop for shop in shops }, [isbn])
+        self.logger.info('shop details saved to DB: %s', json.dumps(shops))
 
 
-    def set_bundle_data(self, is_bundle, curr_bundle, isbn, series_id, cover_image,
+    def get_bundle_data(self, is_bundle, curr_bundle, isbn, series_id, cover_image,
                         soup_volume: BeautifulSoup | None):
+        '''
+        Gets the bundle data for the given item.
+
+        Parameters:
+        - is_bundle (bool): Whether the item is a bundle.
+        - curr_bundle (dict): The bundle record currently in the DB, or None.
+        - isbn (str): The ISBN of the item.
+        - series_id (str): The series ID of the item.
+        - cover_image (str): The cover image of the item.
+        - soup_volume (BeautifulSoup): The product detail page of the item, or None.
+
+        Returns:
+        - dict: The bundle record for the item, or None if the item is not a bundle.
+        '''
         if not is_bundle:
-            return
+            return None
         bundle_type = 'Bundle' if 'BUNDLE' in isbn else 'Box Set'
         if curr_bundle is not None and not self.refresh_volume_details:
             self.logger.info('Bundle exists, refreshing basic bundle details...')
-            bundle = {
+            return {
                 'item_id': isbn,
                 'series_id': series_id,
                 'shop_id': isbn + 'CrunchyrollNew',
                 'primary_cover_image': cover_image,
                 'type': bundle_type
             }
-            self.manga_server.update_item('bundle', isbn, bundle)
-            self.logger.info('Bundle details updated in DB: %s', json.dumps(bundle))
-        else:
-            bundle = {
-                'item_id': isbn,
-                'series_id': series_id,
-                'shop_id': isbn + 'CrunchyrollNew',
-                'primary_cover_image': cover_image,
-                'volumes': [],
-                'volume_start': None,
-                'volume_end': None,
-                'type': bundle_type
-            }
-            if bundle_type == 'Bundle' and soup_volume is not None:
-                vols = soup_volume.find('div', {'class': 'short-description'}).find_all('a')
-                volumes_partial = [
-                    {
-                        'isbn': vol.attrs['href'].split('-')[-1][:-5],
-                        'display_name': vol.text,
-                        'url': vol.attrs['href']
-                    }
-                    for vol in vols
-                ]
-                bundle['volumes'] = [
-                    {
-                        **vol,
-                        'primary_cover_image': soup_volume.find(
-                            'div',
-                            { 'id': 'pdpCarousel-' + vol["isbn"] }
-                        ).find('img').attrs['src']
-                    }
-                    for vol in volumes_partial
-                ]
-                volume_numbers = [
-                    v for v in [
-                        self.parse_volume(vol['display_name'], '')
-                        for vol in bundle['volumes']
-                    ]
-                    if v is not None
+        bundle = {
+            'item_id': isbn,
+            'series_id': series_id,
+            'shop_id': isbn + 'CrunchyrollNew',
+            'primary_cover_image': cover_image,
+            'volumes': [],
+            'volume_start': None,
+            'volume_end': None,
+            'type': bundle_type
+        }
+        if bundle_type == 'Bundle' and soup_volume is not None:
+            vols = soup_volume.find('div', {'class': 'short-description'}).find_all('a')
+            volumes_partial = [
+                {
+                    'isbn': vol.attrs['href'].split('-')[-1][:-5],
+                    'display_name': vol.text,
+                    'url': vol.attrs['href']
+                }
+                for vol in vols
+            ]
+            bundle['volumes'] = [
+                {
+                    **vol,
+                    'primary_cover_image': soup_volume.find(
+                        'div',
+                        { 'id': 'pdpCarousel-' + vol["isbn"] }
+                    ).find('img').attrs['src']
+                }
+                for vol in volumes_partial
+            ]
+            volume_numbers = [
+                v for v in [
+                    self.parse_volume(vol['display_name'], '')
+                    for vol in bundle['volumes']
                 ]
-                bundle['volume_start'] = min(volume_numbers)
-                bundle['volume_end'] = max(volume_numbers)
-            elif soup_volume is not None:
-                description = soup_volume.find('div', {'class': 'short-description'}).text
-                vol_range = description.split('contains volumes ')[1].split(' ')[0] \
-                    .split('-')
-                bundle['volume_start'] = vol_range[0]
-                bundle['volume_end'] = vol_range[1]
-                # TODO once we have a way to query volume by number, we can auto populate volumes
-
-            if curr_bundle is None:
-                self.manga_server.create_item('bundle', bundle)
-                self.logger.info('Bundle details added to DB: %s', json.dumps(bundle))
-            else:
-                self.manga_server.update_item('bundle', isbn, bundle)
-                self.logger.info('Bundle details updated in DB: %s', json.dumps(bundle))
+                if v is not None
+            ]
+            bundle['volume_start'] = min(volume_numbers)
+            bundle['volume_end'] = max(volume_numbers)
+        elif soup_volume is not None:
+            description = soup_volume.find('div', {'class': 'short-description'}).text
+            vol_range = description.split('contains volumes ')[1].split(' ')[0] \
+                .split('-')
+            bundle['volume_start'] = vol_range[0]
+            bundle['volume_end'] = vol_range[1]
+            # TODO once we have a way to query volume by number, we can auto populate volumes
+        return bundle
+
+
+    def set_bundle_data(self, is_bundle, curr_bundle, isbn, series_id, cover_image,
+                        soup_volume: BeautifulSoup | None):
+        bundle = self.get_bundle_data(is_bundle, curr_bundle, isbn, series_id, cover_image,
+                                      soup_volume)
+        if bundle is None:
+            return
+        self.manga_server.upsert_item('bundle', isbn, bundle, [isbn])
+        self.logger.info('Bundle details %s in DB: %s',
+                         'added' if curr_bundle is None else 'updated', json.dumps(bundle))
+
+
+    def should_search_isbn(self, curr_volume):
+        return (self.query_isbn_db and curr_volume is not None) or curr_volume is None
 
 
     def get_isbn_results(self, isbn: str, curr_volume):
-        if (self.query_isbn_db and curr_volume is not None) or curr_volume is None:
+        if self.should_search_isbn(curr_volume):
             return self.scrape_isbn.isbn_search(isbn)
         else:
             self.logger.info('Volume exists, ISBN search skipped...')
             return None
 
 
-    def get_volume_detail_soup(self, cr_attr, curr_volume, curr_bundle):
+    def should_fetch_volume_detail(self, curr_volume, curr_bundle):
         # remove description check later?
         fetch_cr_data_for_vol = (curr_volume is None or \
                          (curr_volume is not None and 'description' not in curr_volume))
         fetch_cr_data_for_bundle = curr_bundle is None
         force_cr_fetch = self.refresh_volume_details and \
             (self.query_cr_for_details or self.force_cr_for_details)
-        if fetch_cr_data_for_vol or fetch_cr_data_for_bundle or force_cr_fetch:
+        return fetch_cr_data_for_vol or fetch_cr_data_for_bundle or force_cr_fetch
+
+
+    def get_volume_detail_soup(self, cr_attr, curr_volume, curr_bundle):
+        if self.should_fetch_volume_detail(curr_volume, curr_bundle):
             # fetch data for description and more images
             self.logger.info('Scraping CR page for description and more cover images: %s', cr_attr['id'])
-            return BeautifulSoup(
-                requests.get(cr_attr['url'], timeout=30).text,
-                'html.parser'
-            )
+            return self.html_extractor.parse(self.http_client.get(cr_attr['url']).text,
+                                             PageTypeEnum.DETAIL)
         return None
 
 
+    def get_cr_attr(self, item):
+        '''
+        Gets the Crunchyroll attributes for the given item.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+
+        Returns:
+        - dict: The attributes of the item from Crunchyroll.
+        '''
+        # bs4 object to dict
+        return {
+            **json.loads(item.attrs['data-gtmdata']),
+            **json.loads(item.find('div', {'class': 'product-tile'}).attrs['data-segmentdata'])
+        }
+
+
+    def can_skip_item(self, isbn: str, fingerprint: str):
+        '''
+        Checks if the item can skip scraping because its listing tile has not changed since
+        its last successful scrape.  Never skips when a refresh of the stored data is forced.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+        - fingerprint (str): The tile fingerprint of the item.
+
+        Returns:
+        - bool: True if the item can skip scraping.
+        '''
+        forced_refresh = self.refresh_volume_details or self.refresh_series_data or \
+            self.force_cr_for_details or self.query_isbn_db
+        return self.skip_unchanged_items and not forced_refresh and \
+            self.fingerprint_store.is_unchanged(isbn, fingerprint)
+
+
     def get_attr(self, item: Any | None, attr):
         return item[attr] if item is not None else None
 
@@ -489,23 +658,20 @@ class ScrapeCrunchyroll:
         Parameters:
         - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
         '''
-        # bs4 object to dict
-        cr_attr = {
-            **json.loads(item.attrs['data-gtmdata']),
-            **json.loads(item.find('div', {'class': 'product-tile'}).attrs['data-segmentdata'])
-        }
-        isbn = cr_attr['id']
-        self.logger.info('---------- Scraping item... %s | %s ----------', isbn, cr_attr['name'])
+        started = self.start_scrape(item)
+        if started is None:
+            return
+        cr_attr, isbn, fingerprint = started
 
         # ? batch 1: get vol / bundle data
-        with ThreadPoolExecutor() as executor1:
+        with self.metrics.time_stage('batch_1'), ThreadPoolExecutor() as executor1:
             curr_volume, curr_bundle = executor1.map(lambda x: x.result(), [
-                executor1.submit(self.manga_server.get_item, 'volume', isbn),
-                executor1.submit(self.manga_server.get_item, 'bundle', isbn)
+                executor1.submit(self.get_record, 'volume', isbn),
+                executor1.submit(self.get_record, 'bundle', isbn)
             ])
 
         # ? batch 2: set market / series, isbn results, volume details
-        with ThreadPoolExecutor() as executor2:
+        with self.metrics.time_stage('batch_2'), ThreadPoolExecutor() as executor2:
             _, curr_series, isbn_results, soup_volume = executor2.map(lambda x: x.result(), [
                 executor2.submit(self.set_market_data, item, isbn),
                 executor2.submit(self.set_series, curr_volume, cr_attr),
@@ -513,13 +679,11 @@ class ScrapeCrunchyroll:
                 executor2.submit(self.get_volume_detail_soup, cr_attr, curr_volume, curr_bundle)
             ])
 
-        series_id = self.get_attr(curr_series, 'series_id')
-        is_bundle = 'BUNDLE' in isbn or 'Box Set' in cr_attr['name']
-        cover_image = item.find('img', {'class': 'tile-image'}).attrs['src']
-        volume_number = self.parse_volume(cr_attr['name'], cr_attr['category'])
+        series_id, is_bundle, cover_image, volume_number = self.get_item_details(
+            item, cr_attr, curr_series)
 
         # ? batch 3: set bundle / shops / volume
-        with ThreadPoolExecutor() as executor3:
+        with self.metrics.time_stage('batch_3'), ThreadPoolExecutor() as executor3:
             executor3.map(lambda x: x.result(), [
                 executor3.submit(self.set_bundle_data, is_bundle, curr_bundle, isbn, series_id,
                                  cover_image, soup_volume),
@@ -528,91 +692,759 @@ class ScrapeCrunchyroll:
                                  volume_number, cover_image, series_id, isbn_results, is_bundle)
             ])
 
+        self.finish_scrape(isbn, fingerprint)
+
+
+    def start_scrape(self, item) -> tuple[dict, str, str] | None:
+        '''
+        Starts scraping an item, unless its listing tile has not changed, see `can_skip_item`.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+
+        Returns:
+        - tuple[dict, str, str]: The attributes of the item from Crunchyroll, its ISBN and its
+        tile fingerprint, or None if the item is skipped.
+        '''
+        cr_attr = self.get_cr_attr(item)
+        isbn = cr_attr['id']
+        fingerprint = self.tile_fingerprint.fingerprint(item)
+        if self.can_skip_item(isbn, fingerprint):
+            self.metrics.count_record('item', 'skipped')
+            self.logger.info('---------- Skipping unchanged item... %s ----------', isbn)
+            return None
+        self.logger.info('---------- Scraping item... %s | %s ----------', isbn, cr_attr['name'])
+        return cr_attr, isbn, fingerprint
+
+
+    def get_item_details(self, item, cr_attr, curr_series):
+        '''
+        Gets the details of an item the bundle, shop and volume records are built from, and
+        links the volume to its series.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+        - cr_attr (dict): The attributes of the item from Crunchyroll.
+        - curr_series (dict): The series of the item, or None.
+
+        Returns:
+        - tuple[str | None, bool, str, str | None]: The series ID, whether the item is a
+        bundle, its cover image and its volume number.
+        '''
+        isbn = cr_attr['id']
+        series_id = self.get_attr(curr_series, 'series_id')
+        is_bundle = 'BUNDLE' in isbn or 'Box Set' in cr_attr['name']
+        cover_image = item.find('img', {'class': 'tile-image'}).attrs['src']
+        volume_number = self.parse_volume(cr_attr['name'], cr_attr['category'])
+        self.link_series_volume(isbn, series_id, cr_attr, volume_number)
+        return series_id, is_bundle, cover_image, volume_number
+
+
+    def finish_scrape(self, isbn: str, fingerprint: str):
+        '''Records the tile fingerprint of an item once every write of it was made.'''
+        self.fingerprint_store.update(isbn, fingerprint)
         self.logger.info('---------- Finished scraping item... %s ----------', isbn)
 
 
+    def link_series_volume(self, isbn: str, series_id: str | None, cr_attr,
+                           volume_number: str | None):
+        '''
+        Links a volume to its series, to be added to the series once the run ends.
+
+        Parameters:
+        - isbn (str): The ISBN of the volume.
+        - series_id (str): The series ID of the volume, or None if it has no series.
+        - cr_attr (dict): The attributes of the item from Crunchyroll.
+        - volume_number (str): The volume number, or None if it has none.
+        '''
+        if series_id is not None:
+            self.series_aggregator.link(isbn, series_id, cr_attr['category'], volume_number)
+
+
+    def get_series_volumes(self, series_ids: list[str], all_series: list) -> dict[str, dict]:
+        '''
+        Gets the volumes to write per series linked to volumes during the run.  A series that
+        could not be read is left out, rather than overwritten with only this run's volumes,
+        and the items linked to it are reopened, see `reopen_items`.
+
+        Parameters:
+        - series_ids (list[str]): The ids of the series linked to volumes.
+        - all_series (list): The series record of each id, or None if it could not be read.
+
+        Returns:
+        - dict[str, dict]: The volumes of each series, keyed by its id.
+        '''
+        series_volumes = {}
+        for series_id, curr_series in zip(series_ids, all_series):
+            if curr_series is None:
+                self.logger.warning('Could not read series %s... not adding its volumes',
+                                    series_id)
+                self.reopen_items(self.series_aggregator.get_isbns(series_id))
+                continue
+            series_volumes[series_id] = {
+                'volumes': self.series_aggregator.merge_volumes(
+                    series_id, curr_series.get('volumes'),
+                    lambda isbn: self.manga_server.get_indexed('volume', isbn)[1]
+                )
+            }
+        return series_volumes
+
+
+    def write_series_volumes(self):
+        '''
+        Writes the volumes linked to each series during the run, once per series, merged
+        with the volumes it already has.
+        '''
+        series_ids = self.get_linked_series_ids()
+        try:
+            with self.metrics.time_stage('series_volumes'), ThreadPoolExecutor() as executor:
+                all_series = list(executor.map(
+                    lambda series_id: self.manga_server.get_item('series', series_id), series_ids
+                ))
+                for series_id, series in self.get_series_volumes(series_ids,
+                                                                 all_series).items():
+                    self.manga_server.upsert_item('series', series_id, series,
+                                                  self.series_aggregator.get_isbns(series_id))
+        except MangaServerError:
+            self.forget_series_volumes()
+
+
+    def get_linked_series_ids(self) -> list[str]:
+        '''Gets the ids of the series linked to volumes during the run.'''
+        series_ids = self.series_aggregator.get_series_ids()
+        self.logger.info('Adding volumes to %s series', str(len(series_ids)))
+        return series_ids
+
+
+    def forget_series_volumes(self):
+        '''
+        Reopens every volume linked to a series during the run, when the manga server was
+        unavailable to add them, see `reopen_items`.
+        '''
+        self.logger.error('Manga server unavailable... volumes not added to their series')
+        self.reopen_items(list(self.series_aggregator.links))
+
+
+    def reopen_items(self, isbns: list[str]):
+        '''
+        Reopens items in the run journal and forgets their tile fingerprint, when some of their
+        writes failed, so resuming the run or the next run scrapes them again.
+
+        Parameters:
+        - isbns (list[str]): The ISBNs of the items.
+        '''
+        for isbn in isbns:
+            self.run_journal.reopen_item(isbn)
+            self.fingerprint_store.forget(isbn)
+
+
+    def wait_for_manga_server(self) -> bool:
+        '''
+        Waits while the circuit breaker of the manga server is open.
+
+        Returns:
+        - bool: True once requests may be sent, False if the breaker gave up on the manga
+        server and the run should stop.
+        '''
+        while not self.circuit_breaker.has_given_up():
+            wait_seconds = self.circuit_breaker.get_wait_seconds()
+            if wait_seconds <= 0:
+                return True
+            time.sleep(min(wait_seconds, 1))
+        return False
+
+
     def process_item(self, item, page_num, end_page):
-        self.logger.info('Starting item %s from page %s of %s',
-                         json.loads(item.attrs['data-gtmdata'])['id'],
-                         page_num, end_page)
+        isbn = self.start_item(item, page_num, end_page)
         try:
-            self.scrape_page(item)
+            attempt = 0
+            while True:
+                if not self.wait_for_manga_server():
+                    self.logger.error('Manga server is down... leaving item %s to resume', isbn)
+                    return
+                try:
+                    with self.metrics.time_stage('item'):
+                        self.scrape_page(item)
+                    break
+                except MangaServerError as e:
+                    attempt = self.retry_item(isbn, e, attempt)
         except Exception:
             self.logger.error('Error scraping item... skipping...')
             self.logger.error(traceback.format_exc())
+            return
+        finally:
+            self.page_prefetch.release(isbn)
+        self.finish_item(page_num, isbn)
 
 
-    def run_scraper(self):
+    def finish_item(self, page_num: int, isbn: str):
         '''
-        Run the scraper to scrape the Crunchyroll store website for manga volumes
-        and series information.
+        Records an item as scraped, the run journal completes it once its buffered writes are
+        saved, see `complete_saved_items`.
+
+        Parameters:
+        - page_num (int): The number of the listing page of the item.
+        - isbn (str): The ISBN of the item.
         '''
+        with self.journal_lock:
+            self.scraped_items[isbn] = page_num
+        self.complete_saved_items()
 
-        if not self.enable_scrape:
-            self.logger.info('Scraping is disabled... exiting...')
+
+    def complete_saved_items(self):
+        '''
+        Completes in the run journal the scraped items whose buffered writes are all saved,
+        along with the series their volume was linked to.  An item whose writes failed is left
+        to be scraped again.
+        '''
+        with self.journal_lock:
+            for isbn, page_num in list(self.scraped_items.items()):
+                if self.write_buffer.is_saving(isbn):
+                    continue
+                del self.scraped_items[isbn]
+                if self.write_buffer.has_failed(isbn):
+                    self.logger.warning('Writes of item %s failed... leaving it to resume', isbn)
+                    continue
+                self.run_journal.complete_item(page_num, isbn,
+                                               self.series_aggregator.links.get(isbn))
+
+
+    def start_item(self, item, page_num: int, end_page: int) -> str:
+        '''Logs the start of an item taken from the queue, and gets its ISBN.'''
+        isbn = self.get_item_isbn(item)
+        self.logger.info('Starting item %s from page %s of %s', isbn, page_num, end_page)
+        return isbn
+
+
+    def retry_item(self, isbn: str, error: MangaServerError, attempt: int) -> int:
+        '''
+        Decides if an item the manga server failed is scraped again.  An item is always
+        retried once an unavailable manga server recovers, and up to `manga_server_retries`
+        times if the manga server failed one of its requests.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+        - error (MangaServerError): The error the item was stopped by.
+        - attempt (int): The number of times the manga server failed the item before.
+
+        Returns:
+        - int: The number of times the manga server failed the item.
+
+        Raises:
+        - MangaServerError: The given error, once the item is out of retries.
+        '''
+        if isinstance(error, MangaServerUnavailableError):
+            self.logger.warning('Manga server unavailable... retrying item %s once it '
+                                'recovers', isbn)
+            return attempt
+        if attempt + 1 > self.manga_server_retries:
+            raise error
+        self.logger.warning('Manga server failed... retrying item %s', isbn)
+        return attempt + 1
+
+
+    def get_item_isbn(self, item) -> str:
+        '''Gets the ISBN of an item from its listing tile.'''
+        return json.loads(item.attrs['data-gtmdata'])['id']
+
+
+    def get_record(self, item_type: str, isbn: str, item_id: str | None = None):
+        '''
+        Gets a record of an item from the records prefetched for its listing page, or from the
+        manga server if it was not prefetched.
+
+        Parameters:
+        - item_type (str): The type of the record, ex: 'volume'.
+        - isbn (str): The ISBN of the item.
+        - item_id (str): The id of the record, if it is not the ISBN, ex: a shop id.
+
+        Returns:
+        - dict: The record, or None if it does not exist.
+        '''
+        prefetched, record = self.page_prefetch.get(item_type, isbn, item_id)
+        if prefetched:
+            return record
+        return self.manga_server.get_item(item_type, item_id or isbn)
+
+
+    def get_prefetch_filters(self) -> dict[str, str]:
+        '''
+        Gets the item types to prefetch for a listing page, leaving out the ones held by the
+        server index.
+
+        Returns:
+        - dict[str, str]: The index filter of the manga server per item type to prefetch.
+        '''
+        return {
+            item_type: filter_by for item_type, filter_by in PagePrefetch.ITEM_FILTERS.items()
+            if not self.server_index.is_loaded(item_type)
+        }
+
+
+    def get_prefetch_isbns(self, items) -> list[str]:
+        '''
+        Gets the ISBNs of the items of a listing page whose records should be prefetched,
+        leaving out the items that will skip scraping and the ones prefetched before.
+
+        Parameters:
+        - items (list): The Beautiful soup objects for the items to scrape.
+
+        Returns:
+        - list[str]: The ISBNs to prefetch.
+        '''
+        return self.page_prefetch.claim_isbns([
+            isbn for isbn, item in [
+                (json.loads(item.attrs['data-gtmdata'])['id'], item) for item in items
+            ]
+            if not self.can_skip_item(isbn, self.tile_fingerprint.fingerprint(item))
+        ])
+
+
+    def prefetch_page(self, items):
+        '''
+        Prefetches the volume, bundle and shop records of the items of a listing page, in one
+        request per item type, so the items do not request them one by one.  Item types held
+        by the server index are not prefetched.
+
+        Parameters:
+        - items (list): The Beautiful soup objects for the items to scrape.
+        '''
+        item_filters, isbns = self.get_prefetch_request(items)
+        if len(isbns) == 0:
             return
+        with self.metrics.time_stage('prefetch'), ThreadPoolExecutor() as executor:
+            records = executor.map(lambda x: x.result(), [
+                executor.submit(self.manga_server.get_many, item_type, isbns, filter_by)
+                for item_type, filter_by in item_filters.items()
+            ])
+            self.add_prefetched(item_filters, isbns, records)
 
-        start = 0
-        end = 10000000000
 
-        # volumes_data = self.data.get_volumes_data()
-        # series_data = self.data.get_series_data()
-        # shop_data = self.data.get_shop_data()
+    def get_prefetch_request(self, items) -> tuple[dict[str, str], list[str]]:
+        '''
+        Gets what to prefetch for the items of a listing page.
+
+        Parameters:
+        - items (list): The Beautiful soup objects for the items to scrape.
+
+        Returns:
+        - tuple[dict[str, str], list[str]]: The index filter per item type to prefetch, and the
+        ISBNs to prefetch, none if there is nothing to prefetch.
+        '''
+        item_filters = self.get_prefetch_filters()
+        if len(item_filters) == 0:
+            return item_filters, []
+        return item_filters, self.get_prefetch_isbns(items)
+
+
+    def add_prefetched(self, item_filters: dict[str, str], isbns: list[str], records):
+        '''Adds the records prefetched per item type, in the order of the item filters.'''
+        for item_type, items_found in zip(item_filters, records):
+            self.page_prefetch.add(item_type, isbns, items_found)
 
+
+    def queue_page_items(self, items, page_num: int) -> list:
+        '''
+        Gets the items of a listing page that still need scraping in this run, and records
+        them in the run journal before they are queued.
+
+        Parameters:
+        - items (list): The Beautiful soup objects for the items on the listing page.
+        - page_num (int): The number of the listing page.
+
+        Returns:
+        - list: The items not already completed by a run being resumed.
+        '''
+        pending = [
+            item for item in items
+            if not self.run_journal.is_item_completed(json.loads(item.attrs['data-gtmdata'])['id'])
+        ]
+        self.run_journal.expect_page(page_num, [
+            json.loads(item.attrs['data-gtmdata'])['id'] for item in pending
+        ])
+        if len(pending) < len(items):
+            self.logger.info('Skipping %s items of page %s completed before resuming',
+                             str(len(items) - len(pending)), str(page_num))
+        return pending
+
+
+    def has_reached_known_items(self, items) -> bool:
+        '''
+        Counts the items of a listing page in a row whose tile has not changed since they were
+        last scraped successfully.  The tile fingerprints are only stored once every write of
+        an item is saved, so an item that failed is never counted and is retried.
+
+        Parameters:
+        - items (list): The Beautiful soup objects for the items on the listing page.
+
+        Returns:
+        - bool: True if this is an incremental crawl and it has reached a run of known and
+        unchanged items, so there is no need to keep paging.
+        '''
+        for item in items:
+            isbn = json.loads(item.attrs['data-gtmdata'])['id']
+            fingerprint = self.tile_fingerprint.fingerprint(item)
+            if self.fingerprint_store.is_unchanged(isbn, fingerprint):
+                self.unchanged_run += 1
+            else:
+                self.unchanged_run = 0
+        return self.incremental and self.unchanged_run >= self.incremental_stop_after
+
+
+    def get_page_url(self, start: int):
+        '''
+        Gets the url of the Crunchyroll store listing page starting at the given offset.
+
+        Parameters:
+        - start (int): The offset of the first item on the page.
+
+        Returns:
+        - str: The url of the listing page.
+        '''
         page_base_url = 'https://store.crunchyroll.com/collections/manga-books/' + \
             '?cgid=manga-books&srule=New-to-Old'
         category_query = '&prefn1=subcategory&prefv1=Novels|Manhwa|Manhua|Light%20Novels|Manga|Bundles'
-        page_url = page_base_url + category_query
+        return page_base_url + category_query + f'&start={start}&sz=100'
 
-        self.logger.info('Calling: %s&start=%s&sz=100', page_url, start)
-        first_soup = BeautifulSoup(
-            requests.get(page_url + f'&start={start}&sz=100', timeout=30).text,
-            'html.parser'
-        )
-        cr_total_count = float(first_soup.find('div', {'class': 'pagination-text'})
-                            .attrs['data-totalcount'])
-        total_count = min(cr_total_count, end) - start
-        total_pages = math.ceil(total_count / 100)
+
+    def get_page_soup(self, start: int):
+        '''
+        Gets the Crunchyroll store listing page starting at the given offset.
+
+        Parameters:
+        - start (int): The offset of the first item on the page.
+
+        Returns:
+        - BeautifulSoup: The parsed listing page.
+        '''
+        self.logger.info('Calling: %s', self.get_page_url(start))
+        with self.metrics.time_stage('listing_page'):
+            return self.html_extractor.parse(self.http_client.get(self.get_page_url(start)).text,
+                                             PageTypeEnum.LISTING)
+
+
+    def get_page_range(self, start: int, end: int, cr_total_count: float):
+        '''
+        Gets the listing pages holding the items from the start offset to the end offset.
+
+        Parameters:
+        - start (int): The offset of the first listing item to scrape.
+        - end (int): The offset of the listing item to stop before.
+        - cr_total_count (float): The number of items listed.
+
+        Returns:
+        - tuple[int, int]: The number of the first listing page, and of the page to stop
+        before.
+        '''
+        total_pages = max(math.ceil((min(cr_total_count, end) - start) / 100), 0)
         start_page = math.floor(start / 100)
-        end_page = math.ceil(min(cr_total_count, end) / 100)
-        completed = 0
-        self.logger.info('pages to scrape: %s', str(total_pages))
+        return start_page, start_page + total_pages
 
-        for i in range(start_page, end_page):
 
-            if start > end:
-                self.logger.info('Reached end of pages... %s', str(start - 100))
-                break
+    def get_page_items(self, soup, page_start: int, end: int) -> list:
+        '''
+        Gets the items of a listing page, leaving out the ones at or past the end offset.
+
+        Parameters:
+        - soup (BeautifulSoup): The listing page.
+        - page_start (int): The offset of the first item on the page.
+        - end (int): The offset of the listing item to stop before.
+
+        Returns:
+        - list: The Beautiful soup objects for the items to scrape.
+        '''
+        return soup.find_all('div', {'class': 'product'})[:max(end - page_start, 0)]
+
+
+    def fetch_pages(self, first_soup, start: int, end: int, start_page: int, end_page: int,
+                    item_queue: Queue):
+        '''
+        Fetches the listing pages in order and feeds their items to the workers.  Blocks while
+        the item queue is full, so pages are only prefetched as fast as the workers keep up.
+
+        Parameters:
+        - first_soup (BeautifulSoup): The already fetched first listing page.
+        - start (int): The offset of the first listing page.
+        - end (int): The offset of the listing item to stop before.
+        - start_page (int): The number of the first listing page.
+        - end_page (int): The number of the page to stop before.
+        - item_queue (Queue): The queue of (item, page number) for the workers.
+
+        Returns:
+        - bool: True if every listing page was fetched, or paging stopped at known items.
+        '''
+        try:
+            for i in range(start_page, end_page):
+                if self.circuit_breaker.has_given_up():
+                    self.logger.error('Manga server is down... stopping at page %s', str(i))
+                    return False
+                page_start = start + (i - start_page) * 100
+                next_soup = first_soup if i == start_page else self.get_page_soup(page_start)
+                items, pending, reached_known_items = self.read_page(next_soup, page_start, end, i)
+                self.prefetch_page(pending)
+                for item in pending:
+                    item_queue.put((item, i))
+                if self.is_last_page(items, i, reached_known_items):
+                    break
+            return True
+        except Exception:
+            self.logger.error('Error fetching listing pages... stopping...')
+            self.logger.error(traceback.format_exc())
+            return False
+        finally:
+            for _ in range(self.worker_count):
+                item_queue.put(None)
+
+
+    def read_page(self, soup, page_start: int, end: int, page_num: int):
+        '''
+        Reads the items of a listing page fetched by `fetch_pages`.
+
+        Parameters:
+        - soup (BeautifulSoup): The listing page.
+        - page_start (int): The offset of the first item on the page.
+        - end (int): The offset of the listing item to stop before.
+        - page_num (int): The number of the listing page.
+
+        Returns:
+        - tuple[list, list, bool]: The items of the page, the ones to queue, and whether
+        paging should stop at known items.
+        '''
+        items = self.get_page_items(soup, page_start, end)
+        self.metrics.count_page()
+        reached_known_items = self.has_reached_known_items(items)
+        return items, self.queue_page_items(items, page_num), reached_known_items
 
-            if completed == 0:
-                next_soup = first_soup
-            else:
-                self.logger.info('Calling: %s&start=%s&sz=100', page_url, start)
-                next_soup = BeautifulSoup(
-                    requests.get(page_url + f'&start={start}&sz=100', timeout=30).text,
-                    'html.parser'
-                )
 
-            items = next_soup.find_all('div', {'class': 'product'})
-            thread_count = 3 if i == 0 else 20
-            with ThreadPoolExecutor(thread_count) as executor3:
-                res = executor3.map(lambda x: x.result(), [
-                    executor3.submit(self.process_item, item, i, end_page)
-                    for item in items
-                ])
-            completed += 1
-            print('completed: ' + str(completed) + ' | total: ' + str(end_page), end='\r')
-
-                # update progress bar
-                # progress = round((completed / total_count) * 50)
-                # remaining = 50 - progress
-                # percentage = round((completed / total_count) * 100, ndigits=2)
-                # print('progress: |' + ''
-                #         .join(['=' for _ in range(progress)]) + ''
-                #         .join(['-' for _ in range(remaining)]) +
-                #         '| ' + str(percentage) + '%',
-                #         end='\r')
-
-            start += 100
+    def is_last_page(self, items, page_num: int, reached_known_items: bool) -> bool:
+        '''Logs a listing page queued by `fetch_pages`, and checks if paging should stop.'''
+        self.logger.info('Queued %s items from page %s', str(len(items)), str(page_num))
+        if reached_known_items:
+            self.logger.info('Reached %s known and unchanged items... stopping at page %s',
+                             str(self.unchanged_run), str(page_num))
+        return reached_known_items
+
+
+    def process_items(self, item_queue: Queue, end_page: int):
+        '''
+        Scrapes items from the queue until the page fetcher signals there are no more.
+
+        Parameters:
+        - item_queue (Queue): The queue of (item, page number) from the page fetcher.
+        - end_page (int): The number of the last listing page, for logging.
+        '''
+        while True:
+            queued = item_queue.get()
+            if queued is None:
+                return
+            item, page_num = queued
+            self.process_item(item, page_num, end_page)
+            self.count_completed_item()
+
+
+    def count_completed_item(self):
+        '''Counts an item taken from the queue as completed, and prints the progress.'''
+        self.metrics.count_item()
+        with self.progress_lock:
+            self.items_completed += 1
+            print('completed items: ' + str(self.items_completed), end='\r')
+
+
+    def start_run(self, start: int, end: int, resume: bool):
+        '''
+        Starts the run journal, or resumes the journal of the last run if it did not finish.
+
+        Parameters:
+        - start (int): The offset of the first listing item to scrape.
+        - end (int): The offset of the listing item to stop before.
+        - resume (bool): Whether to resume the last run instead of starting at the given offsets.
+
+        Returns:
+        - tuple[int, int]: The offsets of the first listing item to scrape and the one to
+        stop before.
+        '''
+        if resume:
+            if self.run_journal.load():
+                return self.run_journal.resume_run(), self.run_journal.end
+            self.logger.info('No unfinished run to resume... starting a new run...')
+        self.run_journal.start_run(start, end)
+        return start, end
+
+
+    def start_crawl(self):
+        '''
+        Resets the state of the last run before crawling the listing pages, keeping the series
+        links of the items completed before a resumed run.
+        '''
+        self.fingerprint_store.load()
+        self.page_prefetch.start()
+        self.series_aggregator.start()
+        for isbn, series_link in self.run_journal.series_links.items():
+            self.series_aggregator.link(isbn, *series_link)
+        self.scraped_items = {}
+        self.write_buffer.start()
+        self.circuit_breaker.start()
+        self.start_change_set()
+        self.unchanged_run = 0
+        self.items_completed = 0
+
+
+    def get_listing_range(self, first_soup, start: int, end: int) -> tuple[int, int]:
+        '''
+        Gets the listing pages to crawl, from the item count on the first listing page.
+
+        Parameters:
+        - first_soup (BeautifulSoup): The first listing page.
+        - start (int): The offset of the first listing item to scrape.
+        - end (int): The offset of the listing item to stop before.
+
+        Returns:
+        - tuple[int, int]: The number of the first listing page, and of the page to stop
+        before.
+        '''
+        cr_total_count = float(first_soup.find('div', {'class': 'pagination-text'})
+                               .attrs['data-totalcount'])
+        start_page, end_page = self.get_page_range(start, end, cr_total_count)
+        self.logger.info('pages to scrape: %s', str(end_page - start_page))
+        return start_page, end_page
 
+
+    def finish_crawl(self, listing_complete: bool):
+        '''
+        Finishes the run once every buffered write was sent, see `forget_failed_writes`,
+        `complete_saved_items`, `finish_run` and `save_crawl_state`.
+        '''
+        self.forget_failed_writes()
+        self.complete_saved_items()
+        self.finish_run(listing_complete)
+        self.save_crawl_state()
+
+
+    def start_server_index(self):
+        '''Drops the server index of the last run, and loads it again unless it is disabled.'''
+        self.server_index.start()
+        if self.use_server_index:
+            with self.metrics.time_stage('server_index'):
+                self.manga_server.load_index()
+        self.index_known_series()
+
+
+    def index_known_series(self):
+        '''Adds the series held by the server index to the titles series are matched with.'''
+        series = self.server_index.get_records('series')
+        if series is not None:
+            self.series_search.add_known_series(series)
+
+
+    def start_change_set(self):
+        '''Starts recording writes to the change set if this is a dry run.'''
+        self.manga_server.change_set = self.change_set if self.dry_run else None
+        if self.dry_run:
+            self.change_set.start(self.change_set_path)
+
+
+    def save_crawl_state(self):
+        '''
+        Saves the tile fingerprints, unless this is a dry run, so items are only skipped by
+        later runs once their writes are saved.
+        '''
+        if self.dry_run:
+            self.change_set.close()
+            self.logger.info('Dry run... apply the change set with apply_change_set.py...')
+            return
+        self.fingerprint_store.save()
+
+
+    def start_metrics(self):
+        '''Resets the metrics and has every http client record its requests in them.'''
+        self.metrics.start()
+        HttpClient.metrics = self.metrics
+
+
+    def save_metrics(self):
+        '''
+        Writes the metrics of the run and stops recording http requests in them, and logs the
+        reads of the series caches.
+        '''
+        HttpClient.metrics = None
+        self.metrics.save()
+        self.series_search.series_cache.report()
+        self.series_search.resolution_cache.report()
+
+
+    def forget_failed_writes(self):
+        '''
+        Reports the buffered writes that failed during the run, and reopens the items they
+        were made for, see `reopen_items`.
+        '''
+        for error in self.write_buffer.report():
+            self.reopen_items(error['owners'])
+
+
+    def finish_run(self, listing_complete: bool):
+        '''
+        Finishes the run journal if every listing page was fetched and every queued item was
+        scraped, otherwise keeps it so the run can be resumed.
+
+        Parameters:
+        - listing_complete (bool): Whether every listing page was fetched.
+        '''
+        if listing_complete and self.run_journal.is_complete():
+            self.run_journal.finish_run()
+            return
+        self.run_journal.close()
+        self.logger.warning('Run did not complete... run again with --resume to continue...')
+
+
+    def run_scraper(self, start: int = 0, end: int = 10000000000, resume: bool = False):
+        '''
+        Run the scraper to scrape the Crunchyroll store website for manga volumes
+        and series information.
+
+        A single page fetcher prefetches listing pages into a bounded queue while a fixed pool
+        of workers scrapes items from it, so a slow item never holds up the next page.
+
+        Parameters:
+        - start (int): The offset of the first listing item to scrape.
+        - end (int): The offset of the listing item to stop before.
+        - resume (bool): Whether to resume the last run that did not finish, from its journal.
+        '''
+
+        if not self.enable_scrape:
+            self.logger.info('Scraping is disabled... exiting...')
+            return
+
+        start, end = self.start_run(start, end, resume)
+        self.start_metrics()
+        self.start_crawl()
+        self.start_server_index()
+
+        # volumes_data = self.data.get_volumes_data()
+        # series_data = self.data.get_series_data()
+        # shop_data = self.data.get_shop_data()
+
+        first_soup = self.get_page_soup(start)
+        start_page, end_page = self.get_listing_range(first_soup, start, end)
+
+        item_queue = Queue(maxsize=self.prefetch_pages * 100)
+        self.manga_server.start_flusher()
+        try:
+            with ThreadPoolExecutor(self.worker_count + 1) as executor:
+                workers = [
+                    executor.submit(self.fetch_pages, first_soup, start, end, start_page,
+                                    end_page, item_queue),
+                    *[
+                        executor.submit(self.process_items, item_queue, end_page)
+                        for _ in range(self.worker_count)
+                    ]
+                ]
+                listing_complete = workers[0].result()
+                for worker in workers[1:]:
+                    worker.result()
+            self.write_series_volumes()
+        finally:
+            self.manga_server.stop_flusher()
+        self.manga_server.flush_writes()
+        self.finish_crawl(listing_complete)
+        self.save_metrics()
         self.logger.info('Finished scraping...')
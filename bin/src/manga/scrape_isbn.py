@@ -1,14 +1,17 @@
 '''Module to scrape ISBN data from the CampusBooks website.'''
 
+import asyncio
 from datetime import datetime
 import json
 import re
 import traceback
 from xml.dom import NotFoundErr
-from bs4 import BeautifulSoup
-import requests
 
 from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.util.async_http_client import AsyncHttpClient
+from src.util.html_extractor import HtmlExtractor
+from src.util.http_client import HttpClient
 from src.util.manga_logger import MangaLogger
 
 class ScrapeISBN:
@@ -35,10 +38,14 @@ class ScrapeISBN:
         Gets all the valid shop details from the given isbn soup object.
     isbn_search(isbn=str)
         Searches for the given ISBN on the ISBN search website and returns the results.
+    isbn_search_async(isbn=str, client=AsyncHttpClient)
+        Async version of isbn_search.
     '''
 
     def __init__(self, host: HostEnum):
         self.logger = MangaLogger(host).register_logger(__name__)
+        self.http_client = HttpClient(host)
+        self.html_extractor = HtmlExtractor(host)
 
     def get_isbn_details(self, soup_isbn_data):
         '''
@@ -185,12 +192,42 @@ class ScrapeISBN:
         Returns:
         - dict: The results of the ISBN search.
         '''
-        soup_isbn_data = BeautifulSoup(
-            requests.get('https://www.campusbooks.com/search/' + isbn + '?buysellrent=buy',
-                         timeout=30)
-                .text,
-            'html.parser'
+        return self.parse_isbn_page(
+            self.http_client.get(self.get_isbn_url(isbn)).text,
+            isbn
         )
+
+    async def isbn_search_async(self, isbn: str, client: AsyncHttpClient):
+        '''
+        Searches for the given ISBN on the ISBN search website without blocking the
+        event loop, the page being parsed in the default executor.
+
+        Parameters:
+        - isbn (str): The ISBN to search for.
+        - client (AsyncHttpClient): The async http client to make the request with.
+
+        Returns:
+        - dict: The results of the ISBN search.
+        '''
+        html = await client.get_text(self.get_isbn_url(isbn))
+        return await asyncio.to_thread(self.parse_isbn_page, html, isbn)
+
+    def get_isbn_url(self, isbn: str):
+        '''Gets the ISBN search website url for the given ISBN.'''
+        return 'https://www.campusbooks.com/search/' + isbn + '?buysellrent=buy'
+
+    def parse_isbn_page(self, html: str, isbn: str):
+        '''
+        Parses the ISBN search website page into the ISBN details and shops.
+
+        Parameters:
+        - html (str): The page contents of the ISBN search.
+        - isbn (str): The ISBN that was searched for.
+
+        Returns:
+        - dict: The results of the ISBN search.
+        '''
+        soup_isbn_data = self.html_extractor.parse(html, PageTypeEnum.ISBN)
         isbn_details = self.get_isbn_details(soup_isbn_data)
         return {
             'details': isbn_details,
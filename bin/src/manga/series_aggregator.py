@@ -0,0 +1,119 @@
+'''Module to gather the volumes linked to each series during a scrape run.'''
+
+import math
+from typing import Callable
+
+class SeriesAggregator:
+    '''
+    A class used to gather the volumes linked to each series during a scrape run, so each
+    series is written once at the end of the run with every volume it gained, instead of
+    once per volume by workers overwriting each other's additions.
+
+    Linking a volume is a single dict assignment, which is atomic, so the workers never wait
+    on each other.  A volume linked twice keeps its last series.
+
+    ...
+
+    Attributes
+    ----------
+    links : dict[str, tuple[str, str, str | None]]
+        the (series id, category, volume number) of every volume linked in the run, keyed by
+        its isbn
+
+    Methods
+    -------
+    start()
+        Drops every link.
+    link(isbn=str, series_id=str, category=str, volume=str)
+        Links a volume to its series.
+    get_series_ids()
+        Gets the series linked to at least one volume.
+    get_isbns(series_id=str)
+        Gets the volumes linked to a series.
+    merge_volumes(series_id=str, curr_volumes=list, get_volume=Callable)
+        Merges the volumes linked to a series into its current volumes, sorted.
+    '''
+
+    def __init__(self):
+        self.start()
+
+    def start(self):
+        '''Drops every link.'''
+        self.links: dict[str, tuple[str, str, str | None]] = {}
+
+    def link(self, isbn: str, series_id: str, category: str, volume: str | None):
+        '''
+        Links a volume to its series.
+
+        Parameters:
+        - isbn (str): The isbn of the volume.
+        - series_id (str): The id of the series.
+        - category (str): The category of the volume, ex: 'Manga'.
+        - volume (str): The volume number, ex: '1' or '1-3', or None if it has none.
+        '''
+        self.links[isbn] = (series_id, category, volume)
+
+    def get_series_ids(self) -> list[str]:
+        '''
+        Gets the series linked to at least one volume.
+
+        Returns:
+        - list[str]: The ids of the series, in the order they were first linked.
+        '''
+        return list(dict.fromkeys(series_id for series_id, _, _ in list(self.links.values())))
+
+    def get_isbns(self, series_id: str) -> list[str]:
+        '''
+        Gets the volumes linked to a series.
+
+        Parameters:
+        - series_id (str): The id of the series.
+
+        Returns:
+        - list[str]: The isbns of the volumes, in the order they were linked.
+        '''
+        return [
+            isbn for isbn, (link_series_id, _, _) in list(self.links.items())
+            if link_series_id == series_id
+        ]
+
+    def merge_volumes(self, series_id: str, curr_volumes: list[str] | None,
+                      get_volume: Callable[[str], dict | None]) -> list[str]:
+        '''
+        Merges the volumes linked to a series into its current volumes, sorted by category
+        then volume number.  Volumes whose number is unknown keep their order at the end of
+        their category.
+
+        Parameters:
+        - series_id (str): The id of the series.
+        - curr_volumes (list[str]): The isbns of the volumes the series has, or None.
+        - get_volume (Callable[[str], dict | None]): Gets the volume record of an isbn that was
+        not linked in the run, for its category and volume number.
+
+        Returns:
+        - list[str]: The isbns of the volumes of the series.
+        '''
+        linked = {
+            isbn: (category, volume)
+            for isbn, (link_series_id, category, volume) in list(self.links.items())
+            if link_series_id == series_id
+        }
+        volumes = list(dict.fromkeys([*(curr_volumes or []), *linked]))
+
+        def sort_key(isbn: str):
+            if isbn in linked:
+                category, volume = linked[isbn]
+            else:
+                record = get_volume(isbn) or {}
+                category, volume = record.get('category'), record.get('volume')
+            return (category or '', self.parse_number(volume))
+
+        return sorted(volumes, key=sort_key)
+
+    @classmethod
+    def parse_number(cls, volume: str | None) -> float:
+        '''Parses the first number of a volume number, ex: 1.0 for '1-3', inf if unknown.'''
+        try:
+            return float(str(volume).split('-', maxsplit=1)[0])
+        except ValueError:
+            return math.inf
@@ -0,0 +1,70 @@
+'''Module to cache the MangaUpdates series records between crawls.'''
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.util.sqlite_cache import SqliteCache
+
+class SeriesCache(SqliteCache):
+    '''
+    A class used to cache the series records parsed from the MangaUpdates API, keyed by
+    their series id, so repeated crawls do not download the same series again.
+
+    A record older than `ttl_seconds` is expired, so it is downloaded again and refreshed.
+    See `SqliteCache` for how records are persisted and held in memory.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    max_entries : int
+        The number of records held in memory
+    ttl_seconds : float
+        The number of seconds a record is fresh for
+
+    Methods
+    -------
+    get(series_id=str)
+        Gets a fresh series record.
+    put(series_id=str, series=dict)
+        Caches a series record.
+    get_all()
+        Gets every cached series record.
+    '''
+
+    def __init__(self, host: HostEnum, max_entries: int = 1000,
+                 ttl_seconds: float = 7 * 24 * 60 * 60):
+        super().__init__(host, FilePathEnum.SERIES_CACHE.value[host.value], 'series_records',
+                         'Series cache', max_entries, ttl_seconds)
+
+    def get(self, series_id: str) -> dict | None:
+        '''
+        Gets a fresh series record, from memory or else from the SQLite file.
+
+        Parameters:
+        - series_id (str): The MangaUpdates id of the series.
+
+        Returns:
+        - dict: A copy of the series record, or None if it is not cached or has expired.
+        '''
+        return self.get_entry(series_id)[1]
+
+    def put(self, series_id: str, series: dict):
+        '''
+        Caches a series record, fetched now.
+
+        Parameters:
+        - series_id (str): The MangaUpdates id of the series.
+        - series (dict): The series record.
+        '''
+        self.put_entry(series_id, series)
+
+    def get_all(self) -> list[dict]:
+        '''
+        Gets every cached series record, fresh or expired, without counting the reads.
+
+        Returns:
+        - list[dict]: The series records.
+        '''
+        return self.get_values()
@@ -0,0 +1,150 @@
+'''Module to refresh the series in the manga server from the MangaUpdates API, apart from crawls.'''
+
+from concurrent.futures import ThreadPoolExecutor
+import traceback
+
+from src.database.manga_server import MangaServer, MangaServerError
+from src.database.server_index import ServerIndex
+from src.enums.host_enum import HostEnum
+from src.manga.series_search import SeriesSearch
+from src.util.circuit_breaker import CircuitBreaker
+from src.util.manga_logger import MangaLogger
+from src.util.scrape_metrics import ScrapeMetrics
+
+class SeriesRefresher:
+    '''
+    A class used to refresh every series in the manga server from the MangaUpdates API, so a
+    crawl does not have to refetch a series once per volume, and series can be refreshed on
+    a schedule of their own.
+
+    The series are listed once into a `ServerIndex`, and every unique series id is fetched
+    once by `worker_count` workers, on top of the rate limits `HttpClient` keeps per host.
+    Only the fields MangaUpdates owns are refreshed, see `REFRESHED_FIELDS`, so the title
+    and confidence a series was matched with and the volumes linked to it by crawls are
+    kept.  The refreshed series are compared with the server index, and only the fields that
+    changed are written, in bulk requests of `batch_size` series.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    worker_count : int
+        The number of series fetched at once
+    batch_size : int
+        The number of series per bulk request
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    metrics : ScrapeMetrics
+        counts the series updated, unchanged and failed
+    series_search : SeriesSearch
+        fetches the series from the MangaUpdates API
+    server_index : ServerIndex
+        the series in the manga server, the refreshed series are compared with
+    circuit_breaker : CircuitBreaker
+        stops sending writes while the manga server is unavailable
+    manga_server : MangaServer
+        the manga server the series are read from and written to
+
+    Methods
+    -------
+    refresh(series_ids=list)
+        Refreshes the series in the manga server.
+    '''
+
+    # fields of a series record parsed from the MangaUpdates API that a refresh writes
+    REFRESHED_FIELDS = [
+        'associated_titles', 'url', 'category', 'description', 'cover_image', 'genres',
+        'themes', 'latest_chapter', 'release_status', 'status', 'authors', 'publishers',
+        'bayesian_rating', 'rank', 'recommendations'
+    ]
+
+    def __init__(self, host: HostEnum, worker_count: int = 8, batch_size: int = 100):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.worker_count = worker_count
+        self.batch_size = batch_size
+        self.metrics = ScrapeMetrics(host)
+        self.series_search = SeriesSearch(host)
+        self.server_index = ServerIndex(host)
+        self.circuit_breaker = CircuitBreaker(host, 'Manga server')
+        self.manga_server = MangaServer(host, self.metrics, server_index=self.server_index,
+                                        circuit_breaker=self.circuit_breaker)
+
+    def refresh(self, series_ids: list[str] | None = None) -> bool:
+        '''
+        Refreshes the series in the manga server.
+
+        Parameters:
+        - series_ids (list[str]): The ids of the series to refresh, or None for every series.
+
+        Returns:
+        - bool: True if every series was fetched, and every change written.
+        '''
+        self.metrics.start()
+        self.circuit_breaker.start()
+        self.server_index.start()
+        self.server_index.load('series', self.manga_server.get_all('series'))
+        records = self.server_index.get_records('series')
+        if records is None:
+            self.logger.error('Could not list the series in the manga server... ending process')
+            return False
+
+        known_ids = { record['series_id'] for record in records if record['series_id'] }
+        if series_ids is not None:
+            for series_id in set(series_ids) - known_ids:
+                self.logger.warning('Series %s is not in the manga server... skipping', series_id)
+            known_ids &= set(series_ids)
+        ids = sorted(known_ids)
+        self.logger.info('Refreshing %s series', str(len(ids)))
+
+        with self.metrics.time_stage('series_fetch'), \
+                ThreadPoolExecutor(self.worker_count) as executor:
+            fetched = list(executor.map(self.fetch_series, ids))
+        updates = {
+            series_id: series for series_id, series in zip(ids, fetched) if series is not None
+        }
+
+        written = True
+        with self.metrics.time_stage('series_write'):
+            changes = self.manga_server.get_changes('series', updates)
+            changed_ids = list(changes)
+            for index in range(0, len(changed_ids), self.batch_size):
+                batch = {
+                    series_id: changes[series_id]
+                    for series_id in changed_ids[index:index + self.batch_size]
+                }
+                try:
+                    self.manga_server.upsert_many('series', batch)
+                except (MangaServerError, RuntimeError):
+                    self.logger.error('Could not write %s refreshed series',
+                                      str(len(batch)))
+                    self.logger.error(traceback.format_exc())
+                    written = False
+
+        summary = self.metrics.get_summary()
+        self.logger.info('Series refreshed: %s', summary['records'].get('series', {}))
+        self.series_search.series_cache.report()
+        return written and len(updates) == len(ids)
+
+    def fetch_series(self, series_id: str) -> dict | None:
+        '''
+        Fetches a series from the MangaUpdates API.
+
+        Parameters:
+        - series_id (str): The id of the series.
+
+        Returns:
+        - dict: The refreshed fields of the series, or None if it could not be fetched.
+        '''
+        try:
+            series = self.series_search.download_series_by_id(series_id)
+        except Exception:
+            self.logger.error('Could not refresh series %s... skipping', series_id)
+            self.logger.error(traceback.format_exc())
+            self.metrics.count_record('series', 'failed')
+            return None
+        return { field: series[field] for field in self.REFRESHED_FIELDS }
@@ -0,0 +1,103 @@
+'''Module to cache which MangaUpdates series a series name resolves to between crawls.'''
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.util.sqlite_cache import SqliteCache
+
+class SeriesResolutionCache(SqliteCache):
+    '''
+    A class used to cache which MangaUpdates series a series name and category resolve to,
+    so the volumes of a series search for it once instead of once per volume.
+
+    A resolution is the series id, matched title and match confidence, or None if no series
+    matched, so names that never match are not searched again either.  Names are compared
+    case and whitespace insensitively.  Matches are fresh for `ttl_seconds`, while matches
+    below `min_trusted_confidence`, down to the 0.1 given to the first result of the right
+    category, are fresh for `low_confidence_ttl_seconds`, and misses for
+    `negative_ttl_seconds`, so a better match, or a series added to MangaUpdates later, is
+    found without waiting for the full ttl.  See `SqliteCache` for how resolutions are
+    persisted and held in memory.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    max_entries : int
+        The number of resolutions held in memory
+    ttl_seconds : float
+        The number of seconds a match is fresh for
+    low_confidence_ttl_seconds : float
+        The number of seconds a match below `min_trusted_confidence` is fresh for
+    negative_ttl_seconds : float
+        The number of seconds a miss is fresh for
+    min_trusted_confidence : float
+        The confidence a match must reach to be fresh for `ttl_seconds`
+
+    Methods
+    -------
+    get(series_name=str, category=str)
+        Gets a fresh resolution.
+    put(series_name=str, category=str, resolution=dict)
+        Caches a resolution.
+    '''
+
+    def __init__(self, host: HostEnum, max_entries: int = 5000,
+                 ttl_seconds: float = 30 * 24 * 60 * 60,
+                 low_confidence_ttl_seconds: float = 3 * 24 * 60 * 60,
+                 negative_ttl_seconds: float = 24 * 60 * 60,
+                 min_trusted_confidence: float = 0.85):
+        super().__init__(host, FilePathEnum.SERIES_RESOLUTIONS.value[host.value],
+                         'series_resolutions', 'Series resolutions', max_entries, ttl_seconds)
+        self.low_confidence_ttl_seconds = low_confidence_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.min_trusted_confidence = min_trusted_confidence
+
+    @classmethod
+    def get_key(cls, series_name: str, category: str | None) -> str:
+        '''Gets the key of a series name and category, ignoring case and extra whitespace.'''
+        return ' '.join(series_name.lower().split()) + '|' + (category or '').lower()
+
+    def get(self, series_name: str, category: str | None):
+        '''
+        Gets a fresh resolution, from memory or else from the SQLite file.
+
+        Parameters:
+        - series_name (str): The series name searched for.
+        - category (str): The MangaUpdates category searched in, or None.
+
+        Returns:
+        - tuple[bool, dict | None]: Whether a fresh resolution is cached, and the series id,
+        title and series_match_confidence it resolved to, or None if no series matched.
+        '''
+        return self.get_entry(self.get_key(series_name, category))
+
+    def put(self, series_name: str, category: str | None, resolution: dict | None):
+        '''
+        Caches a resolution, made now.
+
+        Parameters:
+        - series_name (str): The series name searched for.
+        - category (str): The MangaUpdates category searched in, or None.
+        - resolution (dict): The series id, title and series_match_confidence it resolved
+        to, or None if no series matched.
+        '''
+        self.put_entry(self.get_key(series_name, category), resolution)
+
+    def get_ttl_seconds(self, value: dict | None) -> float:
+        '''
+        Gets the number of seconds a resolution is fresh for.
+
+        Parameters:
+        - value (dict): The resolution, or None if no series matched.
+
+        Returns:
+        - float: `negative_ttl_seconds` for a miss, `low_confidence_ttl_seconds` for a match
+        below `min_trusted_confidence`, else `ttl_seconds`.
+        '''
+        if value is None:
+            return self.negative_ttl_seconds
+        if (value.get('series_match_confidence') or 0) < self.min_trusted_confidence:
+            return self.low_confidence_ttl_seconds
+        return self.ttl_seconds
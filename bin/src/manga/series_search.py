@@ -1,16 +1,29 @@
 '''Module to search for series information from the MangaUpdates API.'''
 
+import asyncio
 import difflib
 import json
+import threading
 import traceback
+import aiohttp
 import requests
 from src.enums.host_enum import HostEnum
+from src.manga.series_cache import SeriesCache
+from src.manga.series_resolution_cache import SeriesResolutionCache
+from src.manga.title_index import TitleIndex
+from src.util.async_http_client import AsyncHttpClient
+from src.util.http_client import HttpClient
 from src.util.manga_logger import MangaLogger
+from src.util.single_flight import AsyncSingleFlight, SingleFlight
 
 class SeriesSearch:
     '''
     Class to search for series information from the MangaUpdates API.
 
+    Series names are first matched against the titles of the known series, the ones in the
+    series cache and the ones added with `add_known_series`, and MangaUpdates is only searched
+    when none of them match.
+
     ...
 
     Parameters
@@ -22,6 +35,17 @@ class SeriesSearch:
     ----------
     logger : MangaLogger
         a logging utility for info, warning, and error logs
+    series_cache : SeriesCache
+        the series records downloaded by this and earlier crawls, keyed by their series ID
+    resolution_cache : SeriesResolutionCache
+        the series each series name and category resolved to, or did not, in this and
+        earlier crawls
+    title_index : TitleIndex
+        the titles of the known series, loaded from the series cache on first use
+    single_flight : SingleFlight
+        shares the series lookups and searches made by workers at the same time
+    async_single_flight : AsyncSingleFlight
+        shares the series lookups and searches made by coroutines at the same time
 
     Methods
     -------
@@ -30,16 +54,35 @@ class SeriesSearch:
     get_status(series_resp=dict)
         Parsing the status from the MangaUpdates API response.
     get_series_by_id(series_id=str)
-        Gets the series information from the given series ID.
+        Gets the series information from the given series ID, sharing concurrent lookups.
+    download_series_by_id(series_id=str)
+        Gets the series information from the given series ID from the API, even if cached.
+    add_known_series(series=list)
+        Adds series to the titles series names are matched with.
     calculate_confidence(series_name=str, title=str)
         Calculates the confidence level for the given series name and title.
     search_series(series_name=str, category=str, volume_name=str)
-        Gets the series ID from the given series name and format.
+        Gets the series ID from the given series name and format, sharing concurrent
+        searches.
+    get_series_by_id_async(series_id=str, client=AsyncHttpClient)
+        Async version of get_series_by_id.
+    search_series_async(series_name=str, category=str, volume_name=str, client=AsyncHttpClient)
+        Async version of search_series.
     '''
 
+    SERIES_URL = 'https://api.mangaupdates.com/v1/series/'
+    SEARCH_URL = 'https://api.mangaupdates.com/v1/series/search'
+
     def __init__(self, host: HostEnum):
         self.logger = MangaLogger(host).register_logger(__name__)
-        self.series_cache = {}
+        self.http_client = HttpClient(host)
+        self.series_cache = SeriesCache(host)
+        self.resolution_cache = SeriesResolutionCache(host)
+        self.title_index = TitleIndex()
+        self.title_index_loaded = False
+        self.title_index_lock = threading.Lock()
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
 
     def get_top_themes(self, series_resp):
         '''
@@ -90,7 +133,16 @@ class SeriesSearch:
 
     def get_series_by_id(self, series_id: str):
         '''
-        Gets the series information from the given series ID.
+        Gets the series information from the given series ID, sharing the lookup already in
+        flight for it if any, see `fetch_series_by_id`.
+        '''
+        return self.single_flight.do(('series', series_id),
+                                     lambda: self.fetch_series_by_id(series_id))
+
+    def fetch_series_by_id(self, series_id: str):
+        '''
+        Gets the series information from the given series ID, from the series cache unless
+        it is not cached or has expired.
 
         Parameters:
         - series_id (str): The ID of the series to search for.
@@ -101,83 +153,159 @@ class SeriesSearch:
         Raises:
         - requests.exceptions.RequestException: An error occurred while getting the series details.
         '''
-        self.logger.info('Getting series details for %s...', series_id)
-        try:
-            if series_id in self.series_cache:
-                parsed_series_data = self.series_cache[series_id]
-                self.logger.info('Pulled series from local cache: %s',
-                                 json.dumps(parsed_series_data))
-            else:
-                series_resp = requests.get('https://api.mangaupdates.com/v1/series/' + series_id,
-                                        timeout=30).json()
-                self.logger.info('Series recieved from api: %s', json.dumps(series_resp))
-                parsed_series_data = {
-                    'series_id': str(series_resp['series_id']),
-                    'title': series_resp['title'],
-                    'associated_titles': [title['title'] for title in series_resp['associated']],
-                    'editions': [],
-                    'url': series_resp['url'],
-                    'category': series_resp['type'],
-                    'description': series_resp['description'],
-                    'cover_image': series_resp['image']['url']['original'],
-                    'genres': [genre['genre'] for genre in series_resp['genres']],
-                    'themes': self.get_top_themes(series_resp),
-                    'latest_chapter': series_resp['latest_chapter'],
-                    'release_status': series_resp['status'],
-                    'status': self.get_status(series_resp),
-                    'authors': [
-                        { 'name': author['name'], 'type': author['type'] }
-                        for author in series_resp['authors']
-                    ],
-                    'publishers': [
-                        { 'name': publisher['publisher_name'], 'type': publisher['type'] }
-                        for publisher in series_resp['publishers']
-                    ],
-                    'bayesian_rating': series_resp['bayesian_rating'],
-                    'rank': series_resp['rank']['position']['year'],
-                    'recommendations': [str(rec['series_id']) for rec in series_resp['recommendations']]
-                }
+        parsed_series_data = self.get_cached_series(series_id)
+        if parsed_series_data is not None:
             return parsed_series_data
+        return self.download_series_by_id(series_id)
+
+    def download_series_by_id(self, series_id: str):
+        '''
+        Gets the series information from the given series ID from the MangaUpdates API, even
+        if it is cached, and caches it.
+
+        Parameters:
+        - series_id (str): The ID of the series to search for.
+
+        Returns:
+        - dict: The series information from the given series ID.
+
+        Raises:
+        - requests.exceptions.RequestException: An error occurred while getting the series details.
+        '''
+        try:
+            return self.cache_series(series_id,
+                                     self.http_client.get(self.SERIES_URL + series_id).json())
         except requests.exceptions.RequestException:
             self.logger.error('Could not get series details for %s... ending process', series_id)
             self.logger.error(traceback.format_exc())
             raise
 
-    def calculate_confidence(self, series_name: str, title: str):
+    async def get_series_by_id_async(self, series_id: str, client: AsyncHttpClient):
         '''
-        Calculates the confidence level for the given series name and title.
+        Gets the series information from the given series ID without blocking the event
+        loop, sharing the lookup already in flight for it if any.
+        '''
+        return await self.async_single_flight.do(
+            ('series', series_id), lambda: self.fetch_series_by_id_async(series_id, client))
+
+    async def fetch_series_by_id_async(self, series_id: str, client: AsyncHttpClient):
+        '''
+        Gets the series information from the given series ID without blocking the event loop.
 
         Parameters:
-        - series_name (str): The name of the series to search for.
-        - title (str): The title to search for.
+        - series_id (str): The ID of the series to search for.
+        - client (AsyncHttpClient): The async http client to make the request with.
 
         Returns:
-        - float: The confidence level for the given series name and title.
+        - dict: The series information from the given series ID.
+
+        Raises:
+        - aiohttp.ClientError: An error occurred while getting the series details.
         '''
-        return difflib.SequenceMatcher(None, series_name.lower(), title.lower()).ratio()
+        parsed_series_data = self.get_cached_series(series_id)
+        if parsed_series_data is not None:
+            return parsed_series_data
+        try:
+            return self.cache_series(series_id,
+                                     await client.get_json(self.SERIES_URL + series_id))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.logger.error('Could not get series details for %s... ending process', series_id)
+            self.logger.error(traceback.format_exc())
+            raise
 
-    def save_series_cache(self, series_id: str, series_data: dict):
+    def get_cached_series(self, series_id: str) -> dict | None:
         '''
-        Saves the series data to the cache.
+        Gets the series information from the given series ID from the series cache.
 
         Parameters:
-        - series_id (str): The ID of the series to save.
-        - series_data (dict): The data of the series to save.
+        - series_id (str): The ID of the series to search for.
+
+        Returns:
+        - dict: The cached series information, or None if it is not cached or has expired.
         '''
-        self.series_cache[series_id] = series_data
-        self.logger.info('Added series to local cache: %s', json.dumps(series_data))
+        self.logger.info('Getting series details for %s...', series_id)
+        parsed_series_data = self.series_cache.get(series_id)
+        if parsed_series_data is not None:
+            self.logger.info('Pulled series from local cache: %s', json.dumps(parsed_series_data))
+        return parsed_series_data
 
-    def search_series(self, series_name: str, category: str, volume_name: str):
+    def cache_series(self, series_id: str, series_resp: dict) -> dict:
         '''
-        Gets the series ID from the given series name and format.
+        Parses a MangaUpdates series response, and adds it to the series cache and the titles
+        of the known series.
+
+        Parameters:
+        - series_id (str): The ID of the series.
+        - series_resp (dict): The response from the MangaUpdates API.
+
+        Returns:
+        - dict: The parsed series record.
+        '''
+        self.logger.info('Series recieved from api: %s', json.dumps(series_resp))
+        parsed_series_data = self.parse_series_data(series_resp)
+        self.series_cache.put(series_id, parsed_series_data)
+        self.get_title_index().add(parsed_series_data)
+        return parsed_series_data
+
+    def parse_series_data(self, series_resp: dict):
+        '''
+        Parses the MangaUpdates series response into the series record.
+
+        Parameters:
+        - series_resp (dict): The response from the MangaUpdates API.
+
+        Returns:
+        - dict: The parsed series record.
+        '''
+        return {
+            'series_id': str(series_resp['series_id']),
+            'title': series_resp['title'],
+            'associated_titles': [title['title'] for title in series_resp['associated']],
+            'editions': [],
+            'url': series_resp['url'],
+            'category': series_resp['type'],
+            'description': series_resp['description'],
+            'cover_image': series_resp['image']['url']['original'],
+            'genres': [genre['genre'] for genre in series_resp['genres']],
+            'themes': self.get_top_themes(series_resp),
+            'latest_chapter': series_resp['latest_chapter'],
+            'release_status': series_resp['status'],
+            'status': self.get_status(series_resp),
+            'authors': [
+                { 'name': author['name'], 'type': author['type'] }
+                for author in series_resp['authors']
+            ],
+            'publishers': [
+                { 'name': publisher['publisher_name'], 'type': publisher['type'] }
+                for publisher in series_resp['publishers']
+            ],
+            'bayesian_rating': series_resp['bayesian_rating'],
+            'rank': series_resp['rank']['position']['year'],
+            'recommendations': [str(rec['series_id']) for rec in series_resp['recommendations']]
+        }
+
+    def calculate_confidence(self, series_name: str, title: str):
+        '''
+        Calculates the confidence level for the given series name and title.
 
         Parameters:
         - series_name (str): The name of the series to search for.
+        - title (str): The title to search for.
+
+        Returns:
+        - float: The confidence level for the given series name and title.
+        '''
+        return difflib.SequenceMatcher(None, series_name.lower(), title.lower()).ratio()
+
+    def get_series_category(self, category: str):
+        '''
+        Converts the Crunchyroll category into the MangaUpdates series category.
+
+        Parameters:
         - category (str): The category of the series to search for.
-        - volume_name (str): The name of the volume to search for.
 
         Returns:
-        - dict: The series information from the given series name and format.
+        - str: The MangaUpdates category, or None if there is no category.
         '''
         category_conversion = {
             '': None,
@@ -188,80 +316,364 @@ class SeriesSearch:
             'manga': 'manga',
             'manga-bundles': 'manga'
         }
-        series_category = category_conversion[category]
+        return category_conversion[category]
+
+    def match_series(self, series_details: dict, series_name: str, series_category: str,
+                     volume_name: str):
+        '''
+        Matches the series details against the given series name and category.
+
+        Parameters:
+        - series_details (dict): The series details to check.
+        - series_name (str): The name of the series to search for.
+        - series_category (str): The MangaUpdates category of the series.
+        - volume_name (str): The name of the volume to search for.
+
+        Returns:
+        - dict: The series details with the match confidence, or None if the category
+        does not match.
+        '''
+        self.logger.info('Checking series: %s', json.dumps(series_details))
+
+        # series category must match
+        if series_details['category'].lower() != series_category.lower():
+            return None
+
+        all_titles = [
+            title for title
+            in [ series_details['title'], *series_details['associated_titles'] ]
+        ]
+
+        # check for exact equality in title or associated titles
+        for title in all_titles:
+            if title.lower() == series_name.lower():
+                series_details['series_match_confidence'] = 1
+                series_details['title'] = title # update title to closest match
+                self.logger.info('Exact series match found: %s', series_details['title'])
+                return series_details
+
+        # set first found to match category to a low confidence match
+        series_details['series_match_confidence'] = 0.1
+
+        # check for partial equality in title or associated titles
+        for title in all_titles:
+            confidence = max(
+                # if series title or associated title is in volume name
+                # case: 'Re:ZERO Ex' in 'Re:Zero Ex Novel Volume 1' = True
+                self.calculate_confidence(series_name, title),
+                # if series name is in title or associated title, or vice versa
+                # case: 'Re:Zero' in 'Re:ZERO Ex (Novel)' = True
+                self.calculate_confidence(volume_name, title)
+            )
+            if series_details['series_match_confidence'] < confidence:
+                series_details['series_match_confidence'] = confidence
+                self.logger.info(
+                    'Partial series match for [%s, %s] found with confidence %s: %s',
+                    series_name,
+                    volume_name,
+                    str(series_details['series_match_confidence']),
+                    title
+                )
+                series_details['title'] = title # update title to closest match
+
+        self.logger.info('Closest series match with confidence %s: %s',
+                         series_details['series_match_confidence'],
+                         json.dumps(series_details))
+        return series_details
+
+    def search_series(self, series_name: str, category: str, volume_name: str):
+        '''
+        Gets the series ID from the given series name and format, sharing the search already
+        in flight for the same name and category if any, see `find_series`.
+        '''
+        if series_name is None:
+            return self.find_series(series_name, category, volume_name)
+        return self.single_flight.do(
+            ('search', SeriesResolutionCache.get_key(series_name, category)),
+            lambda: self.find_series(series_name, category, volume_name)
+        )
+
+    def find_series(self, series_name: str, category: str, volume_name: str):
+        '''
+        Gets the series ID from the given series name and format, from the resolution cache
+        unless the name and category were not resolved recently, else from the titles of the
+        known series, else from a MangaUpdates search.
+
+        Parameters:
+        - series_name (str): The name of the series to search for.
+        - category (str): The category of the series to search for.
+        - volume_name (str): The name of the volume to search for.
+
+        Returns:
+        - dict: The series information from the given series name and format.
+        '''
+        series_category = self.get_series_category(category)
+        try:
+            resolved, resolution = self.resolve_series(series_name, series_category)
+            if resolved and resolution is not None:
+                return self.apply_resolution(
+                    self.get_series_by_id(resolution['series_id']), resolution)
+            if not resolved:
+                series_resp = self.http_client.post(
+                    self.SEARCH_URL, data=self.get_search_data(series_name)).json()
+                series_id = self.pick_search_response(series_resp, series_name, series_category)
+                series_details = self.resolve_search(
+                    self.get_series_by_id(series_id) if series_id is not None else None,
+                    series_name, series_category, volume_name)
+                if series_details is not None:
+                    return series_details
+        except (requests.exceptions.RequestException, IndexError, AttributeError):
+            self.log_search_error(series_name)
+        return self.get_not_found(series_name)
+
+    async def search_series_async(self, series_name: str, category: str, volume_name: str,
+                                  client: AsyncHttpClient):
+        '''
+        Gets the series ID from the given series name and format without blocking the event
+        loop, sharing the search already in flight for the same name and category if any.
+        '''
+        if series_name is None:
+            return await self.find_series_async(series_name, category, volume_name, client)
+        return await self.async_single_flight.do(
+            ('search', SeriesResolutionCache.get_key(series_name, category)),
+            lambda: self.find_series_async(series_name, category, volume_name, client)
+        )
+
+    async def find_series_async(self, series_name: str, category: str, volume_name: str,
+                                client: AsyncHttpClient):
+        '''
+        Gets the series ID from the given series name and format without blocking the
+        event loop, from the resolution cache unless the name and category were not resolved
+        recently, else from the titles of the known series, else from a MangaUpdates search.
+
+        Parameters:
+        - series_name (str): The name of the series to search for.
+        - category (str): The category of the series to search for.
+        - volume_name (str): The name of the volume to search for.
+        - client (AsyncHttpClient): The async http client to make the requests with.
+
+        Returns:
+        - dict: The series information from the given series name and format.
+        '''
+        series_category = self.get_series_category(category)
+        try:
+            resolved, resolution = self.resolve_series(series_name, series_category)
+            if resolved and resolution is not None:
+                return self.apply_resolution(
+                    await self.get_series_by_id_async(resolution['series_id'], client),
+                    resolution)
+            if not resolved:
+                series_resp = await client.post_json(
+                    self.SEARCH_URL, data=self.get_search_data(series_name))
+                series_id = self.pick_search_response(series_resp, series_name, series_category)
+                series_details = self.resolve_search(
+                    await self.get_series_by_id_async(series_id, client)
+                    if series_id is not None else None,
+                    series_name, series_category, volume_name)
+                if series_details is not None:
+                    return series_details
+        except (aiohttp.ClientError, asyncio.TimeoutError, IndexError, AttributeError):
+            self.log_search_error(series_name)
+        return self.get_not_found(series_name)
+
+    def resolve_series(self, series_name: str,
+                       series_category: str | None) -> tuple[bool, dict | None]:
+        '''
+        Resolves a series name from the resolution cache, else from the titles of the known
+        series, before searching MangaUpdates for it.
+
+        Parameters:
+        - series_name (str): The name of the series to search for.
+        - series_category (str): The MangaUpdates category of the series.
+
+        Returns:
+        - tuple[bool, dict]: Whether the name is resolved, and the series id, matched title
+        and match confidence it resolved to, None if it resolved to no series.
+
+        Raises:
+        - AttributeError: The series name is None.
+        '''
         self.logger.info('Searching for series ID for ["%s", "%s" ]...',
                          series_name, series_category)
-        search_data = {
+        if series_name is None:
+            raise AttributeError('series name is None')
+        resolved, resolution = self.resolution_cache.get(series_name, series_category)
+        if not resolved:
+            resolution = self.match_known_series(series_name, series_category)
+            resolved = resolution is not None
+        return resolved, resolution
+
+    def get_search_data(self, series_name: str) -> dict:
+        '''Gets the form data of the MangaUpdates search for a series name.'''
+        return {
             'search': series_name,
             'stype': 'title'
         }
-        try:
-            if series_name is None:
-                raise AttributeError('series name is None')
-
-            series_resp = requests.post('https://api.mangaupdates.com/v1/series/search',
-                                        search_data, timeout=30).json()
-            # only used if no exact match is found
-            closest_series_match = None
-            for series in [series_resp['results'][0]]:
-                series_details = self.get_series_by_id(str(series['record']['series_id']))
-                self.logger.info('Checking series: %s', json.dumps(series_details))
-
-                # series category must match
-                if series_details['category'].lower() == series_category.lower():
-                    all_titles = [
-                        title for title
-                        in [ series_details['title'], *series_details['associated_titles'] ]
-                    ]
-
-                    # check for exact equality in title or associated titles
-                    for title in all_titles:
-                        if title.lower() == series_name.lower():
-                            series_details['series_match_confidence'] = 1
-                            series_details['title'] = title # update title to closest match
-                            self.logger.info('Exact series match found: %s',
-                                             series_details['title'])
-                            self.save_series_cache(series['record']['series_id'], series_details)
-                            return series_details
-
-                    # set first found to match category to a low confidence match
-                    series_details['series_match_confidence'] = 0.1
-                    closest_series_match = series_details
-
-                    # check for partial equality in title or associated titles
-                    for title in all_titles:
-                        confidence = max(
-                            # if series title or associated title is in volume name
-                            # case: 'Re:ZERO Ex' in 'Re:Zero Ex Novel Volume 1' = True
-                            self.calculate_confidence(series_name, title),
-                            # if series name is in title or associated title, or vice versa
-                            # case: 'Re:Zero' in 'Re:ZERO Ex (Novel)' = True
-                            self.calculate_confidence(volume_name, title)
-                        )
-                        if series_details['series_match_confidence'] < confidence:
-                            series_details['series_match_confidence'] = confidence
-                            closest_series_match = series_details
-                            self.logger.info(
-                                'Partial series match for [%s, %s] found with confidence %s: %s',
-                                series_name,
-                                volume_name,
-                                str(series_details['series_match_confidence']),
-                                title
-                            )
-                            series_details['title'] = title # update title to closest match
-
-            if closest_series_match is not None:
-                self.logger.info('Closest series match with confidence %s: %s',
-                            closest_series_match['series_match_confidence'],
-                            json.dumps(closest_series_match))
-                self.save_series_cache(series['record']['series_id'], series_details)
-                return closest_series_match
-        except (requests.exceptions.RequestException, IndexError, AttributeError):
-            self.logger.error('Could not get series ID for "%s"... ending process', series_name)
-            self.logger.error(traceback.format_exc())
 
+    def pick_search_response(self, series_resp: dict, series_name: str,
+                             series_category: str) -> str | None:
+        '''
+        Picks the series ID of a MangaUpdates search response, see `pick_search_result`.
+
+        Returns:
+        - str: The series ID picked, or None if the search found nothing.
+        '''
+        if len(series_resp['results']) == 0:
+            return None
+        return self.pick_search_result(series_resp['results'], series_name, series_category)
+
+    def resolve_search(self, series_details: dict | None, series_name: str,
+                       series_category: str, volume_name: str) -> dict | None:
+        '''
+        Matches the series a MangaUpdates search picked, and caches what the search resolved
+        to.
+
+        Parameters:
+        - series_details (dict): The series details of the search result picked, or None if
+        the search found nothing.
+        - series_name (str): The name of the series searched for.
+        - series_category (str): The MangaUpdates category of the series.
+        - volume_name (str): The name of the volume searched for.
+
+        Returns:
+        - dict: The matched series details, or None if no series matched.
+        '''
+        if series_details is not None:
+            series_details = self.match_series(series_details, series_name, series_category,
+                                               volume_name)
+        self.resolution_cache.put(series_name, series_category,
+                                  self.get_resolution(series_details))
+        return series_details
+
+    def log_search_error(self, series_name: str):
+        '''Logs the error a series search failed with.'''
+        self.logger.error('Could not get series ID for "%s"... ending process', series_name)
+        self.logger.error(traceback.format_exc())
+
+    def get_not_found(self, series_name: str) -> dict:
+        '''
+        Gets the series record of a series name no series could be matched with.
+
+        Returns:
+        - dict: The empty series record.
+        '''
         self.logger.warning('Could not find any matching series ID for "%s"... ending process',
                             series_name)
+        return self.empty_series()
+
+    def get_title_index(self) -> TitleIndex:
+        '''
+        Gets the titles of the known series, loading the series cache into them on first use.
+
+        Returns:
+        - TitleIndex: The titles of the known series.
+        '''
+        with self.title_index_lock:
+            if not self.title_index_loaded:
+                for series in self.series_cache.get_all():
+                    self.title_index.add(series)
+                self.title_index_loaded = True
+                self.logger.info('Indexed the titles of %s known series',
+                                 str(len(self.title_index)))
+        return self.title_index
+
+    def add_known_series(self, series: list[dict]):
+        '''
+        Adds series to the titles series names are matched with, ex: the ones already in the
+        manga server.
+
+        Parameters:
+        - series (list[dict]): The series records, with their series_id, title,
+        associated_titles and category.
+        '''
+        title_index = self.get_title_index()
+        for record in series:
+            title_index.add(record)
+
+    def match_known_series(self, series_name: str, series_category: str) -> dict | None:
+        '''
+        Matches a series name against the titles of the known series, and caches the
+        resolution it matches.
+
+        Parameters:
+        - series_name (str): The name of the series to search for.
+        - series_category (str): The MangaUpdates category of the series.
+
+        Returns:
+        - dict: The series id, matched title and match confidence, or None if no known
+        series matches.
+        '''
+        if series_category is None:
+            return None
+        resolution = self.get_title_index().match(series_name, series_category)
+        if resolution is not None:
+            self.logger.info('Series matched with a known series: %s', json.dumps(resolution))
+            self.resolution_cache.put(series_name, series_category, resolution)
+        return resolution
+
+    def pick_search_result(self, results: list[dict], series_name: str,
+                           series_category: str) -> str:
+        '''
+        Picks the MangaUpdates search result of the series category whose title is closest to
+        the series name, the first result winning ties.
+
+        Parameters:
+        - results (list[dict]): The search results, at least one.
+        - series_name (str): The name of the series to search for.
+        - series_category (str): The MangaUpdates category of the series.
+
+        Returns:
+        - str: The series ID of the result picked.
+        '''
+        def rank(result: dict):
+            record = result['record']
+            return (
+                (record.get('type') or '').lower() == (series_category or '').lower(),
+                TitleIndex.score(series_name, result.get('hit_title') or record['title'])
+            )
+        return str(max(results, key=rank)['record']['series_id'])
+
+    def get_resolution(self, series_details: dict | None) -> dict | None:
+        '''
+        Gets what a series search resolved to, for the resolution cache.
+
+        Parameters:
+        - series_details (dict): The matched series details, or None if no series matched.
+
+        Returns:
+        - dict: The series id, matched title and match confidence, or None.
+        '''
+        if series_details is None:
+            return None
+        return {
+            'series_id': series_details['series_id'],
+            'title': series_details['title'],
+            'series_match_confidence': series_details['series_match_confidence']
+        }
+
+    def apply_resolution(self, series_details: dict, resolution: dict) -> dict:
+        '''
+        Applies a cached resolution to the series details it resolved to.
+
+        Parameters:
+        - series_details (dict): The series details of the resolved series ID.
+        - resolution (dict): The cached resolution.
+
+        Returns:
+        - dict: The series details with the matched title and match confidence.
+        '''
+        self.logger.info('Series resolved from local cache: %s', json.dumps(resolution))
+        series_details['title'] = resolution['title']
+        series_details['series_match_confidence'] = resolution['series_match_confidence']
+        return series_details
+
+    def empty_series(self):
+        '''
+        Gets the series record used when no series could be matched.
+
+        Returns:
+        - dict: The empty series record.
+        '''
         return {
             'series_id': None,
             'title': None,
@@ -0,0 +1,156 @@
+'''Module to fingerprint the Crunchyroll store listing tiles.'''
+
+from datetime import datetime, timedelta
+import hashlib
+import os
+import threading
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.util.local_dao import LocalDAO
+from src.util.manga_logger import MangaLogger
+
+class TileFingerprint:
+    '''
+    A class used to hash the parts of a Crunchyroll store listing tile that feed the scraped
+    records, so an unchanged tile can be recognized between runs.
+
+    ...
+
+    Methods
+    -------
+    fingerprint(item=BeautifulSoup)
+        Gets the fingerprint of the given listing tile.
+    '''
+
+    def fingerprint(self, item) -> str:
+        '''
+        Gets the fingerprint of the given listing tile from its product data, prices,
+        promotion, back-order text, and sale / exclusive tags.
+
+        Parameters:
+        - item (dict): The Beautiful soup object for an item in the Crunchyroll store website.
+
+        Returns:
+        - str: The hex digest of the tile's relevant attributes.
+        '''
+        product_tile = item.find('div', {'class': 'product-tile'})
+        price = item.find('div', {'class': 'price'})
+        promotion = item.find('div', {'class': 'plp-promotion'})
+        backorder = item.find('div', {'class': 'back-order'})
+        parts = [
+            item.attrs.get('data-gtmdata', ''),
+            product_tile.attrs.get('data-segmentdata', '') if product_tile is not None else '',
+            ','.join([
+                value.attrs.get('content', '')
+                for value in price.find_all('span', {'class': 'value'})
+            ]) if price is not None else '',
+            promotion.text.strip() if promotion is not None else '',
+            backorder.text.strip() if backorder is not None else '',
+            str(item.find('div', {'class': 'sale'}) is not None),
+            str(item.find('div', {'class': 'exclusive'}) is not None)
+        ]
+        return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class TileFingerprintStore:
+    '''
+    A class used to persist the last scraped tile fingerprint of every ISBN, so items whose
+    listing tile has not changed since their last successful scrape can skip every server
+    round trip.  Fingerprints older than `max_age_days` are treated as changed, so data that
+    does not come from the tile (ISBN shops, series details) still gets refreshed.
+    Incremental crawls stop paging once they walk into a run of such items, see
+    `ScrapeCrunchyroll.has_reached_known_items`.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    max_age_days : int
+        The number of days a fingerprint can be trusted before the item is scraped again
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    fingerprints : dict[str, dict]
+        the fingerprint and the time it was scraped per ISBN
+
+    Methods
+    -------
+    load()
+        Loads the fingerprints saved by the last run, if there are any.
+    is_unchanged(isbn=str, fingerprint=str)
+        Checks if the item was scraped recently with the same fingerprint.
+    update(isbn=str, fingerprint=str)
+        Records the fingerprint of a successfully scraped item.
+    forget(isbn=str)
+        Drops the fingerprint of an item, so it is scraped again next run.
+    save()
+        Saves the fingerprints for the next run.
+    '''
+
+    def __init__(self, host: HostEnum, max_age_days: int = 7):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.local_dao = LocalDAO(host)
+        self.file_path = FilePathEnum.TILE_FINGERPRINTS.value[host.value]
+        self.max_age = timedelta(days=max_age_days)
+        self.fingerprints: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        '''Loads the fingerprints saved by the last run, if there are any.'''
+        if not os.path.exists(self.file_path):
+            self.logger.info('No tile fingerprints found at %s...', self.file_path)
+            self.fingerprints = {}
+            return
+        self.fingerprints = self.local_dao.open_file(self.file_path)
+        self.logger.info('Loaded %s tile fingerprints', len(self.fingerprints))
+
+    def is_unchanged(self, isbn: str, fingerprint: str) -> bool:
+        '''
+        Checks if the item was scraped recently with the same fingerprint.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+        - fingerprint (str): The tile fingerprint of the item.
+
+        Returns:
+        - bool: True if the item can skip scraping.
+        '''
+        stored = self.fingerprints.get(isbn)
+        if stored is None or stored['fingerprint'] != fingerprint:
+            return False
+        return datetime.now() - datetime.fromisoformat(stored['scraped_at']) < self.max_age
+
+    def update(self, isbn: str, fingerprint: str):
+        '''
+        Records the fingerprint of a successfully scraped item.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+        - fingerprint (str): The tile fingerprint of the item.
+        '''
+        with self.lock:
+            self.fingerprints[isbn] = {
+                'fingerprint': fingerprint,
+                'scraped_at': datetime.now().isoformat()
+            }
+
+    def forget(self, isbn: str):
+        '''
+        Drops the fingerprint of an item, so it is scraped again next run.
+
+        Parameters:
+        - isbn (str): The ISBN of the item.
+        '''
+        with self.lock:
+            self.fingerprints.pop(isbn, None)
+
+    def save(self):
+        '''Saves the fingerprints for the next run.'''
+        with self.lock:
+            self.local_dao.save_file(self.file_path, self.fingerprints)
+        self.logger.info('Saved %s tile fingerprints', len(self.fingerprints))
@@ -0,0 +1,230 @@
+'''Module to match series names against the titles of the known series locally.'''
+
+from collections import Counter
+from functools import lru_cache
+import re
+import threading
+import unicodedata
+
+# bracketed notes MangaUpdates adds to titles, ex: '(Novel)', '(Official English)'
+BRACKETED_PATTERN = re.compile(r'[(\[{][^)\]}]*[)\]}]')
+# separators read as a space, ex: 'Re:ZERO', 'Kaguya-sama: Love is War'
+SEPARATOR_PATTERN = re.compile(r'[:;/\\|_.,!?~\-–—"“”«»*+=<>]+')
+APOSTROPHE_PATTERN = re.compile(r'[\'’`]')
+NON_WORD_PATTERN = re.compile(r'[^\w ]+')
+# format, edition and volume words that name the same series in another form, ex: 'Berserk
+# Deluxe Edition', 'Naruto Manga Box Set', only when they end the title
+SUFFIX_PATTERN = re.compile(
+    r'(?: (?:light novel|novel|the manga|manga|comic|box set|bundle|omnibus|complete|'
+    r'hardcover|paperback|(?:\d+ in 1 |deluxe |collectors |special |perfect )?edition|'
+    r'(?:vols?|volume) \d+(?: \d+)?))+$'
+)
+NUMBER_PATTERN = re.compile(r'\d+')
+
+class TitleIndex:
+    '''
+    A class used to match series names against the titles and associated titles of the known
+    series, without searching MangaUpdates.
+
+    Titles are normalized before they are compared, so case, accents, punctuation, bracketed
+    notes like '(Novel)' and trailing format or edition words like 'Omnibus Edition' do not
+    matter.  Spin-off markers like 'Ex' are kept, since MangaUpdates lists the spin-off as a
+    series of its own.
+
+    Every normalized title is indexed by its trigrams.  A match counts the trigrams every
+    title shares with the name, and scores with the Dice coefficient of their trigrams only
+    the titles sharing enough of them to reach `min_confidence`, so it does not compare the
+    name against every title.  Titles holding other numbers than the name never match, so
+    'Classroom of the Elite Year 3' does not match 'Classroom of the Elite Year 2'.
+
+    Thread safe.
+
+    ...
+
+    Parameters
+    ----------
+    min_confidence : float
+        The score a title must reach to match
+
+    Attributes
+    ----------
+    titles : dict[int, tuple[str, frozenset[str], str, str, str]]
+        the normalized title, its trigrams, series id, title and lowercased category per
+        title id
+    postings : dict[str, set[int]]
+        the ids of the titles holding every trigram
+    series_titles : dict[str, list[int]]
+        the ids of the titles of every series
+
+    Methods
+    -------
+    normalize_title(title=str)
+        Normalizes a title for comparison.
+    get_trigrams(normalized_title=str)
+        Gets the trigrams of a normalized title.
+    score(series_name=str, title=str)
+        Scores how similar a series name and a title are.
+    add(series=dict)
+        Indexes the titles of a series.
+    match(series_name=str, category=str)
+        Matches a series name against the indexed titles.
+    '''
+
+    def __init__(self, min_confidence: float = 0.85):
+        self.min_confidence = min_confidence
+        self.lock = threading.Lock()
+        self.titles: dict[int, tuple[str, frozenset[str], str, str, str]] = {}
+        self.postings: dict[str, set[int]] = {}
+        self.series_titles: dict[str, list[int]] = {}
+        self.next_title_id = 0
+
+    def __len__(self) -> int:
+        return len(self.series_titles)
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def normalize_title(title: str) -> str:
+        '''
+        Normalizes a title for comparison.
+
+        Parameters:
+        - title (str): The title.
+
+        Returns:
+        - str: The title lowercased, without accents, punctuation, bracketed notes or
+        trailing format and edition words, and with single spaces between its words.
+        '''
+        title = unicodedata.normalize('NFKD', title)
+        title = ''.join([char for char in title if not unicodedata.combining(char)]).lower()
+        title = BRACKETED_PATTERN.sub(' ', title).replace('&', ' and ').replace('×', ' x ')
+        title = APOSTROPHE_PATTERN.sub('', title)
+        title = NON_WORD_PATTERN.sub(' ', SEPARATOR_PATTERN.sub(' ', title))
+        title = ' '.join(title.split())
+        # ? a title made only of suffix words is kept whole
+        return SUFFIX_PATTERN.sub('', title) or title
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def get_trigrams(normalized_title: str) -> frozenset[str]:
+        '''
+        Gets the trigrams of a normalized title, padded so its first and last letters and
+        short titles have trigrams of their own.
+
+        Parameters:
+        - normalized_title (str): The normalized title.
+
+        Returns:
+        - frozenset[str]: The trigrams.
+        '''
+        padded = '  ' + normalized_title + ' '
+        return frozenset([padded[index:index + 3] for index in range(len(padded) - 2)])
+
+    @classmethod
+    def score_trigrams(cls, trigrams: frozenset[str], title_trigrams: frozenset[str]) -> float:
+        '''Gets the Dice coefficient of two sets of trigrams.'''
+        if len(trigrams) == 0 or len(title_trigrams) == 0:
+            return 0
+        return 2 * len(trigrams & title_trigrams) / (len(trigrams) + len(title_trigrams))
+
+    @classmethod
+    def score(cls, series_name: str, title: str) -> float:
+        '''
+        Scores how similar a series name and a title are, once normalized.
+
+        Parameters:
+        - series_name (str): The series name.
+        - title (str): The title.
+
+        Returns:
+        - float: 1 if they are the same once normalized, else the Dice coefficient of their
+        trigrams, between 0 and 1.
+        '''
+        normalized_name = cls.normalize_title(series_name)
+        normalized_title = cls.normalize_title(title)
+        if normalized_name == normalized_title:
+            return 1
+        if NUMBER_PATTERN.findall(normalized_name) != NUMBER_PATTERN.findall(normalized_title):
+            return 0
+        return cls.score_trigrams(cls.get_trigrams(normalized_name),
+                                  cls.get_trigrams(normalized_title))
+
+    def add(self, series: dict):
+        '''
+        Indexes the title and associated titles of a series, in place of the ones it was
+        indexed with before.
+
+        Parameters:
+        - series (dict): The series record, with its series_id, title, associated_titles and
+        category.
+        '''
+        if series.get('series_id') is None:
+            return
+        titles = [series.get('title'), *(series.get('associated_titles') or [])]
+        with self.lock:
+            self.__remove(series['series_id'])
+            title_ids = []
+            for title in dict.fromkeys([title for title in titles if title]):
+                normalized_title = self.normalize_title(title)
+                trigrams = self.get_trigrams(normalized_title)
+                title_id = self.next_title_id
+                self.next_title_id += 1
+                self.titles[title_id] = (normalized_title, trigrams, series['series_id'], title,
+                                         (series.get('category') or '').lower())
+                for trigram in trigrams:
+                    self.postings.setdefault(trigram, set()).add(title_id)
+                title_ids.append(title_id)
+            self.series_titles[series['series_id']] = title_ids
+
+    def match(self, series_name: str, category: str | None) -> dict | None:
+        '''
+        Matches a series name against the indexed titles of the series of a category.
+
+        Parameters:
+        - series_name (str): The series name.
+        - category (str): The MangaUpdates category of the series, or None for any category.
+
+        Returns:
+        - dict: The series id, the title matched and its score as series_match_confidence,
+        or None if no title reaches `min_confidence`.
+        '''
+        normalized_name = self.normalize_title(series_name)
+        trigrams = self.get_trigrams(normalized_name)
+        numbers = NUMBER_PATTERN.findall(normalized_name)
+        # ? titles sharing fewer trigrams cannot reach min_confidence, whatever their length
+        min_shared = self.min_confidence * len(trigrams) / 2
+        best = None
+        with self.lock:
+            shared = Counter()
+            for trigram in trigrams:
+                shared.update(self.postings.get(trigram, ()))
+            for title_id, count in shared.items():
+                if count < min_shared:
+                    continue
+                normalized_title, title_trigrams, series_id, title, title_category = \
+                    self.titles[title_id]
+                if category is not None and title_category != category.lower():
+                    continue
+                if normalized_title == normalized_name:
+                    confidence = 1
+                elif NUMBER_PATTERN.findall(normalized_title) != numbers:
+                    continue
+                else:
+                    confidence = 2 * count / (len(trigrams) + len(title_trigrams))
+                if best is None or confidence > best['series_match_confidence']:
+                    best = {
+                        'series_id': series_id,
+                        'title': title,
+                        'series_match_confidence': confidence
+                    }
+        if best is None or best['series_match_confidence'] < self.min_confidence:
+            return None
+        return best
+
+    def __remove(self, series_id: str):
+        for title_id in self.series_titles.pop(series_id, []):
+            _, trigrams, _, _, _ = self.titles.pop(title_id)
+            for trigram in trigrams:
+                title_ids = self.postings[trigram]
+                title_ids.discard(title_id)
+                if len(title_ids) == 0:
+                    del self.postings[trigram]
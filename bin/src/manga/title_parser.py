@@ -0,0 +1,130 @@
+'''Module to parse volume numbers and series names from Crunchyroll display names.'''
+
+from functools import lru_cache
+import re
+
+# number following a volume keyword, ex: '10', '10.5', '1-3'
+NUMBER = r'\d+\.?\-?\d*'
+
+# volume keywords in the order they are checked, the first keyword found anywhere wins
+VOLUME_KEYWORDS = [
+    r'Volume[a-z]?',
+    r'Vol[a-z]?',
+    r'Vol.[a-z]?',
+    r'Graphic Novel[a-z]?',
+    r'Box Set'
+]
+
+# name keywords in the order the legacy MangaEnricher.parse_name checks them, as
+# (search pattern, split pattern), the legacy 'Vol' search does not allow a range
+NAME_KEYWORDS = [
+    (r' [()]?Volume[a-z]?[()]? ' + NUMBER, r' [()]?Volume[a-z]?[()]? ' + NUMBER),
+    (r' [()]?Vol[a-z]?[()]? \d+\.?\d*', r' [()]?Vol[a-z]?[()]? ' + NUMBER),
+    (r' [()]?Graphic Novel[a-z]?[()]? ' + NUMBER, r' [()]?Graphic Novel[a-z]?[()]? ' + NUMBER),
+    (r' [()]?Box Set[()]? ' + NUMBER, r' [()]?Box Set[()]? ' + NUMBER)
+]
+BOX_SET_KEYWORD = len(NAME_KEYWORDS) - 1
+
+def priority_pattern(patterns: list[str]) -> re.Pattern:
+    '''
+    Compiles the given patterns into a single pattern anchored at the start of the string,
+    with one lookahead per pattern.  The lookaheads are tried in order, so the match holds
+    the leftmost hit of the first pattern found anywhere, in its group, just like searching
+    for each pattern in turn.
+
+    Parameters:
+    - patterns (list[str]): The patterns in the order they should be checked.
+
+    Returns:
+    - re.Pattern: The compiled pattern, group n + 1 is the hit of patterns[n].
+    '''
+    return re.compile(
+        '^(?:' + '|'.join([f'(?=.*?({pattern}))' for pattern in patterns]) + ')',
+        re.DOTALL
+    )
+
+VOLUME_PATTERN = priority_pattern([
+    r' [()]?' + keyword + r'[()]? ' + NUMBER for keyword in VOLUME_KEYWORDS
+])
+NAME_PATTERN = priority_pattern([search for search, _ in NAME_KEYWORDS])
+NAME_SPLIT_PATTERNS = [re.compile(split) for _, split in NAME_KEYWORDS]
+NUMBER_PATTERN = re.compile(NUMBER)
+
+class TitleParser:
+    '''
+    A class used to parse volume numbers and series names from Crunchyroll display names,
+    with every pattern compiled once.
+
+    ...
+
+    Methods
+    -------
+    parse_volume(display_name=str, category=str)
+        Parses the volume number from the given display name.
+    parse_name(display_name=str, category=str)
+        Parses the series name from the given display name.
+    '''
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_category_pattern(category: str) -> re.Pattern:
+        '''
+        Gets the compiled fallback volume pattern for the given category.  The category is
+        used as a raw pattern, same as the legacy parsing.
+
+        Parameters:
+        - category (str): The category of the volume.
+
+        Returns:
+        - re.Pattern: The compiled pattern for the category.
+        '''
+        return re.compile(r' [()]?' + category + r'[a-z]?[()]? ' + NUMBER)
+
+    def parse_volume(self, display_name: str, category: str):
+        '''
+        Parses the volume number from the given display name.
+
+        Parameters:
+        - display_name (str): The display name to search for.
+        - category (str): The category of the volume to search for.
+
+        Returns:
+        - str: The volume number from the given display name. Or None if no volume number is found.
+        '''
+        match = VOLUME_PATTERN.match(display_name)
+        search_volume = match.group(match.lastindex) if match is not None \
+            else self.__search_category(display_name, category)
+        if search_volume is not None:
+            inner_volume = NUMBER_PATTERN.search(search_volume)
+            if inner_volume:
+                return inner_volume.group(0)
+        return None
+
+    def __search_category(self, display_name: str, category: str):
+        search_any = self.get_category_pattern(category).search(display_name)
+        return search_any.group(0) if search_any else None
+
+    def parse_name(self, display_name: str, category: str) -> str:
+        '''
+        Parses the series name from the given display name, by removing the volume and the
+        category from it.  Mirrors the legacy `MangaEnricher.parse_name`.
+
+        Parameters:
+        - display_name (str): The display name to parse.
+        - category (str): The category of the volume, ex: 'Manga'.
+
+        Returns:
+        - str: The series name from the given display name.
+        '''
+        match = NAME_PATTERN.match(display_name)
+        if match is not None:
+            keyword = match.lastindex - 1
+            name_split = NAME_SPLIT_PATTERNS[keyword].split(display_name)
+        else:
+            keyword = None
+            name_split = self.get_category_pattern(category).split(display_name)
+
+        if keyword == BOX_SET_KEYWORD:
+            name_split[0] += ' Box Set'
+            return ''.join(name_split)
+        return ''.join(name_split).replace(' ' + category, '')
@@ -0,0 +1,217 @@
+'''Async http client shared by the asyncio scrape engine.'''
+
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.enums.host_enum import HostEnum
+from src.util.http_client import HttpClient
+from src.util.manga_logger import MangaLogger
+from src.util.rate_limiter import AsyncHostLimiter
+
+class AsyncHttpClient:
+    '''
+    A class used to make non-blocking http requests from a single event loop, with the rate
+    and the number of requests in flight limited per remote host by an `AsyncHostLimiter`.
+    Pool sizes, rate limits, timeouts and retries default to the settings of the shared
+    `HttpClient`, and requests are recorded or replayed by its cassette, if set.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    host_limits : dict[str, int]
+        The max number of concurrent requests per remote host name, on top of
+        `HttpClient.HOST_POOL_SIZES`, the adaptive window stays below it
+    default_limit : int
+        The max number of concurrent requests for any host not in host_limits
+    timeout : int
+        The total timeout in seconds for a single request
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    session : aiohttp.ClientSession
+        the session holding the keep-alive connection pool, created on `open`
+
+    Methods
+    -------
+    open()
+        Opens the client session, must be called from inside the event loop.
+    close()
+        Closes the client session and its connections.
+    get_text(url=str)
+        Gets the response body of the given url as text.
+    get_json(url=str)
+        Gets the response body of the given url as json.
+    post_json(url=str, json=dict, data=dict)
+        Posts to the given url and returns the json response.
+    put_json(url=str, json=dict)
+        Puts to the given url and returns the json response.
+    delete_json(url=str)
+        Deletes at the given url and returns the json response.
+    '''
+
+    def __init__(self, host: HostEnum, host_limits: dict[str, int] | None = None,
+                 default_limit: int | None = None, timeout: int = 30):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.host = host
+        self.host_limits = { **HttpClient.HOST_POOL_SIZES, **(host_limits or {}) }
+        self.default_limit = default_limit or HttpClient.DEFAULT_POOL_SIZE
+        self.timeout = timeout
+        self.session: aiohttp.ClientSession | None = None
+        self.limiters: dict[str, AsyncHostLimiter] = {}
+
+    async def open(self):
+        '''Opens the client session, must be called from inside the event loop.'''
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=0)
+            )
+        return self
+
+    async def close(self):
+        '''Closes the client session and its connections.'''
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *_exc):
+        await self.close()
+
+    def get_limiter(self, url: str) -> AsyncHostLimiter:
+        '''
+        Gets the limiter of the rate and concurrent requests for the host of the given url.
+
+        Parameters:
+        - url (str): The url being requested.
+
+        Returns:
+        - AsyncHostLimiter: The limiter for the url's host.
+        '''
+        netloc = urlsplit(url).netloc
+        if netloc not in self.limiters:
+            self.limiters[netloc] = AsyncHostLimiter(
+                self.host, netloc,
+                HttpClient.HOST_RATE_LIMITS.get(netloc, HttpClient.DEFAULT_RATE_LIMIT),
+                self.host_limits.get(netloc, self.default_limit),
+                HttpClient.is_scraped(netloc)
+            )
+        return self.limiters[netloc]
+
+    async def request(self, method: str, url: str, as_json: bool = True,
+                      raise_for_status: bool = False, **kwargs):
+        '''
+        Makes a request once the limiter of the url's host allows it.  Idempotent requests
+        are retried with jittered exponential backoff like the shared `HttpClient`, on
+        connection errors, timeouts and the `HttpClient.RETRY_STATUSES` responses.
+
+        Parameters:
+        - method (str): The http method.
+        - url (str): The url to request.
+        - as_json (bool): Whether to decode the response body as json, otherwise text.
+        - raise_for_status (bool): Whether to raise on an error response, otherwise decode it.
+
+        Returns:
+        - dict | str: The decoded response body.
+
+        Raises:
+        - aiohttp.ClientError: The request failed, or answered with an error status and
+        raise_for_status is set.
+        - asyncio.TimeoutError: The request timed out.
+        '''
+        if self.session is None:
+            await self.open()
+        retries = HttpClient.RETRIES if method in ('GET', 'PUT', 'DELETE') else 0
+        limiter = self.get_limiter(url)
+        for attempt in range(retries + 1):
+            try:
+                await limiter.acquire()
+                started = time.perf_counter()
+                congested = True
+                status = None
+                cassette = HttpClient.cassette
+                try:
+                    if cassette is not None and cassette.replaying:
+                        await asyncio.sleep(cassette.get_latency())
+                        entry = cassette.replay(method, url, kwargs.get('data'))
+                        status = entry['status']
+                        congested = status in HttpClient.RETRY_STATUSES
+                        if raise_for_status and status >= 400:
+                            raise aiohttp.ClientResponseError(None, (), status=status)
+                        return self.decode(entry['text'], as_json)
+                    async with self.session.request(method, url, **kwargs) as response:
+                        status = response.status
+                        congested = response.status in HttpClient.RETRY_STATUSES
+                        if congested and attempt < retries:
+                            raise aiohttp.ClientResponseError(response.request_info,
+                                                              response.history,
+                                                              status=response.status)
+                        text = await response.text()
+                        if cassette is not None:
+                            cassette.record(method, url, kwargs.get('data'), response.status,
+                                            response.content_type, text)
+                        if raise_for_status and response.status >= 400:
+                            raise aiohttp.ClientResponseError(response.request_info,
+                                                              response.history,
+                                                              status=response.status)
+                        return self.decode(text, as_json)
+                finally:
+                    seconds = time.perf_counter() - started
+                    await limiter.release(seconds, congested)
+                    if HttpClient.metrics is not None:
+                        HttpClient.metrics.observe_http(limiter.netloc, method, status, seconds)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientResponseError,
+                    asyncio.TimeoutError) as e:
+                if attempt >= retries or (isinstance(e, aiohttp.ClientResponseError) and
+                                          e.status not in HttpClient.RETRY_STATUSES):
+                    raise
+                self.logger.warning('Retrying %s %s after attempt %s failed',
+                                    method, url, attempt + 1)
+                await asyncio.sleep(HttpClient.get_backoff_seconds(attempt))
+
+    @staticmethod
+    def decode(text: str, as_json: bool):
+        '''
+        Decodes a response body.
+
+        Parameters:
+        - text (str): The response body.
+        - as_json (bool): Whether to decode the body as json, otherwise keep the text.
+
+        Returns:
+        - dict | str | None: The decoded body, None for an empty json body.
+        '''
+        if not as_json:
+            return text
+        return json.loads(text) if text.strip() else None
+
+    async def get_text(self, url: str) -> str:
+        '''Gets the response body of the given url as text.'''
+        return await self.request('GET', url, as_json=False)
+
+    async def get_json(self, url: str):
+        '''Gets the response body of the given url as json.'''
+        return await self.request('GET', url)
+
+    async def post_json(self, url: str, json: dict | None = None, data: dict | None = None):
+        '''Posts to the given url and returns the json response.'''
+        return await self.request('POST', url, json=json, data=data)
+
+    async def put_json(self, url: str, json: dict | None = None):
+        '''Puts to the given url and returns the json response.'''
+        return await self.request('PUT', url, json=json)
+
+    async def delete_json(self, url: str):
+        '''Deletes at the given url and returns the json response.'''
+        return await self.request('DELETE', url)
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import requests
 
 from src.enums.host_enum import HostEnum
+from src.util.http_client import HttpClient
 from src.util.manga_logger import MangaLogger
 
 class AWSDAO:
@@ -36,6 +37,7 @@ class AWSDAO:
 
     def __init__(self, host: HostEnum):
         self.logger = MangaLogger(host).register_logger(__name__)
+        self.http_client = HttpClient(host)
 
     def get_data(self, url: str):
         """Gets data from an AWS directory and returns the contents as a json
@@ -54,7 +56,7 @@ class AWSDAO:
         """
         try:
             start = datetime.now()
-            response = requests.get(url, timeout=30).json()
+            response = self.http_client.get(url).json()
             end = (datetime.now() - start).total_seconds()
             self.logger.info('Time to get data from AWS: %s', str(timedelta(seconds=end)))
             return response
@@ -78,7 +80,7 @@ class AWSDAO:
         """
         try:
             start = datetime.now()
-            response = requests.post(url, json=contents, timeout=30).json()
+            response = self.http_client.post(url, json=contents).json()
             end = (datetime.now() - start).total_seconds()
             self.logger.info('Time to post data to AWS: %s', str(timedelta(seconds=end)))
             return response
@@ -0,0 +1,161 @@
+'''Circuit breaker to stop calling a remote service while it is unhealthy.'''
+
+import threading
+import time
+
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class CircuitBreaker:
+    '''
+    A class used to stop calling a remote service while it is unhealthy, so a run does not
+    keep sending thousands of requests that can only fail.
+
+    The breaker is closed while requests succeed.  Once `failure_threshold` requests in a row
+    fail, it opens and refuses every request for `reset_seconds`.  It then lets a single probe
+    request through: a success closes it, a failure opens it again for twice as long, up to
+    `max_reset_seconds`.  A breaker that stays open for `give_up_seconds` gives up, and the
+    caller should stop its run rather than wait any longer.
+
+    Thread safe, and never blocks, so it can be used from the event loop too.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    name : str
+        The name of the remote service, for logging
+    failure_threshold : int
+        The number of failed requests in a row that opens the breaker
+    reset_seconds : float
+        The number of seconds the breaker first stays open before a probe
+    max_reset_seconds : float
+        The max number of seconds the breaker stays open before a probe
+    give_up_seconds : float
+        The number of seconds the breaker may stay open before giving up
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    state : str
+        either `CLOSED`, `OPEN` or `HALF_OPEN`
+
+    Methods
+    -------
+    start()
+        Closes the breaker and forgets every failure.
+    allow_request()
+        Checks if a request may be sent.
+    record_success()
+        Records a request that reached the service.
+    record_failure()
+        Records a request that failed to reach the service.
+    get_wait_seconds()
+        Gets how long to wait before sending requests again.
+    has_given_up()
+        Checks if the breaker stayed open for too long.
+    '''
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    # seconds to wait while the probe of a half open breaker is in flight
+    PROBE_WAIT_SECONDS = 0.5
+
+    def __init__(self, host: HostEnum, name: str, failure_threshold: int = 5,
+                 reset_seconds: float = 5.0, max_reset_seconds: float = 60.0,
+                 give_up_seconds: float = 600.0):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self.give_up_seconds = give_up_seconds
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        '''Closes the breaker and forgets every failure.'''
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.open_seconds = self.reset_seconds
+            self.opened_at: float | None = None
+            self.open_until = 0.0
+            self.probing = False
+
+    def allow_request(self) -> bool:
+        '''
+        Checks if a request may be sent, letting a single probe through once an open breaker
+        has waited long enough.
+
+        Returns:
+        - bool: True if the request may be sent, it must then be recorded as a success or
+        a failure.
+        '''
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                self.logger.info('Probing %s...', self.name)
+                return True
+            return False
+
+    def record_success(self):
+        '''Records a request that reached the service, which closes the breaker.'''
+        with self.lock:
+            if self.state != self.CLOSED:
+                self.logger.info('%s is healthy again... resuming', self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+            self.open_seconds = self.reset_seconds
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        '''Records a request that failed to reach the service, which may open the breaker.'''
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.open_seconds = min(self.open_seconds * 2, self.max_reset_seconds)
+            elif self.state == self.OPEN or self.failures < self.failure_threshold:
+                return
+            now = time.monotonic()
+            self.state = self.OPEN
+            self.opened_at = self.opened_at or now
+            self.open_until = now + self.open_seconds
+            self.probing = False
+            self.logger.error('%s is unhealthy after %s failed requests... pausing %s seconds',
+                              self.name, str(self.failures), str(self.open_seconds))
+
+    def get_wait_seconds(self) -> float:
+        '''
+        Gets how long to wait before sending requests again.
+
+        Returns:
+        - float: 0 if requests may be sent, otherwise the seconds left until the next probe,
+        or a short wait while the probe is in flight.
+        '''
+        with self.lock:
+            if self.state == self.CLOSED:
+                return 0
+            if self.state == self.HALF_OPEN:
+                return self.PROBE_WAIT_SECONDS if self.probing else 0
+            return max(0.0, self.open_until - time.monotonic())
+
+    def has_given_up(self) -> bool:
+        '''
+        Checks if the breaker stayed open for too long.
+
+        Returns:
+        - bool: True if it has not closed for `give_up_seconds` since it opened.
+        '''
+        with self.lock:
+            return self.opened_at is not None and \
+                time.monotonic() - self.opened_at >= self.give_up_seconds
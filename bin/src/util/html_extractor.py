@@ -0,0 +1,80 @@
+'''Module to parse the scraped html pages with a pluggable parser backend.'''
+
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.util.manga_logger import MangaLogger
+
+class HtmlExtractor:
+    '''
+    A class used to parse the scraped html pages.  Each page type can be parsed in full, or
+    through a strainer that only builds the nodes the scrapers read, and with either the
+    pure python `html.parser` or the C backed `lxml` parser when it is installed.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    parser : str
+        The parser backend, 'lxml' or 'html.parser', defaults to the fastest installed one
+    strained : bool
+        Whether to only parse the nodes the scrapers read for the page types with a strainer,
+        defaults to only straining with `html.parser` since lxml builds a full tree faster
+        than bs4 can filter one (see benchmark_html_extraction.py)
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+
+    Methods
+    -------
+    parse(html=str, page_type=PageTypeEnum)
+        Parses the given html page of the given type.
+    '''
+
+    # only the blocks each scraper reads, pages without a strainer are always parsed in full
+    STRAINED_CLASSES = {
+        PageTypeEnum.LISTING: ['product', 'pagination-text'],
+        PageTypeEnum.ISBN: ['book-info', 'standard-offers'],
+        PageTypeEnum.BARNES_AND_NOBLE: ['pdp-commerce-format', 'purchase-add-to-cart']
+    }
+
+    def __init__(self, host: HostEnum, parser: str | None = None,
+                 strained: bool | None = None):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.parser = parser or self.get_default_parser()
+        self.strained = strained if strained is not None else self.parser == 'html.parser'
+        self.strainers = {
+            page_type: SoupStrainer('div', attrs={'class': classes})
+            for page_type, classes in self.STRAINED_CLASSES.items()
+        }
+
+    @staticmethod
+    def get_default_parser() -> str:
+        '''
+        Gets the fastest installed parser backend.
+
+        Returns:
+        - str: 'lxml' if it is installed, otherwise 'html.parser'.
+        '''
+        return 'lxml' if find_spec('lxml') is not None else 'html.parser'
+
+    def parse(self, html: str, page_type: PageTypeEnum) -> BeautifulSoup:
+        '''
+        Parses the given html page of the given type.
+
+        Parameters:
+        - html (str): The page contents.
+        - page_type (PageTypeEnum): The type of the page, to pick its strainer.
+
+        Returns:
+        - BeautifulSoup: The parsed page.
+        '''
+        strainer = self.strainers.get(page_type) if self.strained else None
+        return BeautifulSoup(html, self.parser, parse_only=strainer)
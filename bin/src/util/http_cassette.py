@@ -0,0 +1,200 @@
+'''Module to record http responses into fixtures and replay them offline.'''
+
+import hashlib
+import json
+import os
+import random
+import threading
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class HttpCassette:
+    '''
+    A class used to record the responses of every outbound http request into a fixture
+    directory, and to replay them later without touching the network.
+
+    Each response is saved as a json file under a directory per remote host, named by a hash
+    of the verb, the url and the form data of the request, followed by how many times the
+    same request was made before, so a request that is made again after a write replays the
+    later response.  Replay returns the n-th recording of a request on its n-th call, or the
+    last one once they run out, so the same crawl always gets the same responses.  A request
+    that was never recorded fails like a connection error.
+
+    Json bodies are left out of the key, since the writes to the manga server carry
+    timestamps and would never match between runs.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    fixtures_path : str
+        The directory holding the recorded responses
+    mode : str
+        Either 'record' to save live responses or 'replay' to serve saved ones
+    latency : float
+        The number of seconds every replayed response is delayed by
+    jitter : float
+        The max number of seconds added at random to the latency, from a seeded generator
+    seed : int
+        The seed of the jitter generator
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    counts : dict[str, int]
+        the number of requests per outcome, 'recorded', 'replayed' or 'missed'
+
+    Methods
+    -------
+    get_key(method=str, url=str, data=dict)
+        Gets the fixture key of a request.
+    record(method=str, url=str, data=dict, status=int, content_type=str, text=str)
+        Saves the response of a live request.
+    replay(method=str, url=str, data=dict)
+        Gets the saved response of a request.
+    get_latency()
+        Gets the number of seconds to delay a replayed response by.
+    to_response(entry=dict)
+        Converts a saved response to a `requests.Response`.
+    '''
+
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+    def __init__(self, host: HostEnum, fixtures_path: str, mode: str = REPLAY,
+                 latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.fixtures_path = fixtures_path
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.counts = { 'recorded': 0, 'replayed': 0, 'missed': 0 }
+
+    @property
+    def replaying(self) -> bool:
+        '''Whether responses are served from the fixtures instead of the network.'''
+        return self.mode == self.REPLAY
+
+    def get_key(self, method: str, url: str, data: dict | None = None) -> str:
+        '''
+        Gets the fixture key of a request.
+
+        Parameters:
+        - method (str): The http verb.
+        - url (str): The requested url.
+        - data (dict): The form data of the request, if any.
+
+        Returns:
+        - str: The path of the request's fixtures relative to the fixture directory, without
+        the call number.
+        '''
+        form = urlencode(sorted(data.items())) if data else ''
+        digest = hashlib.sha1(f'{method} {url} {form}'.encode('UTF-8')).hexdigest()
+        return os.path.join(urlsplit(url).netloc.replace(':', '_'), digest)
+
+    def __next_call(self, key: str) -> int:
+        with self.lock:
+            call = self.calls.get(key, 0)
+            self.calls[key] = call + 1
+            return call
+
+    def __count(self, outcome: str):
+        with self.lock:
+            self.counts[outcome] += 1
+
+    def record(self, method: str, url: str, data: dict | None, status: int,
+               content_type: str, text: str):
+        '''
+        Saves the response of a live request.
+
+        Parameters:
+        - method (str): The http verb.
+        - url (str): The requested url.
+        - data (dict): The form data of the request, if any.
+        - status (int): The status of the response.
+        - content_type (str): The content type of the response.
+        - text (str): The body of the response.
+        '''
+        key = self.get_key(method, url, data)
+        file_path = os.path.join(self.fixtures_path, f'{key}-{self.__next_call(key)}.json')
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='UTF-8') as fixture_file:
+            json.dump({
+                'method': method,
+                'url': url,
+                'data': data,
+                'status': status,
+                'content_type': content_type,
+                'text': text
+            }, fixture_file, indent=4, separators=(',', ': '))
+        self.__count('recorded')
+
+    def replay(self, method: str, url: str, data: dict | None = None) -> dict:
+        '''
+        Gets the saved response of a request.
+
+        Parameters:
+        - method (str): The http verb.
+        - url (str): The requested url.
+        - data (dict): The form data of the request, if any.
+
+        Returns:
+        - dict: The saved response, with its status, content_type and text.
+
+        Raises:
+        - requests.exceptions.ConnectionError: The request was never recorded.
+        '''
+        key = self.get_key(method, url, data)
+        call = self.__next_call(key)
+        while call >= 0:
+            file_path = os.path.join(self.fixtures_path, f'{key}-{call}.json')
+            if os.path.exists(file_path):
+                with open(file_path, 'r', encoding='UTF-8') as fixture_file:
+                    self.__count('replayed')
+                    return json.load(fixture_file)
+            call -= 1
+        self.__count('missed')
+        self.logger.warning('No recorded response for %s %s', method, url)
+        raise requests.exceptions.ConnectionError(f'No recorded response for {method} {url}')
+
+    def get_latency(self) -> float:
+        '''
+        Gets the number of seconds to delay a replayed response by.
+
+        Returns:
+        - float: The latency plus a seeded random jitter.
+        '''
+        if self.jitter <= 0:
+            return self.latency
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    @staticmethod
+    def to_response(entry: dict) -> requests.Response:
+        '''
+        Converts a saved response to a `requests.Response`.
+
+        Parameters:
+        - entry (dict): The saved response.
+
+        Returns:
+        - requests.Response: The response, as if it came from the network.
+        '''
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict({ 'Content-Type': entry['content_type'] })
+        response.encoding = 'UTF-8'
+        response._content = entry['text'].encode('UTF-8')
+        return response
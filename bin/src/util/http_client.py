@@ -0,0 +1,318 @@
+'''Shared http client with keep-alive connection pools for every outbound call.'''
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.enums.host_enum import HostEnum
+from src.util.http_cassette import HttpCassette
+from src.util.manga_logger import MangaLogger
+from src.util.rate_limiter import HostLimiter
+from src.util.scrape_metrics import ScrapeMetrics
+
+class HttpClient:
+    '''
+    A class used to make http requests through a single shared `requests.Session`, so every
+    module reuses the same keep-alive connections instead of paying TCP and TLS setup on
+    each call.
+
+    The session is created once per process and mounts one connection pool per remote host,
+    sized by `HOST_POOL_SIZES`.  Idempotent requests are retried with jittered exponential
+    backoff on connection errors, timeouts and the `RETRY_STATUSES` responses.
+
+    Every attempt of a request also goes through the `HostLimiter` of its remote host, which
+    caps the request rate at `HOST_RATE_LIMITS` and adapts the number of concurrent requests
+    between 1 and the pool size, backing off when the host throttles, fails or times out.
+    Hosts missing from `HOST_RATE_LIMITS` are not scraped, ex: the AWS web API, so they are
+    only capped at `DEFAULT_RATE_LIMIT` and their pool size, without adapting.
+    The backoff between attempts is waited out of the limiter, so it neither holds a slot
+    nor counts in the latency the window adapts to.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    timeout : int
+        The default timeout in seconds for requests made by this client
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    metrics : ScrapeMetrics | None
+        the metrics every request records its latency in, shared by all clients, if set
+    cassette : HttpCassette | None
+        the cassette every request is recorded into or replayed from, shared by all
+        clients, if set
+
+    Methods
+    -------
+    configure(pool_sizes=dict, default_pool_size=int, retries=int, backoff_factor=float,
+              backoff_jitter=float, rate_limits=dict, default_rate_limit=float)
+        Replaces the shared session and limiters with ones using the given settings.
+    get_backoff_seconds(attempt=int)
+        Gets the jittered backoff before retrying a failed attempt.
+    get_limiter(url=str)
+        Gets the shared limiter for the remote host of the given url.
+    get(url=str, **kwargs)
+        Makes a GET request with the shared session.
+    post(url=str, **kwargs)
+        Makes a POST request with the shared session.
+    put(url=str, **kwargs)
+        Makes a PUT request with the shared session.
+    delete(url=str, **kwargs)
+        Makes a DELETE request with the shared session.
+    '''
+
+    HOST_POOL_SIZES = {
+        'localhost:4000': 40,
+        'store.crunchyroll.com': 20,
+        'www.campusbooks.com': 10,
+        'api.mangaupdates.com': 10,
+        'barnesandnoble.com': 5
+    }
+    DEFAULT_POOL_SIZE = 10
+    # max requests per second per scraped remote host, None for no limit
+    HOST_RATE_LIMITS = {
+        'localhost:4000': None,
+        'store.crunchyroll.com': 20,
+        'www.campusbooks.com': 5,
+        'api.mangaupdates.com': 5,
+        'barnesandnoble.com': 2
+    }
+    # max requests per second for any other host, None for no limit
+    DEFAULT_RATE_LIMIT = None
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    # max random seconds added to every backoff, so clients retrying together spread out
+    BACKOFF_JITTER = 0.5
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    _session: requests.Session | None = None
+    _session_lock = threading.Lock()
+    _limiters: dict[str, HostLimiter] = {}
+    metrics: ScrapeMetrics | None = None
+    cassette: HttpCassette | None = None
+
+    def __init__(self, host: HostEnum, timeout: int = 30):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.host = host
+        self.timeout = timeout
+
+    @classmethod
+    def configure(cls, pool_sizes: dict[str, int] | None = None,
+                  default_pool_size: int | None = None, retries: int | None = None,
+                  backoff_factor: float | None = None, backoff_jitter: float | None = None,
+                  rate_limits: dict[str, float | None] | None = None,
+                  default_rate_limit: float | None = None):
+        '''
+        Replaces the shared session and limiters with ones using the given settings.
+        Settings that are not given keep their current value.
+
+        Parameters:
+        - pool_sizes (dict[str, int]): The connection pool size per remote host, which is
+        also its max number of concurrent requests.
+        - default_pool_size (int): The connection pool size for any other host.
+        - retries (int): The max number of retries for a request.
+        - backoff_factor (float): The backoff factor between retries.
+        - backoff_jitter (float): The max random seconds added to every backoff.
+        - rate_limits (dict[str, float | None]): The max requests per second per scraped remote
+        host.
+        - default_rate_limit (float): The max requests per second for any other host.
+        '''
+        with cls._session_lock:
+            if pool_sizes is not None:
+                cls.HOST_POOL_SIZES = { **cls.HOST_POOL_SIZES, **pool_sizes }
+            if default_pool_size is not None:
+                cls.DEFAULT_POOL_SIZE = default_pool_size
+            if retries is not None:
+                cls.RETRIES = retries
+            if backoff_factor is not None:
+                cls.BACKOFF_FACTOR = backoff_factor
+            if backoff_jitter is not None:
+                cls.BACKOFF_JITTER = backoff_jitter
+            if rate_limits is not None:
+                cls.HOST_RATE_LIMITS = { **cls.HOST_RATE_LIMITS, **rate_limits }
+            if default_rate_limit is not None:
+                cls.DEFAULT_RATE_LIMIT = default_rate_limit
+            if cls._session is not None:
+                cls._session.close()
+            cls._session = None
+            cls._limiters = {}
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        '''
+        Gets the shared session, creating it on first use.
+
+        Returns:
+        - requests.Session: The session shared by every http client.
+        '''
+        session = cls._session
+        if session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = cls.__create_session()
+                session = cls._session
+        return session
+
+    @classmethod
+    def __create_session(cls) -> requests.Session:
+        session = requests.Session()
+        session.mount('http://', cls.__create_adapter(cls.DEFAULT_POOL_SIZE))
+        session.mount('https://', cls.__create_adapter(cls.DEFAULT_POOL_SIZE))
+        for netloc, pool_size in cls.HOST_POOL_SIZES.items():
+            adapter = cls.__create_adapter(pool_size)
+            session.mount(f'http://{netloc}', adapter)
+            session.mount(f'https://{netloc}', adapter)
+        return session
+
+    @staticmethod
+    def __create_adapter(pool_size: int) -> HTTPAdapter:
+        # ? retries are made by `request`, so every attempt is timed and limited on its own
+        return HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+
+    @classmethod
+    def get_backoff_seconds(cls, attempt: int) -> float:
+        '''
+        Gets the jittered backoff before retrying a failed attempt.
+
+        Parameters:
+        - attempt (int): The number of the failed attempt, from 0.
+
+        Returns:
+        - float: The seconds to wait.
+        '''
+        return cls.BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, cls.BACKOFF_JITTER)
+
+    def get_limiter(self, url: str) -> HostLimiter:
+        '''
+        Gets the shared limiter for the remote host of the given url, creating it on first use.
+
+        Parameters:
+        - url (str): The url being requested.
+
+        Returns:
+        - HostLimiter: The limiter of the url's host.
+        '''
+        netloc = urlsplit(url).netloc
+        limiter = self._limiters.get(netloc)
+        if limiter is None:
+            with self._session_lock:
+                limiter = self._limiters.get(netloc)
+                if limiter is None:
+                    limiter = HostLimiter(
+                        self.host, netloc,
+                        self.HOST_RATE_LIMITS.get(netloc, self.DEFAULT_RATE_LIMIT),
+                        self.HOST_POOL_SIZES.get(netloc, self.DEFAULT_POOL_SIZE),
+                        self.is_scraped(netloc)
+                    )
+                    self._limiters[netloc] = limiter
+        return limiter
+
+    @classmethod
+    def is_scraped(cls, netloc: str) -> bool:
+        '''
+        Checks if a remote host is scraped, so its limiter adapts to it.
+
+        Parameters:
+        - netloc (str): The remote host name.
+
+        Returns:
+        - bool: True if the host has an entry in `HOST_RATE_LIMITS`.
+        '''
+        return netloc in cls.HOST_RATE_LIMITS
+
+    @classmethod
+    def is_congested(cls, response: requests.Response) -> bool:
+        '''
+        Checks if the host throttled or failed an attempt.
+
+        Parameters:
+        - response (requests.Response): The response of the attempt.
+
+        Returns:
+        - bool: True if the response has one of the `RETRY_STATUSES`.
+        '''
+        return response.status_code in cls.RETRY_STATUSES
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        '''
+        Makes a request with the shared session, once the limiter of the url's host allows
+        it.  Idempotent requests are retried with jittered backoff on connection errors,
+        timeouts and the `RETRY_STATUSES` responses, each attempt acquiring the limiter again.
+
+        Parameters:
+        - method (str): The http method.
+        - url (str): The url to request.
+
+        Returns:
+        - requests.Response: The response of the last attempt.
+
+        Raises:
+        - requests.exceptions.RequestException: The request failed after all retries.
+        '''
+        kwargs.setdefault('timeout', self.timeout)
+        retries = self.RETRIES if method in ('GET', 'PUT', 'DELETE') else 0
+        limiter = self.get_limiter(url)
+        for attempt in range(retries + 1):
+            try:
+                response = self.__attempt(limiter, method, url, **kwargs)
+                if not self.is_congested(response) or attempt >= retries:
+                    return response
+                response.close()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= retries:
+                    raise
+            self.logger.warning('Retrying %s %s after attempt %s failed', method, url, attempt + 1)
+            time.sleep(self.get_backoff_seconds(attempt))
+
+    def __attempt(self, limiter: HostLimiter, method: str, url: str,
+                  **kwargs) -> requests.Response:
+        limiter.acquire()
+        started = time.perf_counter()
+        congested = True
+        status = None
+        try:
+            response = self.__send(method, url, **kwargs)
+            congested = self.is_congested(response)
+            status = response.status_code
+            return response
+        finally:
+            seconds = time.perf_counter() - started
+            limiter.release(seconds, congested)
+            if HttpClient.metrics is not None:
+                HttpClient.metrics.observe_http(limiter.netloc, method, status, seconds)
+
+    def __send(self, method: str, url: str, **kwargs) -> requests.Response:
+        cassette = HttpClient.cassette
+        if cassette is not None and cassette.replaying:
+            time.sleep(cassette.get_latency())
+            return cassette.to_response(cassette.replay(method, url, kwargs.get('data')))
+        response = self.get_session().request(method, url, **kwargs)
+        if cassette is not None:
+            cassette.record(method, url, kwargs.get('data'), response.status_code,
+                            response.headers.get('Content-Type', ''), response.text)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        '''Makes a GET request with the shared session.'''
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        '''Makes a POST request with the shared session.'''
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        '''Makes a PUT request with the shared session.'''
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        '''Makes a DELETE request with the shared session.'''
+        return self.request('DELETE', url, **kwargs)
@@ -0,0 +1,278 @@
+'''Per-host rate limiting with an adaptive concurrency window.'''
+
+import asyncio
+import threading
+import time
+
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class TokenBucket:
+    '''
+    A class used to cap the rate of requests to a remote host.  Tokens refill at `rate` per
+    second up to `burst`, and every request takes one.  A request that finds the bucket empty
+    still takes its token and is told how long to wait, so waiting requests keep their order.
+
+    ...
+
+    Parameters
+    ----------
+    rate : float | None
+        The number of requests per second, or None for no limit
+    burst : int
+        The max number of requests that can be made at once after an idle period
+
+    Methods
+    -------
+    reserve()
+        Takes a token and gets how long to wait before using it.
+    '''
+
+    def __init__(self, rate: float | None, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        '''
+        Takes a token and gets how long to wait before using it.
+
+        Returns:
+        - float: The number of seconds to wait before making the request.
+        '''
+        if not self.rate:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class AimdWindow:
+    '''
+    A class used to adapt the number of concurrent requests to a remote host, with additive
+    increase and multiplicative decrease.
+
+    The window doubles every round trip until the first sign of congestion, then grows by
+    about one request per round trip while latency stays within `latency_tolerance` of the
+    fastest recent latency.  A 429, 5xx or timeout cuts it by `decrease_factor`, at most once
+    per round trip, so a burst of failures from one overloaded moment only counts once.
+
+    ...
+
+    Parameters
+    ----------
+    max_limit : int
+        The max number of concurrent requests
+    min_limit : int
+        The min number of concurrent requests
+    initial_limit : int
+        The number of concurrent requests to start with
+    decrease_factor : float
+        The factor the window is multiplied by on congestion
+    latency_tolerance : float
+        How many times the fastest recent latency the smoothed latency may reach and still grow
+
+    Attributes
+    ----------
+    limit : float
+        the current number of concurrent requests allowed, rounded down when used
+
+    Methods
+    -------
+    on_success(latency=float)
+        Records a healthy response and grows the window if latency allows it.
+    on_congestion()
+        Records a throttled, failed or timed out request and shrinks the window.
+    '''
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial_limit: int = 4,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(max(self.min_limit, min(initial_limit, max_limit)))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.slow_start = True
+        self.last_decrease = 0.0
+        self.min_latency: float | None = None
+        self.avg_latency: float | None = None
+
+    @property
+    def slots(self) -> int:
+        '''The current number of concurrent requests allowed.'''
+        return int(self.limit)
+
+    def on_success(self, latency: float):
+        '''
+        Records a healthy response and grows the window if latency allows it.
+
+        Parameters:
+        - latency (float): The number of seconds the request took.
+        '''
+        # ? the baseline drifts up slowly, so one lucky response does not stall growth for good
+        self.min_latency = latency if self.min_latency is None \
+            else min(latency, self.min_latency * 1.01)
+        self.avg_latency = latency if self.avg_latency is None \
+            else 0.8 * self.avg_latency + 0.2 * latency
+        if self.avg_latency > self.latency_tolerance * self.min_latency:
+            return
+        growth = 1 if self.slow_start else 1 / self.limit
+        self.limit = min(self.max_limit, self.limit + growth)
+
+    def on_congestion(self) -> bool:
+        '''
+        Records a throttled, failed or timed out request and shrinks the window.
+
+        Returns:
+        - bool: True if the window was shrunk, False if it already was this round trip.
+        '''
+        now = time.monotonic()
+        if now - self.last_decrease < (self.avg_latency or 0):
+            return False
+        self.slow_start = False
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        return True
+
+class HostLimiter:
+    '''
+    A class used to limit the requests to a single remote host from threads, with a token
+    bucket for the rate and an adaptive window for the concurrency.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    netloc : str
+        The remote host name, for logging
+    rate : float | None
+        The max number of requests per second, or None for no limit
+    max_limit : int
+        The max number of concurrent requests
+    adaptive : bool
+        Whether the concurrency adapts to the host, otherwise it stays at max_limit, ex: for
+        hosts that are not scraped
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    bucket : TokenBucket
+        the rate limit of the host
+    window : AimdWindow
+        the adaptive concurrency limit of the host
+    in_flight : int
+        the number of requests currently being made
+
+    Methods
+    -------
+    acquire()
+        Blocks until a request can be made.
+    release(latency=float, congested=bool)
+        Records the outcome of a request and frees its slot.
+    '''
+
+    def __init__(self, host: HostEnum, netloc: str, rate: float | None, max_limit: int,
+                 adaptive: bool = True):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.netloc = netloc
+        self.bucket = TokenBucket(rate, max_limit)
+        self.window = get_window(max_limit, adaptive)
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        '''Blocks until the window has a free slot and the token bucket allows a request.'''
+        with self.condition:
+            self.condition.wait_for(lambda: self.in_flight < self.window.slots)
+            self.in_flight += 1
+        wait = self.bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, latency: float, congested: bool):
+        '''
+        Records the outcome of a request and frees its slot.
+
+        Parameters:
+        - latency (float): The number of seconds the request took.
+        - congested (bool): Whether the request was throttled, failed or timed out.
+        '''
+        with self.condition:
+            self.in_flight -= 1
+            record_outcome(self, latency, congested)
+            self.condition.notify_all()
+
+class AsyncHostLimiter:
+    '''
+    A class used to limit the requests to a single remote host from an event loop.
+    Mirrors `HostLimiter`, and must be created inside the event loop.
+    '''
+
+    def __init__(self, host: HostEnum, netloc: str, rate: float | None, max_limit: int,
+                 adaptive: bool = True):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.netloc = netloc
+        self.bucket = TokenBucket(rate, max_limit)
+        self.window = get_window(max_limit, adaptive)
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        '''Waits until the window has a free slot and the token bucket allows a request.'''
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.window.slots)
+            self.in_flight += 1
+        wait = self.bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def release(self, latency: float, congested: bool):
+        '''
+        Records the outcome of a request and frees its slot.
+
+        Parameters:
+        - latency (float): The number of seconds the request took.
+        - congested (bool): Whether the request was throttled, failed or timed out.
+        '''
+        async with self.condition:
+            self.in_flight -= 1
+            record_outcome(self, latency, congested)
+            self.condition.notify_all()
+
+def get_window(max_limit: int, adaptive: bool) -> AimdWindow:
+    '''
+    Gets the concurrency window of a limiter.
+
+    Parameters:
+    - max_limit (int): The max number of concurrent requests.
+    - adaptive (bool): Whether the window adapts to the host, otherwise it is held at
+    max_limit.
+
+    Returns:
+    - AimdWindow: The window, starting small if adaptive.
+    '''
+    if not adaptive:
+        return AimdWindow(max_limit, min_limit=max_limit, initial_limit=max_limit)
+    return AimdWindow(max_limit)
+
+def record_outcome(limiter: HostLimiter | AsyncHostLimiter, latency: float, congested: bool):
+    '''
+    Adapts the window of the given limiter to the outcome of a request.
+
+    Parameters:
+    - limiter (HostLimiter | AsyncHostLimiter): The limiter of the requested host.
+    - latency (float): The number of seconds the request took.
+    - congested (bool): Whether the request was throttled, failed or timed out.
+    '''
+    if not congested:
+        limiter.window.on_success(latency)
+    elif limiter.window.on_congestion():
+        limiter.logger.warning('Backing off %s to %s concurrent requests',
+                               limiter.netloc, limiter.window.slots)
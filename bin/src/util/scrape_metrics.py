@@ -0,0 +1,357 @@
+'''Module to instrument scrape runs with stage timings, http latencies and throughput.'''
+
+from contextlib import contextmanager
+from datetime import datetime
+import threading
+import time
+
+from src.enums.file_path_enum import FilePathEnum
+from src.enums.host_enum import HostEnum
+from src.util.local_dao import LocalDAO
+from src.util.manga_logger import MangaLogger
+
+# upper bounds in seconds of the latency buckets, the last bucket is +Inf
+LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+class Histogram:
+    '''
+    A class used to count observed durations in fixed latency buckets.
+
+    ...
+
+    Attributes
+    ----------
+    buckets : list[int]
+        the number of observations per bucket of `LATENCY_BUCKETS`, then the +Inf bucket
+    count : int
+        the number of observations
+    total : float
+        the sum of the observations in seconds
+    max : float
+        the longest observation in seconds
+
+    Methods
+    -------
+    observe(seconds=float)
+        Records a duration.
+    to_dict()
+        Gets the histogram as a json serializable dict.
+    '''
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        '''Records a duration.'''
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> dict:
+        '''Gets the histogram as a json serializable dict.'''
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'mean_seconds': round(self.total / self.count, 6) if self.count > 0 else None,
+            'max_seconds': round(self.max, 6),
+            'buckets': {
+                str(bound): count
+                for bound, count in zip([*LATENCY_BUCKETS, '+Inf'], self.buckets)
+            }
+        }
+
+class ScrapeMetrics:
+    '''
+    A class used to instrument a scrape run.  Records the time spent per stage, the latency
+    of every http request per remote host and verb, the items and listing pages completed,
+    and the records created, updated, skipped, left unchanged, recorded to a change set and
+    failed per item type.  At the end of the run `save` writes a json summary and a Prometheus
+    text format file.
+
+    Thread safe, every recording method may be called from any worker.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    stages : dict[str, Histogram]
+        the durations per stage, ex: 'batch_1'
+    http : dict[tuple[str, str], Histogram]
+        the request latencies per (remote host, verb)
+    http_statuses : dict[tuple[str, str, str], int]
+        the number of responses per (remote host, verb, status), 'error' when none came back
+    records : dict[tuple[str, str], int]
+        the number of records per (item type, 'created' | 'updated' | 'skipped' |
+        'unchanged' | 'recorded' | 'failed')
+
+    Methods
+    -------
+    start()
+        Resets the metrics and starts the run clock.
+    time_stage(stage=str)
+        Context manager recording the duration of a stage.
+    observe_http(netloc=str, method=str, status=int | None, seconds=float)
+        Records the latency of an http request.
+    count_record(item_type=str, outcome=str)
+        Counts a record created, updated, skipped, left unchanged, recorded or failed.
+    count_item()
+        Counts an item completed.
+    count_page()
+        Counts a listing page fetched.
+    get_summary()
+        Gets the metrics of the run as a json serializable dict.
+    get_prometheus()
+        Gets the metrics of the run in the Prometheus text format.
+    save()
+        Writes the json summary and the Prometheus text format file of the run.
+    '''
+
+    def __init__(self, host: HostEnum):
+        self.logger = MangaLogger(host).register_logger(__name__)
+        self.local_dao = LocalDAO(host)
+        self.summary_path = FilePathEnum.SCRAPE_METRICS.value[host.value]
+        self.prometheus_path = FilePathEnum.SCRAPE_METRICS_PROM.value[host.value]
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        '''Resets the metrics and starts the run clock.'''
+        with self.lock:
+            self.started_at = datetime.now()
+            self.started = time.perf_counter()
+            self.stages: dict[str, Histogram] = {}
+            self.http: dict[tuple[str, str], Histogram] = {}
+            self.http_statuses: dict[tuple[str, str, str], int] = {}
+            self.records: dict[tuple[str, str], int] = {}
+            self.items = 0
+            self.pages = 0
+
+    @contextmanager
+    def time_stage(self, stage: str):
+        '''
+        Context manager recording the duration of a stage, even if it raises.
+
+        Parameters:
+        - stage (str): The name of the stage, ex: 'batch_1'.
+        '''
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            with self.lock:
+                self.stages.setdefault(stage, Histogram()).observe(seconds)
+
+    def observe_http(self, netloc: str, method: str, status: int | None, seconds: float):
+        '''
+        Records the latency of an http request.
+
+        Parameters:
+        - netloc (str): The remote host of the request.
+        - method (str): The http verb of the request.
+        - status (int | None): The status of the response, None if the request failed.
+        - seconds (float): The number of seconds the request took.
+        '''
+        status_key = str(status) if status is not None else 'error'
+        with self.lock:
+            self.http.setdefault((netloc, method), Histogram()).observe(seconds)
+            key = (netloc, method, status_key)
+            self.http_statuses[key] = self.http_statuses.get(key, 0) + 1
+
+    def count_record(self, item_type: str, outcome: str):
+        '''
+        Counts a record created, updated, skipped, left unchanged, recorded or failed.  A record
+        is unchanged when its write was not sent since it would not change anything, and
+        recorded when a dry run wrote it to a change set instead of sending it.
+
+        Parameters:
+        - item_type (str): The type of the record, ex: 'volume'.
+        - outcome (str): Either 'created', 'updated', 'skipped', 'unchanged', 'recorded' or
+        'failed'.
+        '''
+        with self.lock:
+            self.records[(item_type, outcome)] = self.records.get((item_type, outcome), 0) + 1
+
+    def count_item(self):
+        '''Counts an item completed.'''
+        with self.lock:
+            self.items += 1
+
+    def count_page(self):
+        '''Counts a listing page fetched.'''
+        with self.lock:
+            self.pages += 1
+
+    def get_summary(self) -> dict:
+        '''
+        Gets the metrics of the run as a json serializable dict.
+
+        Returns:
+        - dict: The summary of the run.
+        '''
+        with self.lock:
+            elapsed = time.perf_counter() - self.started
+            records = {}
+            for (item_type, outcome), count in sorted(self.records.items()):
+                records.setdefault(item_type, {})[outcome] = count
+            return {
+                'started_at': str(self.started_at),
+                'elapsed_seconds': round(elapsed, 3),
+                'items': self.items,
+                'pages': self.pages,
+                'items_per_second': round(self.items / elapsed, 3) if elapsed > 0 else None,
+                'pages_per_second': round(self.pages / elapsed, 3) if elapsed > 0 else None,
+                'stages': { stage: hist.to_dict() for stage, hist in sorted(self.stages.items()) },
+                'http': [
+                    {
+                        'host': netloc,
+                        'method': method,
+                        'statuses': {
+                            status: count
+                            for (s_netloc, s_method, status), count
+                            in sorted(self.http_statuses.items())
+                            if s_netloc == netloc and s_method == method
+                        },
+                        **hist.to_dict()
+                    }
+                    for (netloc, method), hist in sorted(self.http.items())
+                ],
+                'records': records
+            }
+
+    def get_prometheus(self) -> str:
+        '''
+        Gets the metrics of the run in the Prometheus text format.
+
+        Returns:
+        - str: The metrics, one sample per line.
+        '''
+        summary = self.get_summary()
+        lines = []
+        with self.lock:
+            lines += prometheus_histogram(
+                'manga_scraper_stage_seconds', 'Time spent per scrape stage.',
+                { (('stage', stage),): hist for stage, hist in sorted(self.stages.items()) }
+            )
+            lines += prometheus_histogram(
+                'manga_scraper_http_request_seconds', 'Latency of http requests.',
+                {
+                    (('host', netloc), ('method', method)): hist
+                    for (netloc, method), hist in sorted(self.http.items())
+                }
+            )
+            lines += prometheus_counter(
+                'manga_scraper_http_requests_total', 'Http requests by response status.',
+                {
+                    (('host', netloc), ('method', method), ('status', status)): count
+                    for (netloc, method, status), count in sorted(self.http_statuses.items())
+                }
+            )
+            lines += prometheus_counter(
+                'manga_scraper_records_total',
+                'Records created, updated, skipped, unchanged, recorded or failed.',
+                {
+                    (('item_type', item_type), ('outcome', outcome)): count
+                    for (item_type, outcome), count in sorted(self.records.items())
+                }
+            )
+        lines += prometheus_counter('manga_scraper_items_total', 'Items completed.',
+                                    { (): summary['items'] })
+        lines += prometheus_counter('manga_scraper_pages_total', 'Listing pages fetched.',
+                                    { (): summary['pages'] })
+        for name, key, help_text in [
+            ('manga_scraper_items_per_second', 'items_per_second', 'Items completed per second.'),
+            ('manga_scraper_pages_per_second', 'pages_per_second', 'Listing pages per second.'),
+            ('manga_scraper_run_seconds', 'elapsed_seconds', 'Duration of the run.')
+        ]:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge',
+                      f'{name} {summary[key] or 0}']
+        return '\n'.join(lines) + '\n'
+
+    def save(self):
+        '''Writes the json summary and the Prometheus text format file of the run.'''
+        summary = self.get_summary()
+        self.local_dao.save_file(self.summary_path, summary)
+        with open(self.prometheus_path, 'w', encoding='UTF-8') as prometheus_file:
+            prometheus_file.write(self.get_prometheus())
+        self.logger.info('Scraped %s items (%s/s) and %s pages (%s/s) in %s seconds',
+                         summary['items'], summary['items_per_second'], summary['pages'],
+                         summary['pages_per_second'], summary['elapsed_seconds'])
+        self.logger.info('Avoided %s writes of unchanged records', sum(
+            outcomes.get('unchanged', 0) for outcomes in summary['records'].values()
+        ))
+        for stage, stage_summary in summary['stages'].items():
+            self.logger.info('Stage %s: %s calls, %s seconds mean', stage,
+                             stage_summary['count'], stage_summary['mean_seconds'])
+
+def format_labels(labels: tuple, extra: tuple = ()) -> str:
+    '''
+    Formats Prometheus labels, ex: {host="localhost:4000",method="GET"}.
+
+    Parameters:
+    - labels (tuple): The (name, value) pairs of the labels.
+    - extra (tuple): More (name, value) pairs to add after them.
+
+    Returns:
+    - str: The formatted labels, empty if there are none.
+    '''
+    pairs = [*labels, *extra]
+    if len(pairs) == 0:
+        return ''
+    escaped = [
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in pairs
+    ]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+def prometheus_histogram(name: str, help_text: str, series: dict[tuple, Histogram]) -> list[str]:
+    '''
+    Formats histograms in the Prometheus text format, with cumulative buckets.
+
+    Parameters:
+    - name (str): The metric name.
+    - help_text (str): The metric description.
+    - series (dict[tuple, Histogram]): The histogram per labels.
+
+    Returns:
+    - list[str]: The lines of the metric.
+    '''
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, hist in series.items():
+        cumulative = 0
+        for bound, count in zip([*LATENCY_BUCKETS, '+Inf'], hist.buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels(labels, (("le", bound),))} {cumulative}')
+        lines.append(f'{name}_sum{format_labels(labels)} {hist.total}')
+        lines.append(f'{name}_count{format_labels(labels)} {hist.count}')
+    return lines
+
+def prometheus_counter(name: str, help_text: str, series: dict[tuple, int]) -> list[str]:
+    '''
+    Formats counters in the Prometheus text format.
+
+    Parameters:
+    - name (str): The metric name.
+    - help_text (str): The metric description.
+    - series (dict[tuple, int]): The count per labels.
+
+    Returns:
+    - list[str]: The lines of the metric.
+    '''
+    return [
+        f'# HELP {name} {help_text}', f'# TYPE {name} counter',
+        *[f'{name}{format_labels(labels)} {count}' for labels, count in series.items()]
+    ]
@@ -0,0 +1,114 @@
+'''Single-flight deduplication of concurrent calls for the same key.'''
+
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable
+
+class SingleFlight:
+    '''
+    A class used to make concurrent calls for the same key from threads share a single
+    call.  The first caller for a key makes the call, and the callers arriving while it is
+    in flight wait for it and get a copy of its result, or its error.  Once the call is done
+    the key is forgotten, so later callers make a new call.
+
+    ...
+
+    Attributes
+    ----------
+    calls : dict[Any, dict]
+        the calls in flight per key, with their result or error once done
+    joined : int
+        the number of callers that shared a call in flight instead of making their own
+
+    Methods
+    -------
+    do(key=Any, call=Callable)
+        Makes the call for the key, or waits for the one in flight.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: dict[Any, dict] = {}
+        self.joined = 0
+
+    def do(self, key, call: Callable[[], Any]):
+        '''
+        Makes the call for the key, or waits for the one in flight and shares its outcome.
+
+        Parameters:
+        - key (Any): The key of the call, hashable.
+        - call (Callable[[], Any]): Makes the call.
+
+        Returns:
+        - Any: The result of the call, a copy of it for the callers that waited.
+
+        Raises:
+        - Exception: The call raised.
+        '''
+        with self.lock:
+            in_flight = self.calls.get(key)
+            if in_flight is None:
+                in_flight = { 'done': threading.Event(), 'result': None, 'error': None }
+                self.calls[key] = in_flight
+                leader = True
+            else:
+                self.joined += 1
+                leader = False
+
+        if not leader:
+            in_flight['done'].wait()
+            if in_flight['error'] is not None:
+                raise in_flight['error']
+            return copy.deepcopy(in_flight['result'])
+
+        try:
+            result = call()
+            # ? copied before the caller can change it, the waiting callers copy it again
+            in_flight['result'] = copy.deepcopy(result)
+            return result
+        except Exception as e:
+            in_flight['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            in_flight['done'].set()
+
+class AsyncSingleFlight:
+    '''
+    A class used to make concurrent calls for the same key from an event loop share a single
+    call.  Mirrors `SingleFlight`, except that when the caller making the call is cancelled,
+    the callers waiting for it make the call again instead of being cancelled with it.
+    '''
+
+    def __init__(self):
+        self.calls: dict[Any, asyncio.Future] = {}
+        self.joined = 0
+
+    async def do(self, key, call: Callable[[], Awaitable[Any]]):
+        '''Makes the call for the key, or waits for the one in flight, see `SingleFlight.do`.'''
+        while (in_flight := self.calls.get(key)) is not None:
+            self.joined += 1
+            # ? asyncio.wait never cancels what it waits for, and only raises if this caller
+            # ? is cancelled, so a cancelled call can be told apart and made again
+            await asyncio.wait([in_flight])
+            if not in_flight.cancelled():
+                return copy.deepcopy(in_flight.result())
+
+        in_flight = asyncio.get_running_loop().create_future()
+        self.calls[key] = in_flight
+        try:
+            result = await call()
+            in_flight.set_result(copy.deepcopy(result))
+            return result
+        except asyncio.CancelledError:
+            in_flight.cancel()
+            raise
+        except Exception as e:
+            in_flight.set_exception(e)
+            # ? marks the error as retrieved when no caller was waiting for it
+            in_flight.exception()
+            raise
+        finally:
+            del self.calls[key]
@@ -0,0 +1,205 @@
+'''Module to cache values between runs in a local SQLite file, with the recent ones in memory.'''
+
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable
+
+from src.enums.host_enum import HostEnum
+from src.util.manga_logger import MangaLogger
+
+class SqliteCache:
+    '''
+    A class used to cache values by key between runs, for the caches of the crawls.
+
+    Values are persisted in a table of a local SQLite file, encoded with `encode` and decoded
+    with `decode`, and the most recently used ones are also held in memory, up to
+    `max_entries`, the least recently used being evicted first.  A value older than
+    `get_ttl_seconds` of it is expired, and read as not cached.  Every read decodes the value
+    again, so callers may change it without changing the cache.
+
+    Thread safe, and the SQLite file is opened on first use.
+
+    ...
+
+    Parameters
+    ----------
+    host : HostEnum
+        The the host machine to know where to access data for logging
+    file_path : str
+        The path of the SQLite file
+    table : str
+        The table of the SQLite file the values are kept in
+    name : str
+        The name of the cache in the logs
+    max_entries : int
+        The number of values held in memory
+    ttl_seconds : float
+        The number of seconds a value is fresh for, unless `get_ttl_seconds` is overridden
+    encode : Callable[[Any], str]
+        Encodes a value to store it
+    decode : Callable[[str], Any]
+        Decodes a stored value
+
+    Attributes
+    ----------
+    logger : MangaLogger
+        a logging utility for info, warning, and error logs
+    entries : OrderedDict[str, tuple[float, str]]
+        the time every value held in memory was cached at and its encoding, least recently
+        used first
+    counts : dict[str, int]
+        the number of reads per outcome, either 'memory_hit', 'disk_hit', 'expired' or 'miss'
+
+    Methods
+    -------
+    get_entry(key=str)
+        Gets a fresh value.
+    put_entry(key=str, value=Any)
+        Caches a value.
+    get_values()
+        Gets every cached value.
+    get_ttl_seconds(value=Any)
+        Gets the number of seconds a value is fresh for.
+    report()
+        Logs the reads per outcome.
+    close()
+        Closes the SQLite file.
+    '''
+
+    def __init__(self, host: HostEnum, file_path: str, table: str, name: str,
+                 max_entries: int, ttl_seconds: float,
+                 encode: Callable[[Any], str] = json.dumps,
+                 decode: Callable[[str], Any] = json.loads):
+        # ? logged under the module of the cache, ex: src.manga.series_cache
+        self.logger = MangaLogger(host).register_logger(type(self).__module__)
+        self.file_path = file_path
+        self.table = table
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.encode = encode
+        self.decode = decode
+        self.lock = threading.Lock()
+        self.connection: sqlite3.Connection | None = None
+        self.entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.counts = dict.fromkeys(['memory_hit', 'disk_hit', 'expired', 'miss'], 0)
+
+    def get_entry(self, key: str) -> tuple[bool, Any]:
+        '''
+        Gets a fresh value, from memory or else from the SQLite file.
+
+        Parameters:
+        - key (str): The key of the value.
+
+        Returns:
+        - tuple[bool, Any]: Whether a fresh value is cached, and the value decoded, or None if
+        it is not cached or has expired.
+        '''
+        with self.lock:
+            entry = self.entries.get(key)
+            outcome = 'memory_hit'
+            if entry is not None:
+                self.entries.move_to_end(key)
+            else:
+                row = self.__get_connection().execute(
+                    f'SELECT cached_at, value FROM {self.table} WHERE key = ?', (key,)
+                ).fetchone()
+                entry = (row[0], row[1]) if row is not None else None
+                outcome = 'disk_hit'
+            value = self.decode(entry[1]) if entry is not None else None
+            if entry is None:
+                outcome = 'miss'
+            elif time.time() - entry[0] >= self.get_ttl_seconds(value):
+                self.entries.pop(key, None)
+                outcome = 'expired'
+            elif outcome == 'disk_hit':
+                self.__hold(key, entry)
+            self.counts[outcome] += 1
+        if outcome in ('miss', 'expired'):
+            return False, None
+        return True, value
+
+    def put_entry(self, key: str, value: Any):
+        '''
+        Caches a value, made now.
+
+        Parameters:
+        - key (str): The key of the value.
+        - value (Any): The value.
+        '''
+        entry = (time.time(), self.encode(value))
+        with self.lock:
+            connection = self.__get_connection()
+            connection.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, cached_at, value) VALUES (?, ?, ?)',
+                (key, *entry)
+            )
+            connection.commit()
+            self.__hold(key, entry)
+
+    def get_values(self) -> list:
+        '''
+        Gets every cached value, fresh or expired, without counting the reads.
+
+        Returns:
+        - list: The values decoded.
+        '''
+        with self.lock:
+            rows = self.__get_connection().execute(f'SELECT value FROM {self.table}').fetchall()
+        return [self.decode(row[0]) for row in rows]
+
+    def get_ttl_seconds(self, value: Any) -> float:
+        '''
+        Gets the number of seconds a value is fresh for.
+
+        Parameters:
+        - value (Any): The value decoded.
+
+        Returns:
+        - float: `ttl_seconds`, for every value unless overridden.
+        '''
+        return self.ttl_seconds
+
+    def report(self) -> dict[str, int]:
+        '''
+        Logs the reads per outcome.
+
+        Returns:
+        - dict[str, int]: The number of reads per outcome.
+        '''
+        with self.lock:
+            counts = dict(self.counts)
+        self.logger.info('%s: %s reads, %s memory hits, %s disk hits, %s expired, %s misses',
+                         self.name, str(sum(counts.values())), str(counts['memory_hit']),
+                         str(counts['disk_hit']), str(counts['expired']), str(counts['miss']))
+        return counts
+
+    def close(self):
+        '''Closes the SQLite file, it is opened again on next use.'''
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def __hold(self, key: str, entry: tuple[float, str]):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __get_connection(self) -> sqlite3.Connection:
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+            # ? the lock serializes every use, so the workers may share the connection
+            self.connection = sqlite3.connect(self.file_path, check_same_thread=False)
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ' +
+                '(key TEXT PRIMARY KEY, cached_at REAL NOT NULL, value TEXT)'
+            )
+            self.connection.commit()
+            self.logger.info('Opened %s at %s', self.name.lower(), self.file_path)
+        return self.connection
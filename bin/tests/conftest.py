@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    '''Runs every test from an empty directory, so logs and mock db files stay out of the repo.'''
+    os.makedirs(tmp_path / 'logs')
+    os.makedirs(tmp_path / 'db' / 'mocks')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
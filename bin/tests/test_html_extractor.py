@@ -0,0 +1,42 @@
+import glob
+import os
+
+import pytest
+
+from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.util.html_extractor import HtmlExtractor
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), '..', 'db', 'fixtures', 'html')
+
+def get_fixtures(page_type: PageTypeEnum) -> list[str]:
+    file_paths = sorted(glob.glob(os.path.join(FIXTURES_PATH, page_type.value + '-*.html')))
+    assert len(file_paths) > 0, f'no {page_type.value} fixture pages'
+    pages = []
+    for file_path in file_paths:
+        with open(file_path, 'r', encoding='UTF-8') as page_file:
+            pages.append(page_file.read())
+    return pages
+
+@pytest.mark.parametrize('page_type', list(HtmlExtractor.STRAINED_CLASSES))
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_strained_parse_keeps_the_blocks_the_scrapers_read(page_type, parser):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    full_extractor = HtmlExtractor(HostEnum.MOCK, parser, strained=False)
+    strained_extractor = HtmlExtractor(HostEnum.MOCK, parser, strained=True)
+    for html in get_fixtures(page_type):
+        full_soup = full_extractor.parse(html, page_type)
+        strained_soup = strained_extractor.parse(html, page_type)
+        for class_name in HtmlExtractor.STRAINED_CLASSES[page_type]:
+            blocks = [str(block) for block in full_soup.find_all('div', {'class': class_name})]
+            assert len(blocks) > 0
+            assert [
+                str(block) for block in strained_soup.find_all('div', {'class': class_name})
+            ] == blocks
+
+def test_listing_fixture_holds_a_full_page():
+    soup = HtmlExtractor(HostEnum.MOCK).parse(get_fixtures(PageTypeEnum.LISTING)[0],
+                                              PageTypeEnum.LISTING)
+    assert len(soup.find_all('div', {'class': 'product'})) == 100
+    assert soup.find('div', {'class': 'pagination-text'}).attrs['data-totalcount'] == '2412'
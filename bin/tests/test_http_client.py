@@ -0,0 +1,94 @@
+import pytest
+import requests
+
+from src.enums.host_enum import HostEnum
+from src.util.http_client import HttpClient
+
+URL = 'https://store.crunchyroll.com/search'
+
+class FakeResponse:
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+    def close(self):
+        pass
+
+class FakeSession:
+    '''Answers with the given outcomes in turn, raising the ones that are exceptions.'''
+
+    def __init__(self, outcomes: list):
+        self.outcomes = list(outcomes)
+        self.requests: list[tuple[str, str]] = []
+
+    def request(self, method: str, url: str, **kwargs):
+        self.requests.append((method, url))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+@pytest.fixture
+def releases(monkeypatch) -> list[tuple[float, bool]]:
+    '''Records the latency and congestion every attempt releases its limiter with.'''
+    monkeypatch.setattr(HttpClient, '_limiters', {})
+    monkeypatch.setattr(HttpClient, 'cassette', None)
+    monkeypatch.setattr(HttpClient, 'metrics', None)
+    monkeypatch.setattr(HttpClient, 'get_backoff_seconds',
+                        classmethod(lambda cls, attempt: 0.2))
+    released = []
+    limiter = HttpClient(HostEnum.MOCK).get_limiter(URL)
+    release = limiter.release
+
+    def record_release(latency: float, congested: bool):
+        released.append((latency, congested))
+        release(latency, congested)
+
+    monkeypatch.setattr(limiter, 'release', record_release)
+    return released
+
+def use_session(monkeypatch, outcomes: list) -> FakeSession:
+    session = FakeSession(outcomes)
+    monkeypatch.setattr(HttpClient, '_session', session)
+    return session
+
+def test_request_times_every_attempt_without_the_backoff(monkeypatch, releases):
+    session = use_session(monkeypatch, [503, requests.exceptions.ConnectionError(), 200])
+
+    response = HttpClient(HostEnum.MOCK).get(URL)
+
+    assert response.status_code == 200
+    assert len(session.requests) == 3
+    assert [congested for _, congested in releases] == [True, True, False]
+    assert all(latency < 0.1 for latency, _ in releases)
+    limiter = HttpClient(HostEnum.MOCK).get_limiter(URL)
+    assert limiter.in_flight == 0
+    assert limiter.window.avg_latency < 0.1
+
+def test_request_returns_the_last_response_after_all_retries(monkeypatch, releases):
+    monkeypatch.setattr(HttpClient, 'RETRIES', 1)
+    session = use_session(monkeypatch, [503, 503])
+
+    response = HttpClient(HostEnum.MOCK).get(URL)
+
+    assert response.status_code == 503
+    assert len(session.requests) == 2
+    assert [congested for _, congested in releases] == [True, True]
+
+def test_request_raises_after_all_retries(monkeypatch, releases):
+    monkeypatch.setattr(HttpClient, 'RETRIES', 1)
+    use_session(monkeypatch, [requests.exceptions.Timeout(), requests.exceptions.Timeout()])
+
+    with pytest.raises(requests.exceptions.Timeout):
+        HttpClient(HostEnum.MOCK).get(URL)
+
+    assert [congested for _, congested in releases] == [True, True]
+
+def test_request_does_not_retry_a_post(monkeypatch, releases):
+    session = use_session(monkeypatch, [503])
+
+    response = HttpClient(HostEnum.MOCK).post(URL)
+
+    assert response.status_code == 503
+    assert len(session.requests) == 1
+    assert releases[0][1] is True
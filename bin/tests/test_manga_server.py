@@ -0,0 +1,298 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.database.async_manga_server import AsyncMangaServer
+from src.database.manga_server import MangaServer, MangaServerError
+from src.database.server_index import ServerIndex
+from src.database.write_buffer import WriteBuffer
+from src.enums.host_enum import HostEnum
+
+class FakeResponse:
+
+    def __init__(self, status_code: int, body: dict | None = None):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+class FakeMangaServer:
+    '''Answers the bulk requests sent to it, failing the first `failures` per item type.'''
+
+    def __init__(self, failures: int = 0, rejected: set[str] | None = None):
+        self.failures = failures
+        self.rejected = rejected or set()
+        self.requests: list[tuple[str, list[dict]]] = []
+        self.threads: list[threading.Thread] = []
+
+    def request(self, method: str, url: str, **kwargs):
+        self.threads.append(threading.current_thread())
+        item_type = url.split('/')[-2]
+        writes = kwargs['json']['writes']
+        self.requests.append((item_type, writes))
+        if len([sent for sent, _ in self.requests if sent == item_type]) <= self.failures:
+            return FakeResponse(503)
+        return FakeResponse(200, { 'results': [
+            { 'id': write['id'], 'action': write['action'],
+              'status': 'error' if write['id'] in self.rejected else 'ok' }
+            for write in writes
+        ] })
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr('src.database.manga_server.time.sleep', lambda seconds: None)
+
+def get_manga_server(fake_server: FakeMangaServer, write_buffer: WriteBuffer | None = None,
+                     server_index: ServerIndex | None = None) -> MangaServer:
+    manga_server = MangaServer(HostEnum.MOCK, write_buffer=write_buffer,
+                               server_index=server_index)
+    manga_server.http_client.request = fake_server.request
+    return manga_server
+
+def test_bulk_write_sends_every_write_in_one_request():
+    fake_server = FakeMangaServer()
+    writes = [
+        { 'action': WriteBuffer.CREATE, 'id': '1', 'item': { 'isbn': '1' } },
+        { 'action': WriteBuffer.UPDATE, 'id': '2', 'item': { 'retail_price': 9.99 } }
+    ]
+    results = get_manga_server(fake_server).bulk_write('market', writes)
+    assert fake_server.requests == [('market', writes)]
+    assert results == [
+        { 'id': '1', 'action': WriteBuffer.CREATE, 'status': 'ok' },
+        { 'id': '2', 'action': WriteBuffer.UPDATE, 'status': 'ok' }
+    ]
+
+def test_bulk_write_retries_batches_without_creates():
+    fake_server = FakeMangaServer(failures=2)
+    writes = [
+        { 'action': WriteBuffer.UPDATE, 'id': '1', 'item': { 'retail_price': 9.99 } },
+        { 'action': WriteBuffer.UPSERT, 'id': '2', 'item': { 'retail_price': 12.99 } }
+    ]
+    results = get_manga_server(fake_server).bulk_write('market', writes)
+    assert len(fake_server.requests) == 3
+    assert [result['status'] for result in results] == ['ok', 'ok']
+
+def test_bulk_write_does_not_retry_batches_with_creates():
+    fake_server = FakeMangaServer(failures=1)
+    writes = [
+        { 'action': WriteBuffer.UPDATE, 'id': '1', 'item': { 'retail_price': 9.99 } },
+        { 'action': WriteBuffer.CREATE, 'id': '2', 'item': { 'isbn': '2' } }
+    ]
+    with pytest.raises(MangaServerError):
+        get_manga_server(fake_server).bulk_write('market', writes)
+    assert len(fake_server.requests) == 1
+
+def test_flush_writes_retries_only_the_batches_without_creates():
+    fake_server = FakeMangaServer(failures=1)
+    write_buffer = WriteBuffer(HostEnum.MOCK)
+    manga_server = get_manga_server(fake_server, write_buffer)
+    write_buffer.add('series', 's1', WriteBuffer.UPDATE, { 'status': 'Complete' })
+    write_buffer.add('volume', 'v1', WriteBuffer.CREATE, { 'isbn': 'v1' })
+
+    manga_server.flush_writes()
+    assert [item_type for item_type, _ in fake_server.requests] == ['series', 'series', 'volume']
+    assert write_buffer.get_pending('series', 's1') is None
+    # ? the create is kept for the next flush instead of being sent twice
+    assert write_buffer.get_pending('volume', 'v1')['action'] == WriteBuffer.CREATE
+
+    manga_server.flush_writes()
+    assert [item_type for item_type, _ in fake_server.requests][3:] == ['volume']
+    assert write_buffer.get_pending('volume', 'v1') is None
+    assert write_buffer.report() == []
+
+def test_write_buffer_tracks_the_writes_of_each_owner():
+    fake_server = FakeMangaServer(rejected={ 's1' })
+    write_buffer = WriteBuffer(HostEnum.MOCK)
+    manga_server = get_manga_server(fake_server, write_buffer)
+    write_buffer.add('volume', 'v1', WriteBuffer.UPSERT, { 'isbn': 'v1' }, ['v1'])
+    write_buffer.add('volume', 'v1', WriteBuffer.UPSERT, { 'volume': '1' }, ['v1'])
+    write_buffer.add('series', 's1', WriteBuffer.UPSERT, { 'volumes': ['v1', 'v2'] },
+                     ['v1', 'v2'])
+    batches = write_buffer.take_batches()
+    write_buffer.add('volume', 'v1', WriteBuffer.UPSERT, { 'volume': '2' }, ['v1'])
+    write_buffer.requeue(*batches[1])
+    assert write_buffer.is_saving('v1') and write_buffer.is_saving('v2')
+
+    write_buffer.finish_batch(*batches[0], [{ 'id': 's1', 'status': 'ok' }])
+    assert write_buffer.is_saving('v1') and not write_buffer.is_saving('v2')
+
+    manga_server.flush_writes()
+    assert not write_buffer.is_saving('v1')
+    assert not write_buffer.has_failed('v1') and not write_buffer.has_failed('v2')
+    # ? the owners of a write are never sent
+    assert 'owners' not in fake_server.requests[0][1][0]
+
+    write_buffer.add('series', 's1', WriteBuffer.UPSERT, { 'volumes': ['v3'] }, ['v3'])
+    manga_server.flush_writes()
+    assert write_buffer.has_failed('v3')
+    assert write_buffer.report()[0]['owners'] == ['v3']
+
+def test_request_reads_a_missing_record_as_none():
+    manga_server = MangaServer(HostEnum.MOCK)
+    manga_server.http_client.request = lambda method, url, **kwargs: FakeResponse(404)
+    assert manga_server.request('GET', f'{manga_server.url}/volume/missing') is None
+    assert manga_server.get_item('volume', 'missing') is None
+
+def test_request_raises_on_a_server_error():
+    manga_server = MangaServer(HostEnum.MOCK)
+    manga_server.http_client.request = lambda method, url, **kwargs: FakeResponse(503)
+    with pytest.raises(MangaServerError):
+        manga_server.request('GET', f'{manga_server.url}/volume/1')
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_flusher_sends_writes_once_due_without_further_writes():
+    fake_server = FakeMangaServer()
+    write_buffer = WriteBuffer(HostEnum.MOCK, max_records=100, max_seconds=0.1)
+    manga_server = get_manga_server(fake_server, write_buffer)
+    manga_server.start_flusher()
+    try:
+        manga_server.update_item('market', '1', { 'retail_price': 9.99 })
+        assert write_buffer.get_flush_delay() > 0
+        assert fake_server.requests == []
+        assert wait_for(lambda: len(fake_server.requests) == 1)
+        assert wait_for(lambda: write_buffer.get_pending('market', '1') is None)
+    finally:
+        manga_server.stop_flusher()
+    assert write_buffer.get_flush_delay() is None
+
+def test_flusher_sends_full_buffers_off_the_worker_adding_writes():
+    fake_server = FakeMangaServer()
+    write_buffer = WriteBuffer(HostEnum.MOCK, max_records=2, max_seconds=60)
+    manga_server = get_manga_server(fake_server, write_buffer)
+    manga_server.start_flusher()
+    try:
+        manga_server.update_item('market', '1', { 'retail_price': 9.99 })
+        manga_server.update_item('market', '2', { 'retail_price': 12.99 })
+        assert wait_for(lambda: len(fake_server.requests) == 1)
+    finally:
+        manga_server.stop_flusher()
+    assert [len(writes) for _, writes in fake_server.requests] == [2]
+    assert threading.current_thread() not in fake_server.threads
+
+def test_stopped_flusher_leaves_the_rest_to_flush_writes():
+    fake_server = FakeMangaServer()
+    write_buffer = WriteBuffer(HostEnum.MOCK, max_records=100, max_seconds=60)
+    manga_server = get_manga_server(fake_server, write_buffer)
+    manga_server.start_flusher()
+    manga_server.update_item('market', '1', { 'retail_price': 9.99 })
+    manga_server.stop_flusher()
+    assert fake_server.requests == []
+    manga_server.flush_writes()
+    assert len(fake_server.requests) == 1
+
+def test_async_flusher_sends_writes_once_due_without_further_writes():
+    write_buffer = WriteBuffer(HostEnum.MOCK, max_records=100, max_seconds=0.1)
+    async_manga_server = AsyncMangaServer(HostEnum.MOCK, None, write_buffer=write_buffer)
+    requests = []
+
+    async def request(method: str, url: str, **kwargs):
+        requests.append(kwargs['json']['writes'])
+        return { 'results': [
+            { 'id': write['id'], 'action': write['action'], 'status': 'ok' }
+            for write in kwargs['json']['writes']
+        ] }
+
+    async def run():
+        async_manga_server.request = request
+        async_manga_server.start_flusher()
+        try:
+            await async_manga_server.buffer_write('market', '1', WriteBuffer.UPDATE,
+                                                  { 'retail_price': 9.99 })
+            assert requests == []
+            await asyncio.sleep(0.3)
+        finally:
+            await async_manga_server.stop_flusher()
+
+    asyncio.run(run())
+    assert len(requests) == 1
+    assert write_buffer.get_pending('market', '1') is None
+
+@pytest.fixture
+def server_index():
+    server_index = ServerIndex(HostEnum.MOCK)
+    server_index.load('market', {
+        '1': { 'isbn': '1', 'retail_price': 9.99 },
+        '2': { 'isbn': '2', 'retail_price': 12.99 }
+    })
+    return server_index
+
+def test_buffered_writes_are_indexed_once_flushed(server_index):
+    fake_server = FakeMangaServer(rejected={ '2' })
+    write_buffer = WriteBuffer(HostEnum.MOCK)
+    manga_server = get_manga_server(fake_server, write_buffer, server_index)
+    manga_server.upsert_many('market', {
+        '1': { 'retail_price': 10.99 },
+        '2': { 'retail_price': 14.99 },
+        '3': { 'isbn': '3', 'retail_price': 7.99 }
+    })
+    assert server_index.get('market', '1') == (True, { 'isbn': '1', 'retail_price': 9.99 })
+    assert server_index.get('market', '3') == (True, None)
+    # ? reads still see the buffered writes
+    assert manga_server.get_item('market', '1') == { 'isbn': '1', 'retail_price': 10.99 }
+    assert manga_server.get_item('market', '3') == { 'isbn': '3', 'retail_price': 7.99 }
+
+    manga_server.flush_writes()
+    assert server_index.get('market', '1') == (True, { 'isbn': '1', 'retail_price': 10.99 })
+    assert server_index.get('market', '3') == (True, { 'isbn': '3', 'retail_price': 7.99 })
+    # ? the rejected write leaves the record as the manga server holds it
+    assert server_index.get('market', '2') == (True, { 'isbn': '2', 'retail_price': 12.99 })
+    assert manga_server.get_item('market', '2') == { 'isbn': '2', 'retail_price': 12.99 }
+
+def test_buffered_writes_are_not_indexed_while_the_manga_server_is_down(server_index):
+    fake_server = FakeMangaServer(failures=10)
+    write_buffer = WriteBuffer(HostEnum.MOCK)
+    manga_server = get_manga_server(fake_server, write_buffer, server_index)
+    manga_server.update_item('market', '1', { 'retail_price': 10.99 })
+    manga_server.flush_writes()
+    assert server_index.get('market', '1') == (True, { 'isbn': '1', 'retail_price': 9.99 })
+    assert write_buffer.get_pending('market', '1')['item'] == { 'retail_price': 10.99 }
+
+def test_upserts_are_compared_with_the_buffered_writes(server_index):
+    fake_server = FakeMangaServer()
+    write_buffer = WriteBuffer(HostEnum.MOCK)
+    manga_server = get_manga_server(fake_server, write_buffer, server_index)
+    manga_server.upsert_item('market', '1', { 'retail_price': 10.99 })
+    assert manga_server.get_changes('market', { '1': { 'retail_price': 10.99 } }) == {}
+    # ? writing the indexed price back must not be dropped, it undoes the buffered write
+    manga_server.upsert_item('market', '1', { 'retail_price': 9.99 })
+    manga_server.flush_writes()
+    assert fake_server.requests == [('market', [
+        { 'action': WriteBuffer.UPSERT, 'id': '1', 'item': { 'retail_price': 9.99 } }
+    ])]
+    assert server_index.get('market', '1') == (True, { 'isbn': '1', 'retail_price': 9.99 })
+
+def test_server_index_keeps_only_a_digest_of_the_large_fields():
+    server_index = ServerIndex(HostEnum.MOCK)
+    description = 'A long description. ' * 100
+    server_index.load('volume', {
+        '1': { 'isbn': '1', 'series_id': 's1', 'description': description,
+               'cover_images': ['a.jpg', 'b.jpg'], 'authors': None }
+    })
+    assert len(server_index.records['volume']['1']['description']) == 8
+    _, volume = server_index.get('volume', '1')
+    assert volume['series_id'] == 's1' and volume['description'] is None
+
+    assert server_index.diff('volume', '1', {
+        'description': description, 'cover_images': ['a.jpg', 'b.jpg'], 'authors': None
+    }) == {}
+    assert server_index.diff('volume', '1', { 'cover_images': ['b.jpg', 'a.jpg'] }) == {
+        'cover_images': ['b.jpg', 'a.jpg']
+    }
+    server_index.put('volume', '1', { 'description': 'Short.' })
+    assert server_index.diff('volume', '1', { 'description': 'Short.' }) == {}
+    assert server_index.diff('volume', '1', { 'description': description }, {
+        'description': description
+    }) == {}
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.enums.host_enum import HostEnum
+from src.util.async_http_client import AsyncHttpClient
+from src.util.http_client import HttpClient
+from src.util.rate_limiter import AimdWindow, AsyncHostLimiter, HostLimiter, TokenBucket
+
+class FakeClock:
+    '''Stands in for time.monotonic in the rate limiter, moved forward by hand.'''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr('src.util.rate_limiter.time.monotonic', fake_clock)
+    return fake_clock
+
+def test_token_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.1)
+    # ? waiting requests keep their order, each one a token further out
+    assert bucket.reserve() == pytest.approx(0.2)
+
+def test_token_bucket_refills_at_its_rate_up_to_its_burst(clock):
+    bucket = TokenBucket(rate=10, burst=3)
+    for _ in range(3):
+        bucket.reserve()
+    clock.now += 0.2
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() > 0
+
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() > 0
+
+def test_token_bucket_without_a_rate_never_waits(clock):
+    bucket = TokenBucket(rate=None, burst=1)
+    assert [bucket.reserve() for _ in range(100)] == [0] * 100
+
+def test_aimd_window_doubles_every_round_trip_in_slow_start():
+    window = AimdWindow(max_limit=20)
+    assert window.slots == 4
+    for _ in range(4):
+        window.on_success(0.1)
+    assert window.slots == 8
+    for _ in range(20):
+        window.on_success(0.1)
+    assert window.slots == 20
+
+def test_aimd_window_halves_on_congestion_then_grows_additively(clock):
+    window = AimdWindow(max_limit=20, initial_limit=16)
+    window.on_success(0.1)
+    assert window.on_congestion()
+    assert window.slots == 8
+    # ? a burst of failures from the same round trip only counts once
+    assert not window.on_congestion()
+    assert window.slots == 8
+
+    for _ in range(8):
+        window.on_success(0.1)
+    assert window.slots == 9
+
+    clock.now += 1
+    assert window.on_congestion()
+    assert window.slots == 4
+
+def test_aimd_window_stops_growing_once_latency_rises():
+    window = AimdWindow(max_limit=20)
+    window.on_success(0.1)
+    for _ in range(10):
+        window.on_success(1.0)
+    assert window.slots == 5
+
+def test_aimd_window_never_drops_below_its_min_limit(clock):
+    window = AimdWindow(max_limit=20, initial_limit=2)
+    for _ in range(5):
+        clock.now += 1
+        window.on_congestion()
+    assert window.slots == 1
+
+def test_host_limiter_blocks_once_its_window_is_full():
+    limiter = HostLimiter(HostEnum.MOCK, 'store.crunchyroll.com', None, 20)
+    for _ in range(limiter.window.slots):
+        limiter.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release(0.1, False)
+    assert acquired.wait(5)
+    waiter.join()
+    assert limiter.in_flight == 4
+
+def test_host_limiter_backs_off_on_congestion():
+    limiter = HostLimiter(HostEnum.MOCK, 'store.crunchyroll.com', None, 20)
+    limiter.acquire()
+    limiter.release(0.1, True)
+    assert limiter.in_flight == 0
+    assert limiter.window.slots == 2
+
+def test_async_host_limiter_blocks_once_its_window_is_full():
+    async def fill_then_release() -> list[str]:
+        limiter = AsyncHostLimiter(HostEnum.MOCK, 'store.crunchyroll.com', None, 20)
+        events = []
+        for _ in range(limiter.window.slots):
+            await limiter.acquire()
+
+        async def wait_for_slot():
+            await limiter.acquire()
+            events.append('acquired')
+
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0.05)
+        events.append('released')
+        await limiter.release(0.1, False)
+        await waiter
+        return events
+
+    assert asyncio.run(fill_then_release()) == ['released', 'acquired']
+
+@pytest.fixture
+def limiters(monkeypatch):
+    monkeypatch.setattr(HttpClient, '_limiters', {})
+
+def test_hosts_that_are_not_scraped_are_not_limited(limiters):
+    limiter = HttpClient(HostEnum.MOCK).get_limiter('https://abc.execute-api.aws.com/v1/volume')
+    assert limiter.bucket.rate is None
+    assert limiter.window.slots == HttpClient.DEFAULT_POOL_SIZE
+    limiter.acquire()
+    limiter.release(0.1, True)
+    assert limiter.window.slots == HttpClient.DEFAULT_POOL_SIZE
+
+def test_scraped_hosts_get_their_rate_limit_and_an_adaptive_window(limiters):
+    limiter = HttpClient(HostEnum.MOCK).get_limiter('https://store.crunchyroll.com/search')
+    assert limiter.bucket.rate == HttpClient.HOST_RATE_LIMITS['store.crunchyroll.com']
+    assert limiter.window.slots == 4
+
+def test_async_client_exempts_hosts_that_are_not_scraped():
+    client = AsyncHttpClient(HostEnum.MOCK)
+
+    async def get_limiters():
+        return client.get_limiter('https://abc.execute-api.aws.com/v1/volume'), \
+            client.get_limiter('https://api.mangaupdates.com/v1/series/1')
+
+    aws_limiter, scraped_limiter = asyncio.run(get_limiters())
+    assert aws_limiter.bucket.rate is None
+    assert aws_limiter.window.slots == HttpClient.DEFAULT_POOL_SIZE
+    assert scraped_limiter.bucket.rate == HttpClient.HOST_RATE_LIMITS['api.mangaupdates.com']
+    assert scraped_limiter.window.slots == 4
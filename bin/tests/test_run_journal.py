@@ -0,0 +1,102 @@
+import json
+
+from src.enums.host_enum import HostEnum
+from src.manga.run_journal import RunJournal
+from src.manga.scrape_crunchyroll import ScrapeCrunchyroll
+from tests.test_scrape_crunchyroll import buffer_item_writes, get_isbn, get_listing_page
+
+def get_items(start: int, count: int) -> list:
+    return get_listing_page(start).find_all('div', {'class': 'product'})[:count]
+
+def complete_page(journal: RunJournal, page: int, isbns: list[str]):
+    journal.expect_page(page, isbns)
+    for isbn in isbns:
+        journal.complete_item(page, isbn)
+
+def test_resume_starts_from_the_first_page_not_completed():
+    journal = RunJournal(HostEnum.MOCK)
+    journal.start_run(100, 500)
+    complete_page(journal, 1, [get_isbn(100), get_isbn(101)])
+    journal.expect_page(2, [get_isbn(200), get_isbn(201)])
+    journal.complete_item(2, get_isbn(200))
+    complete_page(journal, 3, [get_isbn(300)])
+    journal.close()
+
+    resumed = RunJournal(HostEnum.MOCK)
+    assert resumed.load()
+    assert resumed.completed_pages == { 1, 3 }
+    assert resumed.resume_run() == 200
+    assert resumed.end == 500
+    assert resumed.is_item_completed(get_isbn(200))
+    assert not resumed.is_item_completed(get_isbn(201))
+    resumed.close()
+
+def test_finished_runs_are_not_resumed():
+    journal = RunJournal(HostEnum.MOCK)
+    journal.start_run(0, 100)
+    complete_page(journal, 0, [get_isbn(0)])
+    assert journal.is_complete()
+    journal.finish_run()
+
+    assert not RunJournal(HostEnum.MOCK).load()
+
+def test_a_journal_cut_short_by_a_crash_still_loads():
+    journal = RunJournal(HostEnum.MOCK)
+    journal.start_run(0, 200)
+    complete_page(journal, 0, [get_isbn(0)])
+    journal.journal_file.write('{"event": "item", "pa')
+    journal.close()
+
+    resumed = RunJournal(HostEnum.MOCK)
+    assert resumed.load()
+    assert resumed.resume_run() == 100
+    resumed.close()
+
+def test_resumed_runs_skip_the_items_already_completed():
+    scraper = ScrapeCrunchyroll(HostEnum.MOCK)
+    scraper.run_journal.start_run(0, 100)
+    scraper.run_journal.expect_page(0, [get_isbn(0), get_isbn(1), get_isbn(2)])
+    scraper.run_journal.complete_item(0, get_isbn(1))
+    scraper.run_journal.close()
+
+    resumed = ScrapeCrunchyroll(HostEnum.MOCK)
+    assert resumed.start_run(0, 100, resume=True) == (0, 100)
+    pending = resumed.queue_page_items(get_items(0, 3), 0)
+    assert [json.loads(item.attrs['data-gtmdata'])['id'] for item in pending] == [
+        get_isbn(0), get_isbn(2)
+    ]
+    resumed.run_journal.close()
+
+def test_resumed_runs_scrape_again_the_items_whose_writes_were_not_saved():
+    scraper = ScrapeCrunchyroll(HostEnum.MOCK)
+    buffer_item_writes(scraper)
+    scraper.run_journal.start_run(0, 100)
+    items = get_items(0, 2)
+    scraper.queue_page_items(items, 0)
+    scraper.process_item(items[0], 0, 1)
+    scraper.manga_server.flush_writes()
+    # ? the second item is scraped, but the run crashes before its writes are flushed
+    scraper.process_item(items[1], 0, 1)
+    scraper.run_journal.close()
+
+    resumed = ScrapeCrunchyroll(HostEnum.MOCK)
+    resumed.start_run(0, 100, resume=True)
+    pending = resumed.queue_page_items(items, 0)
+    assert [json.loads(item.attrs['data-gtmdata'])['id'] for item in pending] == [get_isbn(1)]
+    resumed.run_journal.close()
+
+def test_runs_with_reopened_items_resume_from_their_page():
+    journal = RunJournal(HostEnum.MOCK)
+    journal.start_run(0, 300)
+    complete_page(journal, 0, [get_isbn(0)])
+    complete_page(journal, 1, [get_isbn(100)])
+    journal.reopen_item(get_isbn(0))
+    assert not journal.is_complete()
+    journal.close()
+
+    resumed = RunJournal(HostEnum.MOCK)
+    assert resumed.load()
+    assert resumed.resume_run() == 0
+    assert not resumed.is_item_completed(get_isbn(0))
+    assert resumed.is_item_completed(get_isbn(100))
+    resumed.close()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from queue import Queue
+import threading
+
+from bs4 import BeautifulSoup
+import pytest
+
+from src.enums.host_enum import HostEnum
+from src.enums.page_type_enum import PageTypeEnum
+from src.manga.async_scrape_crunchyroll import AsyncScrapeCrunchyroll
+from src.manga.scrape_crunchyroll import ScrapeCrunchyroll
+
+TOTAL = 450
+
+def get_isbn(offset: int) -> str:
+    return str(9781974700000 + offset)
+
+def get_listing_page(start: int) -> BeautifulSoup:
+    tiles = ''.join([
+        f"<div class=\"product\" data-gtmdata='{json.dumps({ 'id': get_isbn(offset) })}'></div>"
+        for offset in range(start, min(start + 100, TOTAL))
+    ])
+    return BeautifulSoup(f'<div class="pagination-text" data-totalcount="{TOTAL}"></div>' +
+                         tiles, 'html.parser')
+
+@pytest.fixture
+def scraper():
+    scraper = ScrapeCrunchyroll(HostEnum.MOCK)
+    scraper.get_page_soup = get_listing_page
+    scraper.prefetch_page = lambda items: None
+    return scraper
+
+def scrape_offsets(scraper: ScrapeCrunchyroll, start: int, end: int) -> list[str]:
+    start_page, end_page = scraper.get_page_range(start, end, TOTAL)
+    item_queue = Queue()
+    assert scraper.fetch_pages(get_listing_page(start), start, end, start_page, end_page,
+                               item_queue)
+    isbns = []
+    while (queued := item_queue.get_nowait()) is not None:
+        isbns.append(json.loads(queued[0].attrs['data-gtmdata'])['id'])
+    return isbns
+
+@pytest.mark.parametrize('start, end', [
+    (0, 150), (50, 250), (0, 100), (120, 121), (0, 10000000000), (399, 10000000000), (450, 500)
+])
+def test_fetch_pages_scrapes_from_start_to_end(scraper, start, end):
+    assert scrape_offsets(scraper, start, end) == [
+        get_isbn(offset) for offset in range(start, min(end, TOTAL))
+    ]
+
+def test_get_page_range_counts_pages_from_start(scraper):
+    assert scraper.get_page_range(50, 250, TOTAL) == (0, 2)
+    assert scraper.get_page_range(0, 150, TOTAL) == (0, 2)
+    assert scraper.get_page_range(300, 10000000000, TOTAL) == (3, 5)
+    assert scraper.get_page_range(500, 600, TOTAL) == (5, 5)
+
+@pytest.mark.parametrize('start, end', [(0, 150), (50, 250), (399, 10000000000)])
+def test_fetch_pages_async_scrapes_from_start_to_end(start, end):
+    scraper = AsyncScrapeCrunchyroll(HostEnum.MOCK)
+
+    async def get_page_soup_async(page_start):
+        return get_listing_page(page_start)
+
+    async def prefetch_page_async(items):
+        return None
+
+    scraper.get_page_soup_async = get_page_soup_async
+    scraper.prefetch_page_async = prefetch_page_async
+    start_page, end_page = scraper.get_page_range(start, end, TOTAL)
+    item_queue = asyncio.Queue()
+    assert asyncio.run(scraper.fetch_pages_async(get_listing_page(start), start, end,
+                                                 start_page, end_page, item_queue))
+    isbns = []
+    while (queued := item_queue.get_nowait()) is not None:
+        isbns.append(json.loads(queued[0].attrs['data-gtmdata'])['id'])
+    assert isbns == [get_isbn(offset) for offset in range(start, min(end, TOTAL))]
+
+def test_parse_page_async_parses_off_the_event_loop():
+    scraper = AsyncScrapeCrunchyroll(HostEnum.MOCK)
+    threads = []
+    parse = scraper.html_extractor.parse
+
+    def record_parse(html, page_type):
+        threads.append(threading.current_thread())
+        return parse(html, page_type)
+
+    scraper.html_extractor.parse = record_parse
+    soup = asyncio.run(scraper.parse_page_async(str(get_listing_page(0)),
+                                                PageTypeEnum.LISTING))
+
+    assert len(soup.find_all('div', {'class': 'product'})) == 100
+    assert threads and threads[0] is not threading.main_thread()
+
+def test_incremental_crawl_stops_at_items_scraped_before(scraper):
+    scraper.incremental = True
+    scraper.incremental_stop_after = 50
+    page = get_listing_page(0).find_all('div', {'class': 'product'})
+    for item in page[:60]:
+        scraper.fingerprint_store.update(json.loads(item.attrs['data-gtmdata'])['id'],
+                                         scraper.tile_fingerprint.fingerprint(item))
+    assert not scraper.has_reached_known_items(page[60:])
+    assert scraper.has_reached_known_items(page[:60])
+
+def test_incremental_crawl_retries_items_that_failed(scraper):
+    scraper.incremental = True
+    scraper.incremental_stop_after = 1
+    item = get_listing_page(0).find('div', {'class': 'product'})
+
+    def fail(item):
+        raise RuntimeError('scrape failed')
+
+    scraper.scrape_page = fail
+    scraper.process_item(item, 0, 1)
+    assert not scraper.has_reached_known_items([item])
+
+class FakeBulkResponse:
+
+    def __init__(self, writes: list[dict], rejected: set[str]):
+        self.status_code = 200
+        self.body = { 'results': [
+            { 'id': write['id'], 'action': write['action'],
+              'status': 'error' if write['id'] in rejected else 'ok' }
+            for write in writes
+        ] }
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+def buffer_item_writes(scraper: ScrapeCrunchyroll, rejected: set[str] | None = None):
+    '''Has scraping an item buffer its volume and link it to series s1, the given ids failing.'''
+    scraper.manga_server.http_client.request = lambda method, url, **kwargs: \
+        FakeBulkResponse(kwargs['json']['writes'], rejected or set())
+
+    def scrape_page(item):
+        isbn = json.loads(item.attrs['data-gtmdata'])['id']
+        scraper.manga_server.upsert_item('volume', isbn, { 'isbn': isbn }, [isbn])
+        scraper.series_aggregator.link(isbn, 's1', 'Manga', '1')
+
+    scraper.scrape_page = scrape_page
+
+def test_items_are_completed_once_their_writes_are_saved(scraper):
+    buffer_item_writes(scraper)
+    scraper.run_journal.start_run(0, 100)
+    item = get_listing_page(0).find('div', {'class': 'product'})
+    isbn = get_isbn(0)
+
+    scraper.process_item(item, 0, 1)
+    assert not scraper.run_journal.is_item_completed(isbn)
+
+    scraper.manga_server.flush_writes()
+    scraper.complete_saved_items()
+    assert scraper.run_journal.is_item_completed(isbn)
+    assert scraper.run_journal.series_links[isbn] == ('s1', 'Manga', '1')
+
+def test_items_whose_writes_fail_are_not_completed(scraper):
+    buffer_item_writes(scraper, rejected={ get_isbn(0) })
+    scraper.run_journal.start_run(0, 100)
+    for offset, item in enumerate(get_listing_page(0).find_all('div', {'class': 'product'})[:2]):
+        scraper.fingerprint_store.update(get_isbn(offset), 'fingerprint')
+        scraper.process_item(item, 0, 1)
+
+    scraper.manga_server.flush_writes()
+    scraper.finish_crawl(listing_complete=True)
+    assert not scraper.run_journal.is_item_completed(get_isbn(0))
+    assert scraper.run_journal.is_item_completed(get_isbn(1))
+    assert not scraper.fingerprint_store.is_unchanged(get_isbn(0), 'fingerprint')
+    assert scraper.fingerprint_store.is_unchanged(get_isbn(1), 'fingerprint')
+
+def test_items_whose_series_is_not_written_are_reopened(scraper):
+    scraper.run_journal.start_run(0, 100)
+    scraper.run_journal.expect_page(0, [get_isbn(0)])
+    scraper.series_aggregator.link(get_isbn(0), 's1', 'Manga', '1')
+    scraper.run_journal.complete_item(0, get_isbn(0), ('s1', 'Manga', '1'))
+    assert scraper.run_journal.is_complete()
+
+    scraper.forget_series_volumes()
+    assert not scraper.run_journal.is_item_completed(get_isbn(0))
+    assert not scraper.run_journal.is_complete()
+    scraper.run_journal.close()
+
+    assert scraper.run_journal.load()
+    assert get_isbn(0) not in scraper.run_journal.completed_items
+    assert 0 not in scraper.run_journal.completed_pages
+    assert scraper.run_journal.series_links == {}
+
+def test_resumed_runs_keep_the_series_links_of_completed_items(scraper):
+    scraper.run_journal.start_run(0, 200)
+    scraper.run_journal.complete_item(0, get_isbn(0), ('s1', 'Manga', '1'))
+    scraper.run_journal.close()
+
+    resumed = ScrapeCrunchyroll(HostEnum.MOCK)
+    assert resumed.run_journal.load()
+    resumed.run_journal.resume_run()
+    resumed.start_crawl()
+    assert resumed.series_aggregator.links == { get_isbn(0): ('s1', 'Manga', '1') }
+    resumed.run_journal.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from src.enums.host_enum import HostEnum
+from src.manga.series_cache import SeriesCache
+from src.manga.series_resolution_cache import SeriesResolutionCache
+
+DAY = 24 * 60 * 60
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('src.util.sqlite_cache.time.time', clock.time)
+    return clock
+
+def test_series_cache_expires_records_after_the_ttl(clock):
+    series_cache = SeriesCache(HostEnum.MOCK, ttl_seconds=7 * DAY)
+    series_cache.put('1', { 'series_id': '1', 'title': 'Berserk' })
+    clock.now += 7 * DAY - 1
+    assert series_cache.get('1') == { 'series_id': '1', 'title': 'Berserk' }
+    clock.now += 1
+    assert series_cache.get('1') is None
+    assert series_cache.report() == { 'memory_hit': 1, 'disk_hit': 0, 'expired': 1, 'miss': 0 }
+
+def test_series_cache_reads_records_evicted_from_memory_from_disk(clock):
+    series_cache = SeriesCache(HostEnum.MOCK, max_entries=1)
+    series_cache.put('1', { 'series_id': '1' })
+    series_cache.put('2', { 'series_id': '2' })
+    assert list(series_cache.entries) == ['2']
+    series = series_cache.get('1')
+    series['title'] = 'changed'
+    assert series_cache.get('1') == { 'series_id': '1' }
+    assert series_cache.get('3') is None
+    assert series_cache.report() == { 'memory_hit': 1, 'disk_hit': 1, 'expired': 0, 'miss': 1 }
+    assert sorted(series['series_id'] for series in series_cache.get_all()) == ['1', '2']
+
+@pytest.mark.parametrize('resolution, fresh_days', [
+    ({ 'series_id': '1', 'title': 'Berserk', 'series_match_confidence': 1 }, 30),
+    ({ 'series_id': '1', 'title': 'Berserk', 'series_match_confidence': 0.85 }, 30),
+    ({ 'series_id': '1', 'title': 'Berserk', 'series_match_confidence': 0.6 }, 3),
+    ({ 'series_id': '1', 'title': 'Berserk', 'series_match_confidence': 0.1 }, 3),
+    (None, 1)
+])
+def test_resolution_cache_keeps_uncertain_resolutions_for_less_time(clock, resolution,
+                                                                    fresh_days):
+    resolution_cache = SeriesResolutionCache(HostEnum.MOCK)
+    resolution_cache.put('Berserk ', 'Manga', resolution)
+    clock.now += fresh_days * DAY - 1
+    assert resolution_cache.get('berserk', 'manga') == (True, resolution)
+    clock.now += 1
+    assert resolution_cache.get('berserk', 'manga') == (False, None)
@@ -0,0 +1,127 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from src.util.single_flight import AsyncSingleFlight, SingleFlight
+
+def wait_for_joined(single_flight: SingleFlight, joined: int):
+    while single_flight.joined < joined:
+        threading.Event().wait(0.01)
+
+def test_callers_join_the_call_in_flight_and_get_copies():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return { 'volumes': ['1'] }
+
+    with ThreadPoolExecutor(3) as executor:
+        futures = [executor.submit(single_flight.do, 'series', call) for _ in range(3)]
+        wait_for_joined(single_flight, 2)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{ 'volumes': ['1'] }] * 3
+    results[0]['volumes'].append('2')
+    assert results[1] == { 'volumes': ['1'] } and results[2] == { 'volumes': ['1'] }
+
+def test_callers_share_the_error_of_the_call_in_flight():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def call():
+        release.wait(5)
+        raise RuntimeError('search failed')
+
+    with ThreadPoolExecutor(2) as executor:
+        futures = [executor.submit(single_flight.do, 'series', call) for _ in range(2)]
+        wait_for_joined(single_flight, 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match='search failed'):
+                future.result()
+
+def test_calls_are_made_again_once_done():
+    single_flight = SingleFlight()
+    assert single_flight.do('series', lambda: 1) == 1
+    assert single_flight.do('series', lambda: 2) == 2
+    assert single_flight.joined == 0
+
+def test_async_callers_join_the_call_in_flight_and_get_copies():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return { 'volumes': ['1'] }
+
+    async def run():
+        return await asyncio.gather(*[single_flight.do('series', call) for _ in range(3)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1 and single_flight.joined == 2
+    assert results == [{ 'volumes': ['1'] }] * 3
+    results[0]['volumes'].append('2')
+    assert results[1] == { 'volumes': ['1'] }
+
+def test_async_callers_share_the_error_of_the_call_in_flight():
+    single_flight = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('search failed')
+
+    async def run():
+        return await asyncio.gather(*[single_flight.do('series', call) for _ in range(2)],
+                                    return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert [str(error) for error in errors] == ['search failed'] * 2
+
+def test_async_callers_make_the_call_again_when_its_caller_is_cancelled():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def run():
+        leader = asyncio.create_task(single_flight.do('series', call))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(single_flight.do('series', call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(run()) == 2
+    assert len(calls) == 2
+
+def test_async_waiters_cancelled_leave_the_call_in_flight():
+    single_flight = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return 'series'
+
+    async def run():
+        leader = asyncio.create_task(single_flight.do('series', call))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(single_flight.do('series', call))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(run()) == 'series'
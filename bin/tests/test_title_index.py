@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from src.enums.host_enum import HostEnum
+from src.manga.series_search import SeriesSearch
+from src.manga.title_index import TitleIndex
+
+with open('./db/fixtures/series_title_corpus.json', 'r', encoding='UTF-8') as corpus_file:
+    CORPUS = json.load(corpus_file)
+
+RE_ZERO = {
+    'series_id': '1',
+    'title': 'Re:ZERO -Starting Life in Another World-',
+    'associated_titles': ['Re:Zero kara Hajimeru Isekai Seikatsu'],
+    'category': 'Novel'
+}
+RE_ZERO_EX = {
+    'series_id': '2',
+    'title': 'Re:ZERO Ex',
+    'associated_titles': [],
+    'category': 'Novel'
+}
+
+class FakeSearchResponse:
+
+    def __init__(self, results: list[dict]):
+        self.results = results
+
+    def json(self) -> dict:
+        return { 'results': self.results }
+
+@pytest.mark.parametrize('title, normalized', [
+    ('Kaguya-sama: Love Is War', 'kaguya sama love is war'),
+    ('Re:ZERO -Starting Life in Another World-', 're zero starting life in another world'),
+    ("Frieren: Beyond Journey's End", 'frieren beyond journeys end'),
+    ('Pokémon Adventures', 'pokemon adventures'),
+    ('Spy × Family', 'spy x family'),
+    ('Re:ZERO Ex (Novel)', 're zero ex'),
+    ('Mushoku Tensei: Jobless Reincarnation (Light Novel) Vol. 2',
+     'mushoku tensei jobless reincarnation'),
+    ('Berserk Deluxe Edition', 'berserk'),
+    ('Naruto 3-in-1 Edition', 'naruto'),
+    ('Black Butler Box Set', 'black butler'),
+    # ? a title that is only a suffix is kept
+    ('Omnibus', 'omnibus'),
+])
+def test_titles_are_normalized(title: str, normalized: str):
+    assert TitleIndex.normalize_title(title) == normalized
+
+def test_ex_spin_offs_are_not_their_main_series():
+    assert TitleIndex.normalize_title('Re:ZERO Ex') != TitleIndex.normalize_title('Re:ZERO')
+    title_index = TitleIndex()
+    title_index.add(RE_ZERO)
+    assert title_index.match('Re:ZERO Ex', 'novel') is None
+
+    title_index.add(RE_ZERO_EX)
+    assert title_index.match('Re:ZERO Ex (Novel)', 'novel')['series_id'] == '2'
+    assert title_index.match('Re:ZERO -Starting Life in Another World- (Light Novel)',
+                             'novel')['series_id'] == '1'
+
+def test_titles_with_other_numbers_do_not_match():
+    assert TitleIndex.score('Classroom of the Elite: Year 2', 'Classroom of the Elite: Year 3') == 0
+    assert TitleIndex.score('Classroom of the Elite: Year 2',
+                            'Classroom of the Elite: Year 2 (Light Novel)') == 1
+
+def test_titles_only_match_series_of_their_category():
+    title_index = TitleIndex()
+    title_index.add(RE_ZERO)
+    assert title_index.match('Re:ZERO -Starting Life in Another World-', 'manga') is None
+    assert title_index.match('Re:ZERO -Starting Life in Another World-', 'novel') == {
+        'series_id': '1',
+        'title': 'Re:ZERO -Starting Life in Another World-',
+        'series_match_confidence': 1
+    }
+
+@pytest.mark.parametrize('query', CORPUS['queries'], ids=lambda query: query['series_name'])
+def test_corpus_names_never_match_the_wrong_series(query: dict):
+    title_index = TitleIndex()
+    for series in CORPUS['series']:
+        title_index.add(series)
+    match = title_index.match(query['series_name'], query['category'])
+    # ? names the index misses fall back to MangaUpdates, so only precision is required
+    assert match is None or match['series_id'] == query['series_id']
+
+@pytest.fixture
+def series_search(monkeypatch) -> tuple[SeriesSearch, list[str]]:
+    series_search = SeriesSearch(HostEnum.MOCK)
+    series_search.add_known_series([RE_ZERO])
+    searches = []
+
+    def post(url: str, data: dict):
+        searches.append(data['search'])
+        return FakeSearchResponse([
+            { 'hit_title': RE_ZERO['title'], 'record': { **RE_ZERO, 'type': 'Novel' } },
+            { 'hit_title': RE_ZERO_EX['title'], 'record': { **RE_ZERO_EX, 'type': 'Novel' } }
+        ])
+
+    monkeypatch.setattr(series_search.http_client, 'post', post)
+    monkeypatch.setattr(series_search, 'get_series_by_id',
+                        lambda series_id: { '1': dict(RE_ZERO), '2': dict(RE_ZERO_EX) }[series_id])
+    return series_search, searches
+
+def test_known_series_are_matched_without_searching_mangaupdates(series_search):
+    series_search, searches = series_search
+    series = series_search.find_series('Re:ZERO -Starting Life in Another World-',
+                                       'light-novels', 'Re:ZERO Volume 1')
+    assert series['series_id'] == '1'
+    assert searches == []
+
+def test_names_no_known_series_matches_fall_back_to_mangaupdates(series_search):
+    series_search, searches = series_search
+    series = series_search.find_series('Re:ZERO Ex', 'light-novels', 'Re:ZERO Ex Volume 1')
+    assert searches == ['Re:ZERO Ex']
+    assert series['series_id'] == '2'
+    assert series['series_match_confidence'] == 1
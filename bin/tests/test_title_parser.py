@@ -0,0 +1,21 @@
+import json
+import os
+
+import pytest
+
+from src.manga.title_parser import TitleParser
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), '..', 'db', 'fixtures',
+                           'title_corpus.json')
+
+with open(CORPUS_PATH, 'r', encoding='UTF-8') as corpus_file:
+    CORPUS = json.load(corpus_file)
+
+@pytest.mark.parametrize('entry', CORPUS, ids=[entry['display_name'] for entry in CORPUS])
+def test_parse_volume_matches_the_corpus(entry):
+    assert TitleParser().parse_volume(entry['display_name'], entry['category']) == \
+        entry['volume']
+
+@pytest.mark.parametrize('entry', CORPUS, ids=[entry['display_name'] for entry in CORPUS])
+def test_parse_name_matches_the_legacy_name_parsing(entry):
+    assert TitleParser().parse_name(entry['display_name'], entry['form']) == entry['name']
@@ -53,6 +53,17 @@ defmodule MangaService.BundlesDB do
   """
   def get_bundle_by_id(item_id), do: Repo.get_by(Bundle, %{item_id: item_id})
 
+  @doc """
+  Gets the bundles with the given item_ids, skipping any that do not exist.
+
+  ## Examples
+
+      iex> list_bundles_by_ids(["9781427816702", "9781427816719"])
+      [%Bundle{}, ...]
+
+  """
+  def list_bundles_by_ids(item_ids), do: Repo.all(from b in Bundle, where: b.item_id in ^item_ids)
+
   @doc """
   Creates a bundle.
 
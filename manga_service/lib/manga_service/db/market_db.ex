@@ -53,6 +53,17 @@ defmodule MangaService.MarketDB do
   """
   def get_market_by_isbn(isbn), do: Repo.get_by(Market, %{isbn: isbn})
 
+  @doc """
+  Gets the volume market data with the given isbns, skipping any that do not exist.
+
+  ## Examples
+
+      iex> list_market_by_isbns(["9781427816702", "9781427816719"])
+      [%Market{}, ...]
+
+  """
+  def list_market_by_isbns(isbns), do: Repo.all(from m in Market, where: m.isbn in ^isbns)
+
   @doc """
   Creates a market.
 
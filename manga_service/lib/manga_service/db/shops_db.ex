@@ -145,6 +145,17 @@ defmodule MangaService.ShopsDB do
   """
   def get_shop_by_id(item_id), do: Repo.get_by(Shop, %{item_id: item_id})
 
+  @doc """
+  Gets every shop of the volumes with the given isbns.
+
+  ## Examples
+
+      iex> list_shops_by_isbns(["9781427816702", "9781427816719"])
+      [%Shop{}, ...]
+
+  """
+  def list_shops_by_isbns(isbns), do: Repo.all(from s in Shop, where: s.isbn in ^isbns)
+
   @doc """
   Gets a single volume shop data by isbn.
 
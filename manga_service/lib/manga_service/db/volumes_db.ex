@@ -114,6 +114,21 @@ defmodule MangaService.VolumesDB do
     |> Repo.preload([:market_data, :series_data])
   end
 
+  @doc """
+  Gets the volumes with the given isbns, skipping any that do not exist.
+
+  ## Examples
+
+      iex> list_volumes_by_isbns(["9781427816702", "9781427816719"])
+      [%Volume{}, ...]
+
+  """
+  def list_volumes_by_isbns(isbns) do
+    from(v in Volume, where: v.isbn in ^isbns)
+    |> Repo.all()
+    |> Repo.preload([:market_data, :series_data])
+  end
+
   @doc """
   Creates a volume.
 
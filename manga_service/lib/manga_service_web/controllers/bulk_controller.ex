@@ -0,0 +1,98 @@
+defmodule MangaServiceWeb.BulkController do
+  use Phoenix.Controller, formats: [:json]
+
+  alias MangaService.BundlesDB
+  alias MangaService.MarketDB
+  alias MangaService.SeriesDB
+  alias MangaService.ShopsDB
+  alias MangaService.VolumesDB
+
+  def write(conn, %{"item_type" => item_type, "writes" => writes}) do
+    case item_type(item_type) do
+      nil ->
+        conn
+        |> put_status(:not_found)
+        |> json(%{errors: %{detail: "Not Found"}})
+
+      context ->
+        json(conn, %{results: Enum.map(writes, &apply_write(context, &1))})
+    end
+  end
+
+  # key each item type is looked up by, and its get / create / update functions
+  defp item_type("volume"),
+    do:
+      {"isbn", &VolumesDB.get_volume_by_isbn/1, &VolumesDB.create_volume/1,
+       &VolumesDB.update_volume/2}
+
+  defp item_type("series"),
+    do:
+      {"series_id", &SeriesDB.get_series_by_id/1, &SeriesDB.create_series/1,
+       &SeriesDB.update_series/2}
+
+  defp item_type("bundle"),
+    do:
+      {"item_id", &BundlesDB.get_bundle_by_id/1, &BundlesDB.create_bundle/1,
+       &BundlesDB.update_bundle/2}
+
+  defp item_type("shop"),
+    do: {"item_id", &ShopsDB.get_shop_by_id/1, &ShopsDB.create_shop/1, &ShopsDB.update_shop/2}
+
+  defp item_type("market"),
+    do:
+      {"isbn", &MarketDB.get_market_by_isbn/1, &MarketDB.create_market/1,
+       &MarketDB.update_market/2}
+
+  defp item_type(_), do: nil
+
+  defp apply_write({key, _get, create, _update}, %{"action" => "create", "item" => item}) do
+    result(item[key], "create", create.(item))
+  end
+
+  defp apply_write({_key, get, _create, update}, %{
+         "action" => "update",
+         "id" => id,
+         "item" => item
+       }) do
+    case get.(id) do
+      nil -> %{id: id, action: "update", status: "error", errors: %{id: ["not found"]}}
+      curr_item -> result(id, "update", update.(curr_item, item))
+    end
+  end
+
+  # ? updates the record if it exists, otherwise creates it, and answers with the action taken.
+  # ? a create that loses a race with another one for the same key is retried as an update.
+  defp apply_write({key, get, create, update}, %{"action" => "upsert", "item" => item} = write) do
+    id = write["id"] || item[key]
+
+    case get.(id) do
+      nil ->
+        case create.(Map.put(item, key, id)) do
+          {:error, changeset} = created ->
+            if unique_conflict?(changeset),
+              do: result(id, "update", update.(get.(id), item)),
+              else: result(id, "create", created)
+
+          created ->
+            result(id, "create", created)
+        end
+
+      curr_item ->
+        result(id, "update", update.(curr_item, item))
+    end
+  end
+
+  defp apply_write(_context, write) do
+    %{id: write["id"], action: write["action"], status: "error", errors: %{action: ["invalid"]}}
+  end
+
+  defp unique_conflict?(changeset),
+    do: Enum.any?(changeset.errors, fn {_, {_, opts}} -> opts[:constraint] == :unique end)
+
+  defp result(id, action, {:ok, _}), do: %{id: id, action: action, status: "ok"}
+
+  defp result(id, action, {:error, changeset}) do
+    errors = Ecto.Changeset.traverse_errors(changeset, fn {message, _opts} -> message end)
+    %{id: id, action: action, status: "error", errors: errors}
+  end
+end
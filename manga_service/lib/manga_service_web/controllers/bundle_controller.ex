@@ -2,6 +2,30 @@ defmodule MangaServiceWeb.BundleController do
   use Phoenix.Controller, formats: [:json]
   alias MangaService.BundlesDB
 
+  def index(conn, %{"ids" => ids}) do
+    bundles = BundlesDB.list_bundles_by_ids(String.split(ids, ",", trim: true))
+
+    json(
+      conn,
+      bundles
+      |> Enum.map(fn bundle ->
+        %{
+          id: bundle.id,
+          item_id: bundle.item_id,
+          series_id: bundle.series_id,
+          shop_id: bundle.shop_id,
+          primary_cover_image: bundle.primary_cover_image,
+          volumes: bundle.volumes,
+          volume_start: bundle.volume_start,
+          volume_end: bundle.volume_end,
+          type: bundle.type,
+          inserted_at: bundle.inserted_at,
+          updated_at: bundle.updated_at
+        }
+      end)
+    )
+  end
+
   def index(conn, _params) do
     bundles = BundlesDB.list_bundles()
 
@@ -31,7 +55,9 @@ defmodule MangaServiceWeb.BundleController do
 
     case bundle do
       nil ->
-        raise "No record found for ID"
+        conn
+        |> put_status(:not_found)
+        |> json(%{errors: %{detail: "Not Found"}})
 
       _ ->
         json(conn, %{
@@ -2,6 +2,24 @@ defmodule MangaServiceWeb.MarketController do
   use Phoenix.Controller, formats: [:json]
   alias MangaService.MarketDB
 
+  def index(conn, %{"ids" => ids}) do
+    markets = MarketDB.list_market_by_isbns(String.split(ids, ",", trim: true))
+
+    json(
+      conn,
+      markets
+      |> Enum.map(fn market ->
+        %{
+          id: market.id,
+          isbn: market.isbn,
+          retail_price: market.retail_price,
+          inserted_at: market.inserted_at,
+          updated_at: market.updated_at
+        }
+      end)
+    )
+  end
+
   def index(conn, _params) do
     markets = MarketDB.list_market()
 
@@ -25,7 +43,9 @@ defmodule MangaServiceWeb.MarketController do
 
     case market do
       nil ->
-        raise "No record found for ISBN"
+        conn
+        |> put_status(:not_found)
+        |> json(%{errors: %{detail: "Not Found"}})
 
       _ ->
         json(conn, %{
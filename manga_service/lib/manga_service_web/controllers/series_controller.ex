@@ -43,7 +43,9 @@ defmodule MangaServiceWeb.SeriesController do
 
     case series do
       nil ->
-        raise "No record found for Series ID"
+        conn
+        |> put_status(:not_found)
+        |> json(%{errors: %{detail: "Not Found"}})
 
       _ ->
         json(conn, %{
@@ -2,6 +2,38 @@ defmodule MangaServiceWeb.ShopController do
   use Phoenix.Controller, formats: [:json]
   alias MangaService.ShopsDB
 
+  def index(conn, %{"isbns" => isbns}) do
+    shops = ShopsDB.list_shops_by_isbns(String.split(isbns, ",", trim: true))
+
+    json(
+      conn,
+      shops
+      |> Enum.map(fn shop ->
+        %{
+          id: shop.id,
+          item_id: shop.item_id,
+          isbn: shop.isbn,
+          store: shop.store,
+          url: shop.url,
+          condition: shop.condition,
+          price: shop.price,
+          stock_status: shop.stock_status,
+          last_stock_update: shop.last_stock_update,
+          coupon: shop.coupon,
+          is_on_sale: shop.is_on_sale,
+          promotion: shop.promotion,
+          promotion_percentage: shop.promotion_percentage,
+          backorder_details: shop.backorder_details,
+          exclusive: shop.exclusive,
+          is_bundle: shop.is_bundle,
+          dropped_check: shop.dropped_check,
+          inserted_at: shop.inserted_at,
+          updated_at: shop.updated_at
+        }
+      end)
+    )
+  end
+
   def index(conn, params) do
     shops = ShopsDB.list_shops(params)
 
@@ -55,7 +87,9 @@ defmodule MangaServiceWeb.ShopController do
 
     case shop do
       nil ->
-        raise "No record found for ID"
+        conn
+        |> put_status(:not_found)
+        |> json(%{errors: %{detail: "Not Found"}})
 
       _ ->
         json(conn, %{
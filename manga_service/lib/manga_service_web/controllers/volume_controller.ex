@@ -2,6 +2,57 @@ defmodule MangaServiceWeb.VolumeController do
   use Phoenix.Controller, formats: [:json]
   alias MangaService.VolumesDB
 
+  def index(conn, %{"ids" => ids}) do
+    volumes = VolumesDB.list_volumes_by_isbns(String.split(ids, ",", trim: true))
+
+    json(
+      conn,
+      volumes
+      |> Enum.map(fn volume ->
+        %{
+          id: volume.id,
+          name: volume.name,
+          format: volume.format,
+          description: volume.description,
+          category: volume.category,
+          url: volume.url,
+          isbn: volume.isbn,
+          brand: volume.brand,
+          series: volume.series,
+          series_id: volume.series_id,
+          edition: volume.edition,
+          edition_id: volume.edition_id,
+          display_name: volume.display_name,
+          volume: volume.volume,
+          release_date: volume.release_date,
+          publisher: volume.publisher,
+          pages: volume.pages,
+          authors: volume.authors,
+          isbn_10: volume.isbn_10,
+          primary_cover_image: volume.primary_cover_image,
+          cover_images: volume.cover_images,
+          is_bundle: volume.is_bundle,
+          inserted_at: volume.inserted_at,
+          updated_at: volume.updated_at,
+          market_data:
+            volume.market_data &&
+              %{
+                retail_price: volume.market_data.retail_price
+              },
+          series_data:
+            volume.series_data &&
+              %{
+                status: volume.series_data.status,
+                category: volume.series_data.category,
+                url: volume.series_data.url,
+                genres: volume.series_data.genres,
+                themes: volume.series_data.themes
+              }
+        }
+      end)
+    )
+  end
+
   def index(conn, _params) do
     volumes = VolumesDB.list_volumes()
 
@@ -44,7 +95,9 @@ defmodule MangaServiceWeb.VolumeController do
 
     case volume do
       nil ->
-        raise "No record found for ISBN"
+        conn
+        |> put_status(:not_found)
+        |> json(%{errors: %{detail: "Not Found"}})
 
       _ ->
         json(conn, %{
@@ -16,6 +16,7 @@ defmodule MangaServiceWeb.Router do
     resources("/bundle", BundleController, only: [:index, :show, :create, :update, :delete])
     resources("/shop", ShopController, only: [:index, :show, :create, :update, :delete])
     resources("/market", MarketController, only: [:index, :show, :create, :update, :delete])
+    post("/:item_type/bulk", BulkController, :write)
 
     resources("/collection", CollectionController,
       only: [:index, :show, :create, :update, :delete]
@@ -0,0 +1,29 @@
+defmodule MangaService.BundlesDBTest do
+  use MangaService.DataCase
+
+  alias MangaService.BundlesDB
+
+  describe "bundles by ids" do
+    import MangaService.BundlesDBFixtures
+
+    test "list_bundles_by_ids/1 returns the bundles with the given item ids" do
+      bundle = bundle_fixture(%{item_id: "item 1"})
+      other_bundle = bundle_fixture(%{item_id: "item 2"})
+      bundle_fixture(%{item_id: "item 3"})
+
+      bundles = BundlesDB.list_bundles_by_ids(["item 1", "item 2"])
+      assert Enum.sort_by(bundles, & &1.item_id) == [bundle, other_bundle]
+    end
+
+    test "list_bundles_by_ids/1 skips the item ids without a bundle" do
+      bundle = bundle_fixture(%{item_id: "item 1"})
+      assert BundlesDB.list_bundles_by_ids(["item 1", "missing item"]) == [bundle]
+      assert BundlesDB.list_bundles_by_ids(["missing item"]) == []
+    end
+
+    test "list_bundles_by_ids/1 with no item ids returns no bundles" do
+      bundle_fixture()
+      assert BundlesDB.list_bundles_by_ids([]) == []
+    end
+  end
+end
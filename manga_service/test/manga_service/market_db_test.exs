@@ -58,4 +58,28 @@ defmodule MangaService.MarketDBTest do
       assert %Ecto.Changeset{} = MarketDB.change_market(market)
     end
   end
+
+  describe "market by isbns" do
+    import MangaService.MarketDBFixtures
+
+    test "list_market_by_isbns/1 returns the market with the given isbns" do
+      market = market_fixture(%{isbn: "isbn 1"})
+      other_market = market_fixture(%{isbn: "isbn 2"})
+      market_fixture(%{isbn: "isbn 3"})
+
+      markets = MarketDB.list_market_by_isbns(["isbn 1", "isbn 2"])
+      assert Enum.sort_by(markets, & &1.isbn) == [market, other_market]
+    end
+
+    test "list_market_by_isbns/1 skips the isbns without a market" do
+      market = market_fixture(%{isbn: "isbn 1"})
+      assert MarketDB.list_market_by_isbns(["isbn 1", "missing isbn"]) == [market]
+      assert MarketDB.list_market_by_isbns(["missing isbn"]) == []
+    end
+
+    test "list_market_by_isbns/1 with no isbns returns no market" do
+      market_fixture()
+      assert MarketDB.list_market_by_isbns([]) == []
+    end
+  end
 end
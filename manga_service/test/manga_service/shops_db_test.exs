@@ -70,4 +70,29 @@ defmodule MangaService.ShopsDBTest do
       assert %Ecto.Changeset{} = ShopsDB.change_shop(shop)
     end
   end
+
+  describe "shops by isbns" do
+    import MangaService.ShopsDBFixtures
+
+    test "list_shops_by_isbns/1 returns the shops with the given isbns" do
+      shop = shop_fixture(%{item_id: "item 1", isbn: "isbn 1"})
+      other_shop = shop_fixture(%{item_id: "item 2", isbn: "isbn 1", store: "other store"})
+      last_shop = shop_fixture(%{item_id: "item 3", isbn: "isbn 2"})
+      shop_fixture(%{item_id: "item 4", isbn: "isbn 3"})
+
+      shops = ShopsDB.list_shops_by_isbns(["isbn 1", "isbn 2"])
+      assert Enum.sort_by(shops, & &1.item_id) == [shop, other_shop, last_shop]
+    end
+
+    test "list_shops_by_isbns/1 skips the isbns without a shop" do
+      shop = shop_fixture(%{item_id: "item 1", isbn: "isbn 1"})
+      assert ShopsDB.list_shops_by_isbns(["isbn 1", "missing isbn"]) == [shop]
+      assert ShopsDB.list_shops_by_isbns(["missing isbn"]) == []
+    end
+
+    test "list_shops_by_isbns/1 with no isbns returns no shops" do
+      shop_fixture(%{item_id: "item 1", isbn: "isbn 1"})
+      assert ShopsDB.list_shops_by_isbns([]) == []
+    end
+  end
 end
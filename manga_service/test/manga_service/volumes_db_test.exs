@@ -0,0 +1,40 @@
+defmodule MangaService.VolumesDBTest do
+  use MangaService.DataCase
+
+  alias MangaService.VolumesDB
+
+  describe "volumes by isbns" do
+    import MangaService.VolumesDBFixtures
+    import MangaService.MarketDBFixtures
+
+    test "list_volumes_by_isbns/1 returns the volumes with the given isbns" do
+      volume = volume_fixture(%{isbn: "isbn 1"})
+      other_volume = volume_fixture(%{isbn: "isbn 2"})
+      volume_fixture(%{isbn: "isbn 3"})
+
+      volumes = VolumesDB.list_volumes_by_isbns(["isbn 1", "isbn 2"])
+      assert Enum.map(volumes, & &1.id) |> Enum.sort() == Enum.sort([volume.id, other_volume.id])
+    end
+
+    test "list_volumes_by_isbns/1 preloads the market data of the volumes" do
+      volume_fixture(%{isbn: "isbn 1"})
+      volume_fixture(%{isbn: "isbn 2"})
+      market_fixture(%{isbn: "isbn 1", retail_price: 9.99})
+
+      volumes = VolumesDB.list_volumes_by_isbns(["isbn 1", "isbn 2"]) |> Enum.sort_by(& &1.isbn)
+      assert [%{market_data: %{retail_price: 9.99}}, %{market_data: nil}] = volumes
+    end
+
+    test "list_volumes_by_isbns/1 skips the isbns without a volume" do
+      volume = volume_fixture(%{isbn: "isbn 1"})
+      assert [%{id: id}] = VolumesDB.list_volumes_by_isbns(["isbn 1", "missing isbn"])
+      assert id == volume.id
+      assert VolumesDB.list_volumes_by_isbns(["missing isbn"]) == []
+    end
+
+    test "list_volumes_by_isbns/1 with no isbns returns no volumes" do
+      volume_fixture()
+      assert VolumesDB.list_volumes_by_isbns([]) == []
+    end
+  end
+end
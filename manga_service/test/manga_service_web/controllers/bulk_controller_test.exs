@@ -0,0 +1,88 @@
+defmodule MangaServiceWeb.BulkControllerTest do
+  use MangaServiceWeb.ConnCase
+
+  import MangaService.MarketDBFixtures
+
+  alias MangaService.MarketDB
+
+  describe "write" do
+    test "creates and updates the records of a batch", %{conn: conn} do
+      market_fixture(%{isbn: "isbn-1", retail_price: 9.99})
+
+      conn =
+        post(conn, ~p"/api/market/bulk", %{
+          "writes" => [
+            %{"action" => "create", "item" => %{"isbn" => "isbn-2", "retail_price" => 12.99}},
+            %{"action" => "update", "id" => "isbn-1", "item" => %{"retail_price" => 10.99}},
+            %{"action" => "upsert", "id" => "isbn-3", "item" => %{"retail_price" => 14.99}},
+            %{"action" => "upsert", "id" => "isbn-1", "item" => %{"retail_price" => 11.99}}
+          ]
+        })
+
+      assert json_response(conn, 200)["results"] == [
+               %{"id" => "isbn-2", "action" => "create", "status" => "ok"},
+               %{"id" => "isbn-1", "action" => "update", "status" => "ok"},
+               %{"id" => "isbn-3", "action" => "create", "status" => "ok"},
+               %{"id" => "isbn-1", "action" => "update", "status" => "ok"}
+             ]
+
+      assert MarketDB.get_market_by_isbn("isbn-1").retail_price == 11.99
+      assert MarketDB.get_market_by_isbn("isbn-2").retail_price == 12.99
+      assert MarketDB.get_market_by_isbn("isbn-3").retail_price == 14.99
+    end
+
+    test "answers a create of an existing record with a conflict", %{conn: conn} do
+      market_fixture(%{isbn: "isbn-1", retail_price: 9.99})
+
+      conn =
+        post(conn, ~p"/api/market/bulk", %{
+          "writes" => [
+            %{"action" => "create", "item" => %{"isbn" => "isbn-1", "retail_price" => 12.99}},
+            %{"action" => "create", "item" => %{"isbn" => "isbn-2", "retail_price" => 14.99}}
+          ]
+        })
+
+      assert [
+               %{
+                 "id" => "isbn-1",
+                 "action" => "create",
+                 "status" => "error",
+                 "errors" => %{"isbn" => ["has already been taken"]}
+               },
+               %{"id" => "isbn-2", "action" => "create", "status" => "ok"}
+             ] = json_response(conn, 200)["results"]
+
+      assert MarketDB.get_market_by_isbn("isbn-1").retail_price == 9.99
+    end
+
+    test "answers invalid rows with their errors and writes the others", %{conn: conn} do
+      conn =
+        post(conn, ~p"/api/market/bulk", %{
+          "writes" => [
+            %{"action" => "create", "item" => %{"isbn" => "isbn-1", "retail_price" => nil}},
+            %{"action" => "update", "id" => "missing-isbn", "item" => %{"retail_price" => 1.0}},
+            %{"action" => "delete", "id" => "isbn-2", "item" => %{}},
+            %{"action" => "create", "item" => %{"isbn" => "isbn-2", "retail_price" => 12.99}}
+          ]
+        })
+
+      assert [
+               %{
+                 "id" => "isbn-1",
+                 "status" => "error",
+                 "errors" => %{"retail_price" => ["can't be blank"]}
+               },
+               %{"id" => "missing-isbn", "status" => "error", "errors" => %{"id" => ["not found"]}},
+               %{"id" => "isbn-2", "status" => "error", "errors" => %{"action" => ["invalid"]}},
+               %{"id" => "isbn-2", "action" => "create", "status" => "ok"}
+             ] = json_response(conn, 200)["results"]
+
+      assert MarketDB.get_market_by_isbn("isbn-1") == nil
+    end
+
+    test "answers an unknown item type with not found", %{conn: conn} do
+      conn = post(conn, ~p"/api/unknown/bulk", %{"writes" => []})
+      assert json_response(conn, 404) == %{"errors" => %{"detail" => "Not Found"}}
+    end
+  end
+end
@@ -0,0 +1,45 @@
+defmodule MangaServiceWeb.BundleControllerTest do
+  use MangaServiceWeb.ConnCase
+
+  import MangaService.BundlesDBFixtures
+
+  describe "index with ids" do
+    test "lists the bundles with the given item ids", %{conn: conn} do
+      bundle_fixture(%{item_id: "item-1"})
+      bundle_fixture(%{item_id: "item-2"})
+      bundle_fixture(%{item_id: "item-3"})
+
+      conn = get(conn, ~p"/api/bundle?ids=item-1,item-2,missing-item")
+      item_ids = json_response(conn, 200) |> Enum.map(& &1["item_id"]) |> Enum.sort()
+      assert item_ids == ["item-1", "item-2"]
+    end
+
+    test "lists no bundles for missing item ids", %{conn: conn} do
+      bundle_fixture(%{item_id: "item-1"})
+
+      conn = get(conn, ~p"/api/bundle?ids=missing-item")
+      assert json_response(conn, 200) == []
+    end
+
+    test "lists no bundles for an empty list of item ids", %{conn: conn} do
+      bundle_fixture(%{item_id: "item-1"})
+
+      conn = get(conn, ~p"/api/bundle?ids=")
+      assert json_response(conn, 200) == []
+    end
+  end
+
+  describe "show" do
+    test "renders the record with the given id", %{conn: conn} do
+      bundle_fixture(%{item_id: "item-1"})
+
+      conn = get(conn, ~p"/api/bundle/item-1")
+      assert json_response(conn, 200)["item_id"] == "item-1"
+    end
+
+    test "renders not found for a missing id", %{conn: conn} do
+      conn = get(conn, ~p"/api/bundle/missing-id")
+      assert json_response(conn, 404) == %{"errors" => %{"detail" => "Not Found"}}
+    end
+  end
+end
@@ -0,0 +1,45 @@
+defmodule MangaServiceWeb.MarketControllerTest do
+  use MangaServiceWeb.ConnCase
+
+  import MangaService.MarketDBFixtures
+
+  describe "index with ids" do
+    test "lists the market with the given isbns", %{conn: conn} do
+      market_fixture(%{isbn: "isbn-1"})
+      market_fixture(%{isbn: "isbn-2"})
+      market_fixture(%{isbn: "isbn-3"})
+
+      conn = get(conn, ~p"/api/market?ids=isbn-1,isbn-2,missing-isbn")
+      isbns = json_response(conn, 200) |> Enum.map(& &1["isbn"]) |> Enum.sort()
+      assert isbns == ["isbn-1", "isbn-2"]
+    end
+
+    test "lists no market for missing isbns", %{conn: conn} do
+      market_fixture(%{isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/market?ids=missing-isbn")
+      assert json_response(conn, 200) == []
+    end
+
+    test "lists no market for an empty list of isbns", %{conn: conn} do
+      market_fixture(%{isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/market?ids=")
+      assert json_response(conn, 200) == []
+    end
+  end
+
+  describe "show" do
+    test "renders the record with the given id", %{conn: conn} do
+      market_fixture(%{isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/market/isbn-1")
+      assert json_response(conn, 200)["isbn"] == "isbn-1"
+    end
+
+    test "renders not found for a missing id", %{conn: conn} do
+      conn = get(conn, ~p"/api/market/missing-id")
+      assert json_response(conn, 404) == %{"errors" => %{"detail" => "Not Found"}}
+    end
+  end
+end
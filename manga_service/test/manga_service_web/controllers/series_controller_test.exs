@@ -0,0 +1,19 @@
+defmodule MangaServiceWeb.SeriesControllerTest do
+  use MangaServiceWeb.ConnCase
+
+  import MangaService.SeriesDBFixtures
+
+  describe "show" do
+    test "renders the series with the given id", %{conn: conn} do
+      series_fixture(%{series_id: "series-1"})
+
+      conn = get(conn, ~p"/api/series/series-1")
+      assert json_response(conn, 200)["series_id"] == "series-1"
+    end
+
+    test "renders not found for a missing id", %{conn: conn} do
+      conn = get(conn, ~p"/api/series/missing-id")
+      assert json_response(conn, 404) == %{"errors" => %{"detail" => "Not Found"}}
+    end
+  end
+end
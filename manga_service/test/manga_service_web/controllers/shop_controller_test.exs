@@ -0,0 +1,45 @@
+defmodule MangaServiceWeb.ShopControllerTest do
+  use MangaServiceWeb.ConnCase
+
+  import MangaService.ShopsDBFixtures
+
+  describe "index with isbns" do
+    test "lists the shops with the given isbns", %{conn: conn} do
+      shop_fixture(%{item_id: "item-1", isbn: "isbn-1"})
+      shop_fixture(%{item_id: "item-2", isbn: "isbn-2"})
+      shop_fixture(%{item_id: "item-3", isbn: "isbn-3"})
+
+      conn = get(conn, ~p"/api/shop?isbns=isbn-1,isbn-2,missing-isbn")
+      item_ids = json_response(conn, 200) |> Enum.map(& &1["item_id"]) |> Enum.sort()
+      assert item_ids == ["item-1", "item-2"]
+    end
+
+    test "lists no shops for missing isbns", %{conn: conn} do
+      shop_fixture(%{item_id: "item-1", isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/shop?isbns=missing-isbn")
+      assert json_response(conn, 200) == []
+    end
+
+    test "lists no shops for an empty list of isbns", %{conn: conn} do
+      shop_fixture(%{item_id: "item-1", isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/shop?isbns=")
+      assert json_response(conn, 200) == []
+    end
+  end
+
+  describe "show" do
+    test "renders the record with the given id", %{conn: conn} do
+      shop_fixture(%{item_id: "item-1", isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/shop/item-1")
+      assert json_response(conn, 200)["item_id"] == "item-1"
+    end
+
+    test "renders not found for a missing id", %{conn: conn} do
+      conn = get(conn, ~p"/api/shop/missing-id")
+      assert json_response(conn, 404) == %{"errors" => %{"detail" => "Not Found"}}
+    end
+  end
+end
@@ -0,0 +1,51 @@
+defmodule MangaServiceWeb.VolumeControllerTest do
+  use MangaServiceWeb.ConnCase
+
+  import MangaService.VolumesDBFixtures
+  import MangaService.MarketDBFixtures
+
+  describe "index with ids" do
+    test "lists the volumes with the given isbns", %{conn: conn} do
+      volume_fixture(%{isbn: "isbn-1"})
+      volume_fixture(%{isbn: "isbn-2"})
+      volume_fixture(%{isbn: "isbn-3"})
+      market_fixture(%{isbn: "isbn-1", retail_price: 9.99})
+
+      conn = get(conn, ~p"/api/volume?ids=isbn-1,isbn-2,missing-isbn")
+      volumes = json_response(conn, 200) |> Enum.sort_by(& &1["isbn"])
+
+      assert [
+               %{"isbn" => "isbn-1", "market_data" => %{"retail_price" => 9.99}},
+               %{"isbn" => "isbn-2", "market_data" => nil}
+             ] = volumes
+    end
+
+    test "lists no volumes for missing isbns", %{conn: conn} do
+      volume_fixture(%{isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/volume?ids=missing-isbn")
+      assert json_response(conn, 200) == []
+    end
+
+    test "lists no volumes for an empty list of isbns", %{conn: conn} do
+      volume_fixture(%{isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/volume?ids=")
+      assert json_response(conn, 200) == []
+    end
+  end
+
+  describe "show" do
+    test "renders the record with the given id", %{conn: conn} do
+      volume_fixture(%{isbn: "isbn-1"})
+
+      conn = get(conn, ~p"/api/volume/isbn-1")
+      assert json_response(conn, 200)["isbn"] == "isbn-1"
+    end
+
+    test "renders not found for a missing id", %{conn: conn} do
+      conn = get(conn, ~p"/api/volume/missing-id")
+      assert json_response(conn, 404) == %{"errors" => %{"detail" => "Not Found"}}
+    end
+  end
+end
@@ -0,0 +1,26 @@
+defmodule MangaService.BundlesDBFixtures do
+  @moduledoc """
+  This module defines test helpers for creating
+  entities via the `MangaService.BundlesDB` context.
+  """
+
+  @doc """
+  Generate a bundle.
+  """
+  def bundle_fixture(attrs \\ %{}) do
+    {:ok, bundle} =
+      attrs
+      |> Enum.into(%{
+        item_id: "some item_id",
+        series_id: "some series_id",
+        shop_id: "some shop_id",
+        type: "some type",
+        volume_end: "some volume_end",
+        volume_start: "some volume_start",
+        volumes: []
+      })
+      |> MangaService.BundlesDB.create_bundle()
+
+    bundle
+  end
+end
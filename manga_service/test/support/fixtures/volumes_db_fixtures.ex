@@ -0,0 +1,26 @@
+defmodule MangaService.VolumesDBFixtures do
+  @moduledoc """
+  This module defines test helpers for creating
+  entities via the `MangaService.VolumesDB` context.
+  """
+
+  @doc """
+  Generate a volume.
+  """
+  def volume_fixture(attrs \\ %{}) do
+    {:ok, volume} =
+      attrs
+      |> Enum.into(%{
+        category: "some category",
+        display_name: "some display_name",
+        isbn: "some isbn",
+        is_bundle: false,
+        name: "some name",
+        series_id: "some series_id",
+        url: "some url"
+      })
+      |> MangaService.VolumesDB.create_volume()
+
+    volume
+  end
+end